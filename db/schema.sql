@@ -31,7 +31,8 @@ CREATE TABLE IF NOT EXISTS edition (
 CREATE TABLE IF NOT EXISTS author (
   id         INTEGER PRIMARY KEY,
   name       TEXT NOT NULL,
-  sort_name  TEXT
+  sort_name  TEXT,
+  norm_name  TEXT
 );
 
 CREATE TABLE IF NOT EXISTS work_author (
@@ -58,10 +59,14 @@ CREATE TABLE IF NOT EXISTS file (
   ext         TEXT,
   size_bytes  INTEGER,
   sha256      TEXT UNIQUE,
+  quick_hash  TEXT,
   mime        TEXT,
   drm         INTEGER DEFAULT 0,
   added_at    TEXT DEFAULT CURRENT_TIMESTAMP,
-  last_seen   TEXT
+  last_seen   TEXT,
+  device      INTEGER,
+  inode       INTEGER,
+  mtime_ns    INTEGER
 );
 
 -- Cache bruto dos provedores
@@ -76,6 +81,34 @@ CREATE TABLE IF NOT EXISTS provider_hit (
   UNIQUE(provider, remote_id)
 );
 
+-- mtime por diretório varrido, para pular subárvores inalteradas em novos scans
+CREATE TABLE IF NOT EXISTS scan_dir (
+  path        TEXT PRIMARY KEY,
+  mtime_ns    INTEGER NOT NULL,
+  scanned_at  TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Arquivos cuja extração travou, estourou memória ou falhou; só são tentados de novo se mudarem
+CREATE TABLE IF NOT EXISTS ingest_failure (
+  path        TEXT PRIMARY KEY,
+  size_bytes  INTEGER,
+  mtime_ns    INTEGER,
+  reason      TEXT NOT NULL,
+  attempts    INTEGER NOT NULL DEFAULT 1,
+  failed_at   TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Cache read-through das consultas aos provedores (payload NULL = resposta vazia)
+CREATE TABLE IF NOT EXISTS provider_cache (
+  provider     TEXT NOT NULL,
+  kind         TEXT NOT NULL,
+  lookup_key   TEXT NOT NULL,
+  payload_json TEXT,
+  fetched_at   TEXT NOT NULL,
+  expires_at   TEXT NOT NULL,
+  PRIMARY KEY (provider, kind, lookup_key)
+);
+
 -- Séries e participação das obras
 CREATE TABLE IF NOT EXISTS series (
   id    INTEGER PRIMARY KEY,
@@ -106,11 +139,21 @@ CREATE TABLE IF NOT EXISTS task (
   id          INTEGER PRIMARY KEY,
   kind        TEXT NOT NULL,
   payload_json TEXT,
-  status      TEXT NOT NULL DEFAULT 'pending',
+  status      TEXT NOT NULL DEFAULT 'pending', -- pending|running|done|failed|cancelled
   result_json TEXT,
   created_at  TEXT DEFAULT CURRENT_TIMESTAMP,
   started_at  TEXT,
-  finished_at TEXT
+  finished_at TEXT,
+  priority    INTEGER NOT NULL DEFAULT 0,    -- maior primeiro
+  attempts    INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 3,
+  run_after   TEXT,                          -- backoff entre tentativas
+  lease_owner TEXT,
+  lease_expires_at TEXT,                     -- lease vencido: worker caiu, outro retoma
+  heartbeat_at TEXT,
+  error       TEXT,
+  progress_json TEXT,                        -- contadores gravados a cada heartbeat
+  cancel_requested INTEGER NOT NULL DEFAULT 0
 );
 
 -- Full-text search (FTS5) para catálogo
@@ -151,24 +194,10 @@ SELECT
 FROM edition e
 JOIN work w ON w.id = e.work_id;
 
--- Trigger para manter FTS sincronizado
-CREATE TRIGGER IF NOT EXISTS trg_search_insert
-AFTER INSERT ON edition BEGIN
-  INSERT INTO search(rowid, title, authors, series, publisher, tags)
-  SELECT NEW.id, title, authors, series, publisher, tags
-    FROM vw_edition_search
-   WHERE edition_id = NEW.id;
-END;
-
-CREATE TRIGGER IF NOT EXISTS trg_search_update
-AFTER UPDATE ON edition BEGIN
-  INSERT INTO search(search, rowid, title, authors, series, publisher, tags)
-  VALUES('delete', OLD.id, NULL, NULL, NULL, NULL, NULL);
-  INSERT INTO search(rowid, title, authors, series, publisher, tags)
-  SELECT NEW.id, title, authors, series, publisher, tags
-    FROM vw_edition_search
-   WHERE edition_id = NEW.id;
-END;
+-- Inserções/alterações são indexadas em lote pelo mai.db.indexer no commit;
+-- a remoção continua via trigger
+DROP TRIGGER IF EXISTS trg_search_insert;
+DROP TRIGGER IF EXISTS trg_search_update;
 
 CREATE TRIGGER IF NOT EXISTS trg_search_delete
 AFTER DELETE ON edition BEGIN
@@ -222,6 +251,12 @@ CREATE TABLE IF NOT EXISTS organize_op (
 );
 
 CREATE INDEX IF NOT EXISTS idx_match_event_edition ON match_event(edition_id);
+CREATE INDEX IF NOT EXISTS idx_file_inode ON file(device, inode);
+CREATE INDEX IF NOT EXISTS idx_file_quick_hash ON file(quick_hash);
+CREATE INDEX IF NOT EXISTS idx_task_queue ON task(status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS idx_work_sort_title ON work(sort_title);
+CREATE INDEX IF NOT EXISTS idx_author_norm_name ON author(norm_name);
+CREATE INDEX IF NOT EXISTS idx_provider_cache_expires ON provider_cache(expires_at);
 CREATE INDEX IF NOT EXISTS idx_org_manifest_status ON organize_manifest(status);
 CREATE INDEX IF NOT EXISTS idx_org_op_manifest ON organize_op(manifest_id);
 CREATE INDEX IF NOT EXISTS idx_org_op_status ON organize_op(status);
@@ -7,7 +7,9 @@ from sqlalchemy import column, func, or_, select, table, text
 from sqlalchemy.orm import Session, selectinload
 
 from mai.api.dependencies import get_db
+from mai.api.routes.covers import thumbnail_url
 from mai.db import models
+from mai.utils.text import name_key
 from mai.schemas.books import (
     AuthorSchema,
     BookDetail,
@@ -55,11 +57,11 @@ def list_books(
         stmt = stmt.where(text("search MATCH :fts_query"))
 
     if author:
-        like = f"%{author}%"
         stmt = stmt.join(models.WorkAuthor, models.WorkAuthor.work_id == models.Work.id).join(
             models.Author, models.Author.id == models.WorkAuthor.author_id
         )
-        stmt = stmt.where(models.Author.name.ilike(like))
+        # norm_name já está sem acentos/caixa: casa "jose" com "José"
+        stmt = stmt.where(models.Author.norm_name.like(f"%{name_key(author)}%"))
 
     if tag:
         like = f"%{tag}%"
@@ -110,6 +112,7 @@ def serialize_book(edition: models.Edition) -> BookListItem:
         language=edition.language,
         format=edition.format,
         cover_url=edition.cover_url,
+        thumbnail_url=thumbnail_url(edition),
     )
 
     return BookListItem(
@@ -195,6 +198,7 @@ def get_book_detail(edition_id: int, db: Session = Depends(get_db)) -> BookDetai
         language=edition.language,
         format=edition.format,
         cover_url=edition.cover_url,
+        thumbnail_url=thumbnail_url(edition),
     )
     return BookDetail(
         edition=edition_schema,
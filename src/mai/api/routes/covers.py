@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.orm import Session
+
+from mai.api.dependencies import get_db
+from mai.core.config import get_settings
+from mai.covers import CoverError, get_cover_cache
+from mai.db import models
+
+router = APIRouter(prefix="/covers", tags=["covers"])
+
+
+def thumbnail_url(edition: models.Edition, size: str = "small") -> Optional[str]:
+    return f"{router.prefix}/{edition.id}?size={size}" if edition.cover_path else None
+
+
+@router.get("/{edition_id}", name="edition_cover")
+def edition_cover(
+    edition_id: int,
+    request: Request,
+    size: str = Query(default="medium"),
+    db: Session = Depends(get_db),
+) -> Response:
+    edition = db.get(models.Edition, edition_id)
+    if not edition or not edition.cover_path:
+        raise HTTPException(status_code=404, detail="Capa não encontrada")
+    try:
+        path = get_cover_cache().path(edition.cover_path, size)
+    except CoverError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Capa não encontrada")
+
+    # o cache é endereçado por conteúdo: a chave já identifica os bytes servidos
+    etag = f'"{edition.cover_path.rsplit("/", 1)[-1]}-{size}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={get_settings().cover_max_age}"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
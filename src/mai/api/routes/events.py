@@ -1,26 +1,92 @@
 from __future__ import annotations
 
 import asyncio
-import random
+import json
+from typing import AsyncIterator, Optional, Set
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
+from mai.core.config import get_settings
+from mai.core.events import get_event_hub
+from mai.db.session import session_scope
 from mai.ingest.service import is_watcher_running
+from mai.jobs import queue
 
-router = APIRouter()
+router = APIRouter(tags=["events"])
+
+TYPES_HELP = "Tipos separados por vírgula (ex.: file.ingested,queue.depth); vazio = todos"
+
+
+def _parse_types(types: Optional[str]) -> Optional[Set[str]]:
+    parsed = {part.strip() for part in (types or "").split(",") if part.strip()}
+    return parsed or None
+
+
+def current_status() -> dict:
+    with session_scope() as session:
+        depth = queue.depth(session)
+    return {"watcher": "running" if is_watcher_running() else "stopped", "queue": depth}
+
+
+async def _wait_closed(ws: WebSocket) -> None:
+    while True:
+        message = await ws.receive()
+        if message["type"] == "websocket.disconnect":
+            return
 
 
 @router.websocket("/ws/status")
-async def status_socket(ws: WebSocket) -> None:
+async def status_socket(ws: WebSocket, types: Optional[str] = None) -> None:
     await ws.accept()
+    hub = get_event_hub()
+    sub = hub.subscribe(_parse_types(types))
+    keepalive = get_settings().event_keepalive_seconds
+    closed = asyncio.ensure_future(_wait_closed(ws))
     try:
+        await ws.send_json({"seq": None, "type": "status", "data": await run_in_threadpool(current_status)})
         while True:
-            payload = {
-                "watcher": "running" if is_watcher_running() else "stopped",
-                "queue": random.randint(0, 5),
-                "last_ingest": asyncio.get_event_loop().time(),
-            }
-            await ws.send_json(payload)
-            await asyncio.sleep(2)
+            batch = asyncio.ensure_future(sub.next_batch(keepalive))
+            await asyncio.wait({batch, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                batch.cancel()
+                return
+            for event in batch.result() or [{"seq": None, "type": "ping", "data": {}}]:
+                await ws.send_json(event)
     except WebSocketDisconnect:  # pragma: no cover
         return
+    finally:
+        closed.cancel()
+        hub.unsubscribe(sub)
+
+
+@router.get("/events")
+async def event_stream(request: Request, types: Optional[str] = Query(default=None, description=TYPES_HELP)):
+    """Mesmos eventos do ``/ws/status`` em Server-Sent Events."""
+    hub = get_event_hub()
+    wanted = _parse_types(types)
+    keepalive = get_settings().event_keepalive_seconds
+
+    async def stream() -> AsyncIterator[str]:
+        # assina só quando a resposta começa: se o cliente some antes, nada fica registrado
+        sub = hub.subscribe(wanted)
+        try:
+            yield _sse({"seq": None, "type": "status", "data": await run_in_threadpool(current_status)})
+            while not await request.is_disconnected():
+                batch = await sub.next_batch(keepalive)
+                if not batch:
+                    yield ": keepalive\n\n"
+                for event in batch:
+                    yield _sse(event)
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _sse(event: dict) -> str:
+    lines = [f"event: {event['type']}", f"data: {json.dumps(event, ensure_ascii=False, default=str)}"]
+    if event.get("seq") is not None:
+        lines.insert(0, f"id: {event['seq']}")
+    return "\n".join(lines) + "\n\n"
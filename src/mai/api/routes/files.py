@@ -9,7 +9,6 @@ from sqlalchemy.orm import Session
 
 from mai.api.dependencies import get_db
 from mai.db import models
-from mai.db.indexer import upsert_for_edition
 from mai.schemas.files import AttachFileRequest, AttachFileResponse
 
 router = APIRouter(prefix="/files", tags=["files"])
@@ -25,14 +24,9 @@ def attach_file(body: AttachFileRequest, db: Session = Depends(get_db)) -> Attac
     if not file_record:
         raise HTTPException(status_code=404, detail="Arquivo não encontrado")
 
-    previous_edition = file_record.edition_id
     file_record.edition_id = edition.id
     file_record.last_seen = datetime.utcnow()
 
-    upsert_for_edition(db, edition.id)
-    if previous_edition and previous_edition != edition.id:
-        upsert_for_edition(db, previous_edition)
-
     db.commit()
     return AttachFileResponse(file_id=file_record.id, edition_id=edition.id, path=file_record.path)
 
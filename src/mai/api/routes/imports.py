@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 from typing import List
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
 
-from mai.api.dependencies import get_db  # ensures DB ready
+from mai.api.dependencies import get_db
 from mai.core.config import get_settings
 from mai.core.logging import logger
-from mai.ingest.pipeline import build_providers, ingest_paths
+from mai.db import models
 from mai.ingest.service import start_watcher, stop_watcher
-from mai.schemas.imports import ImportRequest, ImportResponse, WatchRequest, WatchResponse
+from mai.jobs import TaskFinishedError, cancel, submit, task_progress
+from mai.jobs.queue import CANCELLED
+from mai.schemas.imports import ImportRequest, ImportResponse, ImportStatus, WatchRequest, WatchResponse
 
 router = APIRouter(prefix="/import", tags=["import"])
 
@@ -29,13 +33,58 @@ def _resolve_paths(payload_paths, settings_paths) -> List[Path]:
 
 
 @router.post("/scan", response_model=ImportResponse, status_code=202)
-def scan(payload: ImportRequest, background: BackgroundTasks) -> ImportResponse:
+def scan(payload: ImportRequest) -> ImportResponse:
     settings = get_settings()
     paths = _resolve_paths(payload.paths, settings.watch_paths)
-    providers = build_providers(settings.google_books_key)
-    background.add_task(ingest_paths, paths, providers)
-    logger.info("Importação agendada para %s", paths)
-    return ImportResponse(status="scheduled", paths=[str(p) for p in paths])
+    # fila durável: a importação sobrevive a um restart e aparece em /tasks
+    task_id = submit(
+        "import",
+        {
+            "paths": [str(p) for p in paths],
+            "hash_workers": payload.hash_workers,
+            "enrich_workers": payload.enrich_workers,
+            "full_rescan": payload.full_rescan,
+        },
+        priority=payload.priority,
+    )
+    logger.info("Importação %s enfileirada para %s", task_id, paths)
+    return ImportResponse(status="queued", paths=[str(p) for p in paths], task_id=task_id)
+
+
+def _import_status(task: models.Task) -> ImportStatus:
+    progress = task_progress(task) or {}
+    # tarefa pendente cancelada não chega a ter snapshot
+    progress["cancelled"] = progress.get("cancelled", False) or task.status == CANCELLED
+    return ImportStatus(
+        **progress,
+        task_id=task.id,
+        status=task.status,
+        paths=json.loads(task.payload_json or "{}").get("paths") or [],
+        error=task.error,
+        cancel_requested=bool(task.cancel_requested),
+    )
+
+
+def _get_import(db: Session, task_id: int) -> models.Task:
+    task = db.get(models.Task, task_id)
+    if task is None or task.kind != "import":
+        raise HTTPException(status_code=404, detail="Importação não encontrada")
+    return task
+
+
+@router.get("/{task_id}", response_model=ImportStatus)
+def import_status(task_id: int, db: Session = Depends(get_db)) -> ImportStatus:
+    return _import_status(_get_import(db, task_id))
+
+
+@router.post("/{task_id}/cancel", response_model=ImportStatus)
+def cancel_import(task_id: int, db: Session = Depends(get_db)) -> ImportStatus:
+    _get_import(db, task_id)
+    try:
+        cancel(task_id)
+    except TaskFinishedError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return _import_status(db.get(models.Task, task_id, populate_existing=True))
 
 
 @router.post("/watch", response_model=WatchResponse)
@@ -90,16 +90,17 @@ def opds_catalog(
             f"Language: {edition.language}" if edition.language else "",
         ]
         SubElement(entry, "content", type="text").text = ", ".join(filter(None, summary_parts)) or "Entrada MAI"
-        if edition.cover_url:
-            SubElement(
-                entry,
-                "link",
-                rel="http://opds-spec.org/image",
-                href=edition.cover_url,
-                type="image/jpeg",
-            )
+        if edition.cover_path:
+            cover_url = request.url_for("edition_cover", edition_id=edition.id)
+            image = str(cover_url.include_query_params(size="large"))
+            thumbnail = str(cover_url.include_query_params(size="small"))
+        else:
+            image = thumbnail = edition.cover_url
+        if image:
+            SubElement(entry, "link", rel="http://opds-spec.org/image", href=image, type="image/jpeg")
+            SubElement(entry, "link", rel="http://opds-spec.org/image/thumbnail", href=thumbnail, type="image/jpeg")
         for file in edition.files:
-            file_url = request.url_for("opds_file", file_id=file.id)
+            file_url = str(request.url_for("opds_file", file_id=file.id))
             link_attrs = {
                 "rel": "http://opds-spec.org/acquisition",
                 "href": file_url,
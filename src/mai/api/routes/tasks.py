@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from mai.api.dependencies import get_db
+from mai.db import models
+from mai.jobs import HANDLERS, TaskFinishedError, cancel, get_job_pool, submit, task_progress
+from mai.jobs.queue import CANCELLED, FAILED, PENDING
+from mai.schemas.tasks import TaskCreate, TaskList, TaskSchema
+
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+def serialize_task(task: models.Task) -> TaskSchema:
+    return TaskSchema(
+        id=task.id,
+        kind=task.kind,
+        status=task.status,
+        priority=task.priority,
+        attempts=task.attempts,
+        max_attempts=task.max_attempts,
+        payload=json.loads(task.payload_json or "{}"),
+        result=json.loads(task.result_json) if task.result_json else None,
+        error=task.error,
+        created_at=task.created_at,
+        started_at=task.started_at,
+        finished_at=task.finished_at,
+        run_after=task.run_after,
+        heartbeat_at=task.heartbeat_at,
+        progress=task_progress(task),
+        cancel_requested=bool(task.cancel_requested),
+    )
+
+
+@router.get("", response_model=TaskList)
+def list_tasks(
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+) -> TaskList:
+    criteria = []
+    if status:
+        criteria.append(models.Task.status == status)
+    if kind:
+        criteria.append(models.Task.kind == kind)
+    total = db.scalar(select(func.count()).select_from(models.Task).where(*criteria)) or 0
+    tasks = db.scalars(
+        select(models.Task).where(*criteria).order_by(models.Task.id.desc()).offset(offset).limit(limit)
+    ).all()
+    return TaskList(total=total, items=[serialize_task(task) for task in tasks])
+
+
+@router.post("", response_model=TaskSchema, status_code=202)
+def create_task(body: TaskCreate, db: Session = Depends(get_db)) -> TaskSchema:
+    if body.kind not in HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Tipo de tarefa desconhecido: {body.kind}")
+    task_id = submit(body.kind, body.payload, priority=body.priority)
+    return serialize_task(db.get(models.Task, task_id))
+
+
+@router.get("/{task_id}", response_model=TaskSchema)
+def get_task(task_id: int, db: Session = Depends(get_db)) -> TaskSchema:
+    task = db.get(models.Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    return serialize_task(task)
+
+
+@router.post("/{task_id}/retry", response_model=TaskSchema)
+def retry_task(task_id: int, db: Session = Depends(get_db)) -> TaskSchema:
+    task = db.get(models.Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    if task.status not in (FAILED, CANCELLED):
+        raise HTTPException(status_code=409, detail="Só tarefas com falha ou canceladas podem ser repetidas")
+    task.status = PENDING
+    task.attempts = 0
+    task.run_after = None
+    task.finished_at = None
+    task.cancel_requested = False
+    task.progress_json = None
+    db.commit()
+    get_job_pool().notify()
+    return serialize_task(task)
+
+
+@router.post("/{task_id}/cancel", response_model=TaskSchema)
+def cancel_task(task_id: int, db: Session = Depends(get_db)) -> TaskSchema:
+    try:
+        cancel(task_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except TaskFinishedError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return serialize_task(db.get(models.Task, task_id, populate_existing=True))
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -19,6 +19,53 @@ class Settings(BaseSettings):
     watch_paths: List[Path] = []
     google_books_key: str | None = None
     provider_timeout: float = 15.0
+    provider_deadline: float = 30.0
+    provider_max_connections: int = 20
+    provider_max_keepalive: int = 10
+    provider_keepalive_expiry: float = 30.0
+    provider_http2: bool = True
+    # req/s sustentado por provedor, um pouco abaixo dos limites publicados
+    provider_rate_limits: Dict[str, float] = {"openlibrary": 1.8, "google_books": 1.8, "bookbrainz": 0.9}
+    provider_default_rate: float = 1.0
+    provider_rate_burst: int = 2
+    provider_max_retries: int = 4
+    provider_backoff_max: float = 60.0
+    ol_dump_db: Optional[Path] = None  # padrão: openlibrary.db ao lado do banco
+    provider_cache_ttl_days: int = 30
+    provider_cache_negative_ttl_hours: int = 24
+    ingest_hash_workers: int = 4
+    ingest_enrich_workers: int = 8
+    ingest_queue_size: int = 256
+    ingest_commit_every: int = 200
+    hash_backfill: bool = True
+    hash_workers: int = 0  # 0 = um por núcleo
+    hash_per_device: int = 2
+    scoring_workers: int = -1
+    extract_sandbox: bool = True
+    extract_workers: int = 0  # 0 = ingest_hash_workers
+    extract_timeout: float = 60.0
+    extract_memory_mb: int = 1024
+    cover_extract: bool = True
+    cover_download: bool = True
+    cover_cache_dir: Optional[Path] = None  # padrão: covers/ ao lado do banco
+    cover_sizes: Dict[str, int] = {"small": 128, "medium": 320, "large": 640}
+    cover_max_age: int = 7 * 24 * 3600
+    isbn_content_scan: bool = True
+    isbn_scan_head_pages: int = 6
+    isbn_scan_tail_pages: int = 2
+    job_workers: int = 2  # 0 = fila não é processada neste processo
+    job_lease_seconds: float = 60.0
+    job_poll_interval: float = 1.0
+    job_max_attempts: int = 3
+    job_backoff_base: float = 30.0
+    job_backoff_max: float = 3600.0
+    job_progress_interval: float = 2.0  # segundos entre gravações de progresso/checagens de cancelamento
+    event_buffer_size: int = 256  # eventos por cliente de /ws/status e /events; os mais antigos são descartados
+    event_keepalive_seconds: float = 15.0
+    scan_skip_unchanged_dirs: bool = True
+    watch_quiet_period: float = 2.0
+    watch_poll_interval: float = 0.5
+    watch_workers: int = 1
     organizer_template: str = "{author_last}/{title}.{ext}"
     admin_username: str = "mai"
     admin_password: str = "mai"
@@ -0,0 +1,129 @@
+"""Hub de eventos em processo.
+
+Ingestão, organizador, revisão e fila de tarefas publicam de qualquer thread;
+cada assinante (WebSocket/SSE) tem um buffer próprio e limitado. O publicador
+nunca espera um cliente: num cliente lento os eventos mais antigos são
+descartados e ele recebe um ``events.dropped`` com a contagem.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from mai.core.config import get_settings
+from mai.core.logging import logger
+
+DROPPED = "events.dropped"
+
+
+class Subscription:
+    def __init__(self, maxlen: int, types: Optional[Iterable[str]], loop: asyncio.AbstractEventLoop) -> None:
+        self.types = frozenset(types) if types else None
+        self.dropped = 0
+        self._events: deque = deque(maxlen=max(1, maxlen))
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event()
+        # evita um call_soon_threadsafe por evento enquanto o cliente não drenou o buffer
+        self._signalled = False
+
+    def wants(self, kind: str) -> bool:
+        return self.types is None or kind in self.types
+
+    def push(self, event: dict) -> None:
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            if self._signalled:
+                return
+            self._signalled = True
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:  # pragma: no cover - loop já encerrado; o hub remove no unsubscribe
+            pass
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[dict]:
+        """Espera até haver eventos (ou ``timeout``) e devolve tudo o que estava no buffer."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            self._signalled = False
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            events.insert(0, {"seq": None, "type": DROPPED, "ts": time.time(), "data": {"count": dropped}})
+        return events
+
+
+class EventHub:
+    def __init__(self, buffer_size: Optional[int] = None) -> None:
+        self.buffer_size = buffer_size or get_settings().event_buffer_size
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        # último evento de cada tipo "de estado" (fila, watcher): enviado a quem acabou de conectar
+        self._sticky: Dict[str, dict] = {}
+
+    def publish(self, kind: str, data: Optional[dict] = None, sticky: bool = False) -> dict:
+        event = {"seq": next(self._seq), "type": kind, "ts": time.time(), "data": data or {}}
+        with self._lock:
+            if sticky:
+                self._sticky[kind] = event
+            targets = [sub for sub in self._subscriptions if sub.wants(kind)]
+        for sub in targets:
+            sub.push(event)
+        return event
+
+    def subscribe(
+        self,
+        types: Optional[Iterable[str]] = None,
+        maxlen: Optional[int] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> Subscription:
+        """Registra um assinante no loop atual; o estado conhecido já vem no buffer."""
+        sub = Subscription(maxlen or self.buffer_size, types, loop or asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(sub)
+            current = [event for kind, event in self._sticky.items() if sub.wants(kind)]
+        for event in current:
+            sub.push(event)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+
+_hub: Optional[EventHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_event_hub() -> EventHub:
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = EventHub()
+        return _hub
+
+
+def publish(kind: str, sticky: bool = False, **data) -> None:
+    """Atalho para os publicadores; um erro aqui nunca derruba quem publicou."""
+    try:
+        get_event_hub().publish(kind, data, sticky=sticky)
+    except Exception as exc:  # pragma: no cover - eventos são informativos
+        logger.debug("Falha ao publicar evento %s: %s", kind, exc)
@@ -0,0 +1,3 @@
+"""Capas locais: extração na ingestão, download em segundo plano e cache de miniaturas."""
+
+from .cache import CoverCache, CoverError, get_cover_cache  # noqa: F401
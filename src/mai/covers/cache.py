@@ -0,0 +1,87 @@
+"""Cache de miniaturas endereçado por conteúdo.
+
+A chave é o SHA-256 da imagem original; cada capa vira um diretório
+``<raiz>/<ab>/<chave>/`` com um JPEG por tamanho de ``cover_sizes``. Capas
+iguais (ex.: várias edições do mesmo livro) ocupam o disco uma vez só, e o
+caminho relativo ``<ab>/<chave>`` é o que vai em ``edition.cover_path``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from mai.core.config import get_settings
+
+try:  # Optional dependency
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional
+    Image = None
+
+JPEG_QUALITY = 85
+# capas muito grandes (scans de 10k px) não valem o custo de decodificar
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+
+
+class CoverError(ValueError):
+    pass
+
+
+class CoverCache:
+    def __init__(self, root: Path, sizes: Dict[str, int]) -> None:
+        self.root = root
+        self.sizes = sizes
+
+    def path(self, cover_path: str, size: str) -> Path:
+        if size not in self.sizes:
+            raise CoverError(f"Tamanho de capa desconhecido: {size}")
+        return self.root / cover_path / f"{size}.jpg"
+
+    def has(self, cover_path: str) -> bool:
+        return all(self.path(cover_path, size).exists() for size in self.sizes)
+
+    def store(self, data: bytes) -> str:
+        """Gera as miniaturas de ``data`` (se ainda não existem); devolve o ``cover_path``."""
+        if Image is None:
+            raise CoverError("Pillow não instalado (pip install pillow)")
+        if len(data) > MAX_SOURCE_BYTES:
+            raise CoverError("Imagem de capa grande demais")
+        key = hashlib.sha256(data).hexdigest()
+        cover_path = f"{key[:2]}/{key}"
+        if self.has(cover_path):
+            return cover_path
+        try:
+            with Image.open(io.BytesIO(data)) as source:
+                source.load()
+                image = source.convert("RGB")
+        except Exception as exc:
+            raise CoverError(f"Imagem de capa inválida: {exc}") from exc
+
+        target = self.root / cover_path
+        target.mkdir(parents=True, exist_ok=True)
+        for size, edge in self.sizes.items():
+            thumb = image.copy()
+            thumb.thumbnail((edge, edge))
+            self._write(target / f"{size}.jpg", thumb)
+        return cover_path
+
+    @staticmethod
+    def _write(path: Path, image) -> None:
+        # grava em temporário e renomeia: leitores nunca veem um JPEG pela metade
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                image.save(handle, "JPEG", quality=JPEG_QUALITY, optimize=True)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def get_cover_cache(root: Optional[Path] = None) -> CoverCache:
+    settings = get_settings()
+    return CoverCache(root or settings.cover_cache_dir or settings.db_path.parent / "covers", settings.cover_sizes)
@@ -0,0 +1,75 @@
+"""Download em segundo plano das capas indicadas pelos provedores (``edition.cover_url``)."""
+
+from __future__ import annotations
+
+from threading import Event
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import select, update
+
+from mai.core.config import get_settings
+from mai.core.logging import logger
+from mai.covers.cache import CoverCache, CoverError, get_cover_cache
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest.ratelimit import get_limiter
+
+DOWNLOAD_BATCH = 50
+# Open Library devolve um GIF de 1x1 (~43 bytes) quando não tem a capa
+MIN_COVER_BYTES = 1024
+
+
+def download_cover(client: httpx.Client, url: str, cache: CoverCache) -> Optional[str]:
+    get_limiter(urlsplit(url).hostname or "covers").acquire()
+    response = client.get(url)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    if len(response.content) < MIN_COVER_BYTES:
+        return None
+    return cache.store(response.content)
+
+
+def fetch_missing_covers(stop_event: Optional[Event] = None, batch_size: int = DOWNLOAD_BATCH) -> int:
+    """Baixa as capas de edições com ``cover_url`` e sem ``cover_path``; uma passada pelo catálogo."""
+    settings = get_settings()
+    cache = get_cover_cache()
+    total = 0
+    last_id = 0
+    with httpx.Client(timeout=httpx.Timeout(settings.provider_timeout), follow_redirects=True) as client:
+        while not (stop_event and stop_event.is_set()):
+            with session_scope() as session:
+                rows = session.execute(
+                    select(models.Edition.id, models.Edition.cover_url)
+                    .where(
+                        models.Edition.id > last_id,
+                        models.Edition.cover_url.is_not(None),
+                        models.Edition.cover_path.is_(None),
+                    )
+                    .order_by(models.Edition.id)
+                    .limit(batch_size)
+                ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            updates = []
+            for edition_id, url in rows:
+                if stop_event and stop_event.is_set():
+                    break
+                try:
+                    cover_path = download_cover(client, url, cache)
+                except (httpx.HTTPError, CoverError, OSError) as exc:
+                    logger.debug("Capa da edição %s não baixada (%s): %s", edition_id, url, exc)
+                    continue
+                if cover_path:
+                    updates.append({"id": edition_id, "cover_path": cover_path})
+            if updates:
+                # transação curta: os downloads acontecem fora dela
+                with session_scope() as session:
+                    session.execute(update(models.Edition), updates)
+                total += len(updates)
+    if total:
+        logger.info("Capas baixadas para %s edições", total)
+    return total
@@ -0,0 +1,70 @@
+"""Capa embutida no próprio arquivo do livro."""
+
+from __future__ import annotations
+
+import posixpath
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from mai.core.logging import logger
+from mai.covers.cache import CoverError, get_cover_cache
+
+if TYPE_CHECKING:  # pragma: no cover - mai.ingest importa este módulo
+    from mai.ingest.types import LocalMetadata
+
+try:  # Optional dependency
+    import fitz  # PyMuPDF
+except ImportError:  # pragma: no cover - optional
+    fitz = None
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+# a primeira página só precisa cobrir a maior miniatura
+PDF_RENDER_DPI = 96
+
+
+def read_cover_bytes(path: Path, local: LocalMetadata) -> Optional[bytes]:
+    ext = path.suffix.lower()
+    if ext == ".epub":
+        return _epub_cover(path, local.cover_href)
+    if ext == ".pdf":
+        return _pdf_cover(path)
+    # MOBI: a capa fica num registro de imagem indicado pelo EXTH 201; ainda não suportado
+    return None
+
+
+def extract_local_cover(path: Path, local: LocalMetadata) -> Optional[str]:
+    """Grava no cache a capa embutida em ``path``; devolve o ``cover_path`` ou ``None``."""
+    try:
+        data = read_cover_bytes(path, local)
+        return get_cover_cache().store(data) if data else None
+    except (CoverError, OSError, zipfile.BadZipFile, RuntimeError) as exc:
+        logger.debug("Capa não extraída de %s: %s", path, exc)
+        return None
+
+
+def _epub_cover(path: Path, cover_href: Optional[str]) -> Optional[bytes]:
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        name = cover_href if cover_href in names else None
+        if name is None:
+            # EPUBs sem capa declarada no OPF costumam ter uma imagem chamada "cover"
+            name = next(
+                (
+                    item
+                    for item in names
+                    if "cover" in posixpath.basename(item).lower()
+                    and posixpath.splitext(item)[1].lower() in IMAGE_EXTENSIONS
+                ),
+                None,
+            )
+        return archive.read(name) if name else None
+
+
+def _pdf_cover(path: Path) -> Optional[bytes]:
+    if fitz is None:
+        return None
+    with fitz.open(path) as doc:
+        if doc.page_count == 0:
+            return None
+        return doc[0].get_pixmap(dpi=PDF_RENDER_DPI).tobytes("png")
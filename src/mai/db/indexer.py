@@ -1,15 +1,35 @@
+"""Manutenção do índice FTS ``search``.
+
+Escritas apenas marcam edições como sujas (explicitamente via ``mark_dirty`` ou
+detectado no ``after_flush`` quando uma coluna indexada muda); o índice é
+atualizado em lote no ``before_commit``. Em importações grandes, as sessões
+abertas com ``session_scope(bulk_index=True)`` pulam o trabalho por linha e
+``bulk_index`` reconstrói tudo uma vez no final; as demais sessões do processo
+(API, watcher) continuam mantendo o índice normalmente.
+"""
+
 from __future__ import annotations
 
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Set
+
+from sqlalchemy import bindparam, event, inspect, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from mai.db import models
+
+DIRTY_EDITIONS = "search_dirty_editions"
+DIRTY_WORKS = "search_dirty_works"
+# em ``session.info``: a sessão pertence a uma importação em massa
+BULK_INDEX = "search_bulk_index"
+CHUNK = 500
 
 DELETE_SQL = text(
     "INSERT INTO search(search, rowid, title, authors, series, publisher, tags)"
     " VALUES('delete', :edition_id, NULL, NULL, NULL, NULL, NULL)"
 )
 
-INSERT_SQL = text(
-    """
+_SELECT_SQL = """
     INSERT INTO search(rowid, title, authors, series, publisher, tags)
     SELECT
       e.id,
@@ -35,11 +55,156 @@ INSERT_SQL = text(
       ), '')
     FROM edition e
     LEFT JOIN work w ON w.id = e.work_id
-    WHERE e.id = :edition_id
-    """
-)
+"""
 
+INSERT_SQL = text(_SELECT_SQL + " WHERE e.id = :edition_id")
+REBUILD_SQL = text(_SELECT_SQL)
+CLEAR_SQL = text("INSERT INTO search(search) VALUES('delete-all')")
+INDEXED_SQL = text("SELECT rowid FROM search WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True))
+
+# colunas/relacionamentos que alimentam o índice, por modelo
+INDEXED_ATTRS = {
+    models.Edition: ("title", "publisher", "work_id", "tags"),
+    models.Work: ("title", "authors"),
+    models.Author: ("name",),
+    models.Series: ("name",),
+    models.Tag: ("name",),
+    models.SeriesEntry: ("work_id", "series_id"),
+}
 
 def upsert_for_edition(session: Session, edition_id: int) -> None:
-    session.execute(DELETE_SQL, {"edition_id": edition_id})
-    session.execute(INSERT_SQL, {"edition_id": edition_id})
+    upsert_for_editions(session, [edition_id])
+
+
+def upsert_for_editions(session: Session, edition_ids: Iterable[int]) -> None:
+    """Reindexa imediatamente; prefira ``mark_dirty`` para agrupar no commit."""
+    edition_ids = list(edition_ids)
+    for start in range(0, len(edition_ids), CHUNK):
+        chunk = edition_ids[start : start + CHUNK]
+        # 'delete' de um rowid ausente corrompe uma tabela FTS5 contentless
+        indexed = session.scalars(INDEXED_SQL, {"ids": chunk})
+        deletes = [{"edition_id": edition_id} for edition_id in indexed]
+        if deletes:
+            session.execute(DELETE_SQL, deletes)
+        session.execute(INSERT_SQL, [{"edition_id": edition_id} for edition_id in chunk])
+
+
+def mark_dirty(session: Session, edition_ids: Iterable[int]) -> None:
+    session.info.setdefault(DIRTY_EDITIONS, set()).update(i for i in edition_ids if i is not None)
+
+
+def mark_works_dirty(session: Session, work_ids: Iterable[int]) -> None:
+    """Todas as edições das obras serão reindexadas (autores/séries são por obra)."""
+    session.info.setdefault(DIRTY_WORKS, set()).update(i for i in work_ids if i is not None)
+
+
+def bulk_active(session: Session) -> bool:
+    return bool(session.info.get(BULK_INDEX))
+
+
+@contextmanager
+def bulk_index() -> Iterator[None]:
+    """Reconstrói o índice inteiro na saída, inclusive se a importação for cancelada ou falhar.
+
+    Quem escreve dentro do bloco usa ``session_scope(bulk_index=True)`` para pular a manutenção por linha.
+    """
+    try:
+        yield
+    finally:
+        from mai.db.session import session_scope
+
+        with session_scope() as session:
+            rebuild(session)
+
+
+def rebuild(session: Session) -> None:
+    session.execute(CLEAR_SQL)
+    session.execute(REBUILD_SQL)
+
+
+def flush_dirty(session: Session) -> None:
+    editions: Set[int] = session.info.pop(DIRTY_EDITIONS, set())
+    works: Set[int] = session.info.pop(DIRTY_WORKS, set())
+    if bulk_active(session):
+        return
+    if works:
+        work_ids = list(works)
+        for start in range(0, len(work_ids), CHUNK):
+            chunk = work_ids[start : start + CHUNK]
+            editions.update(session.scalars(select(models.Edition.id).where(models.Edition.work_id.in_(chunk))))
+    if editions:
+        upsert_for_editions(session, sorted(editions))
+
+
+def _changed(obj, attrs) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    if bulk_active(session):
+        return
+    editions, works = set(), set()
+    authors, series, tags = set(), set(), set()
+    for obj in session.new:
+        if isinstance(obj, models.Edition):
+            editions.add(obj.id)
+        elif isinstance(obj, models.SeriesEntry):
+            works.add(obj.work_id)
+    for obj in session.dirty:
+        attrs = INDEXED_ATTRS.get(type(obj))
+        if not attrs or not _changed(obj, attrs):
+            continue
+        if isinstance(obj, models.Edition):
+            editions.add(obj.id)
+        elif isinstance(obj, models.Work):
+            works.add(obj.id)
+        elif isinstance(obj, models.Author):
+            authors.add(obj.id)
+        elif isinstance(obj, models.Series):
+            series.add(obj.id)
+        elif isinstance(obj, models.Tag):
+            tags.add(obj.id)
+        elif isinstance(obj, models.SeriesEntry):
+            works.add(obj.work_id)
+            works.update(inspect(obj).attrs.work_id.history.deleted or ())
+    for obj in session.deleted:
+        if isinstance(obj, models.SeriesEntry):
+            works.add(obj.work_id)
+
+    if authors:
+        works.update(
+            session.scalars(select(models.WorkAuthor.work_id).where(models.WorkAuthor.author_id.in_(authors)))
+        )
+    if series:
+        works.update(
+            session.scalars(select(models.SeriesEntry.work_id).where(models.SeriesEntry.series_id.in_(series)))
+        )
+    if tags:
+        editions.update(
+            session.scalars(select(models.BookTag.edition_id).where(models.BookTag.tag_id.in_(tags)))
+        )
+    mark_dirty(session, editions)
+    mark_works_dirty(session, works)
+
+    # edições removidas saem do índice pelo trigger trg_search_delete
+    deleted = {obj.id for obj in session.deleted if isinstance(obj, models.Edition)}
+    if deleted:
+        session.info[DIRTY_EDITIONS] -= deleted
+
+
+def _before_commit(session: Session) -> None:
+    session.flush()
+    flush_dirty(session)
+
+
+def _discard(session: Session, previous_transaction=None) -> None:
+    session.info.pop(DIRTY_EDITIONS, None)
+    session.info.pop(DIRTY_WORKS, None)
+
+
+def register(factory: sessionmaker) -> None:
+    """Liga a manutenção do índice às sessões criadas por ``factory``."""
+    event.listen(factory, "after_flush", _after_flush)
+    event.listen(factory, "before_commit", _before_commit)
+    event.listen(factory, "after_rollback", _discard)
@@ -2,10 +2,59 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 from mai.core.config import get_settings
 from mai.core.logging import logger
 from mai.db.session import get_engine
+from mai.utils.text import name_key, normalize
+
+
+# Colunas adicionadas após a criação inicial das tabelas: ``CREATE TABLE IF NOT EXISTS``
+# não altera bancos existentes, então elas são acrescentadas antes de rodar o schema.
+COLUMN_MIGRATIONS: Dict[str, List[Tuple[str, str]]] = {
+    "file": [("device", "INTEGER"), ("inode", "INTEGER"), ("mtime_ns", "INTEGER"), ("quick_hash", "TEXT")],
+    "author": [("norm_name", "TEXT")],
+    "task": [
+        ("priority", "INTEGER NOT NULL DEFAULT 0"),
+        ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+        ("max_attempts", "INTEGER NOT NULL DEFAULT 3"),
+        ("run_after", "TEXT"),
+        ("lease_owner", "TEXT"),
+        ("lease_expires_at", "TEXT"),
+        ("heartbeat_at", "TEXT"),
+        ("error", "TEXT"),
+        ("progress_json", "TEXT"),
+        ("cancel_requested", "INTEGER NOT NULL DEFAULT 0"),
+    ],
+}
+
+
+def _migrate_columns(raw) -> None:
+    cursor = raw.cursor()
+    try:
+        for table, columns in COLUMN_MIGRATIONS.items():
+            existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+            if not existing:
+                continue
+            for name, ddl in columns:
+                if name not in existing:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+                    logger.info("Coluna %s.%s adicionada", table, name)
+    finally:
+        cursor.close()
+
+
+def _backfill_normalized(raw) -> None:
+    """Preenche formas normalizadas de linhas anteriores às colunas."""
+    raw.create_function("mai_name_key", 1, name_key, deterministic=True)
+    raw.create_function("mai_normalize", 1, normalize, deterministic=True)
+    cursor = raw.cursor()
+    try:
+        cursor.execute("UPDATE author SET norm_name = mai_name_key(name) WHERE norm_name IS NULL")
+        cursor.execute("UPDATE work SET sort_title = mai_normalize(title) WHERE sort_title IS NULL")
+    finally:
+        cursor.close()
 
 
 def apply_schema(schema_path: Path | None = None) -> None:
@@ -15,7 +64,9 @@ def apply_schema(schema_path: Path | None = None) -> None:
     engine = get_engine()
     raw = engine.raw_connection()
     try:
+        _migrate_columns(raw)
         raw.executescript(sql)
+        _backfill_normalized(raw)
         raw.commit()
     finally:
         raw.close()
@@ -4,7 +4,9 @@ from datetime import datetime
 from typing import List, Optional
 
 from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+
+from mai.utils.text import name_key, normalize
 
 from .base import Base
 
@@ -35,6 +37,11 @@ class Work(Base):
         viewonly=False,
     )
 
+    @validates("title")
+    def _sync_sort_title(self, key: str, value: str) -> str:
+        self.sort_title = normalize(value)
+        return value
+
 
 class Edition(Base):
     __tablename__ = "edition"
@@ -68,12 +75,18 @@ class Author(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str]
     sort_name: Mapped[Optional[str]]
+    norm_name: Mapped[Optional[str]]
 
     works: Mapped[List[Work]] = relationship(
         secondary="work_author",
         back_populates="authors",
     )
 
+    @validates("name")
+    def _sync_norm_name(self, key: str, value: str) -> str:
+        self.norm_name = name_key(value)
+        return value
+
 
 class Identifier(Base):
     __tablename__ = "identifier"
@@ -95,14 +108,37 @@ class File(Base):
     ext: Mapped[Optional[str]]
     size_bytes: Mapped[Optional[int]]
     sha256: Mapped[Optional[str]]
+    quick_hash: Mapped[Optional[str]]
     mime: Mapped[Optional[str]]
     drm: Mapped[bool] = mapped_column(Boolean, default=False)
     added_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     last_seen: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    device: Mapped[Optional[int]]
+    inode: Mapped[Optional[int]]
+    mtime_ns: Mapped[Optional[int]]
 
     edition: Mapped[Optional[Edition]] = relationship(back_populates="files")
 
 
+class ScanDir(Base):
+    __tablename__ = "scan_dir"
+
+    path: Mapped[str] = mapped_column(primary_key=True)
+    mtime_ns: Mapped[int]
+    scanned_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class IngestFailure(Base):
+    __tablename__ = "ingest_failure"
+
+    path: Mapped[str] = mapped_column(primary_key=True)
+    size_bytes: Mapped[Optional[int]]
+    mtime_ns: Mapped[Optional[int]]
+    reason: Mapped[str]
+    attempts: Mapped[int] = mapped_column(Integer, default=1)
+    failed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class Tag(Base):
     __tablename__ = "tag"
 
@@ -136,6 +172,17 @@ class ProviderHit(Base):
     edition: Mapped[Optional[Edition]] = relationship()
 
 
+class ProviderCacheEntry(Base):
+    __tablename__ = "provider_cache"
+
+    provider: Mapped[str] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(primary_key=True)
+    lookup_key: Mapped[str] = mapped_column(primary_key=True)
+    payload_json: Mapped[Optional[str]]
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+
+
 class Series(Base):
     __tablename__ = "series"
 
@@ -167,6 +214,16 @@ class Task(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     started_at: Mapped[Optional[datetime]]
     finished_at: Mapped[Optional[datetime]]
+    priority: Mapped[int] = mapped_column(default=0)
+    attempts: Mapped[int] = mapped_column(default=0)
+    max_attempts: Mapped[int] = mapped_column(default=3)
+    run_after: Mapped[Optional[datetime]]
+    lease_owner: Mapped[Optional[str]]
+    lease_expires_at: Mapped[Optional[datetime]]
+    heartbeat_at: Mapped[Optional[datetime]]
+    error: Mapped[Optional[str]]
+    progress_json: Mapped[Optional[str]]
+    cancel_requested: Mapped[bool] = mapped_column(default=False)
 
 
 class IdentifyResult(Base):
@@ -7,6 +7,7 @@ from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker, close_all_sessions
 
 from mai.core.config import get_settings
+from mai.db import indexer
 
 _engine: Engine | None = None
 _SessionFactory: sessionmaker | None = None
@@ -25,6 +26,9 @@ def get_engine() -> Engine:
         def set_sqlite_pragma(dbapi_connection, connection_record):  # type: ignore[override]
             cursor = dbapi_connection.cursor()
             cursor.execute("PRAGMA foreign_keys=ON")
+            # WAL permite leitores dos estágios de ingestão em paralelo ao escritor único
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA busy_timeout=30000")
             cursor.close()
 
     return _engine
@@ -34,6 +38,7 @@ def get_session_factory() -> sessionmaker:
     global _SessionFactory
     if _SessionFactory is None:
         _SessionFactory = sessionmaker(bind=get_engine(), autoflush=False, autocommit=False)
+        indexer.register(_SessionFactory)
     return _SessionFactory
 
 
@@ -42,8 +47,11 @@ def get_session() -> Session:
 
 
 @contextmanager
-def session_scope() -> Session:
+def session_scope(bulk_index: bool = False) -> Session:
+    """Transação com commit/rollback; ``bulk_index`` deixa o índice para ``indexer.bulk_index``."""
     session = get_session()
+    if bulk_index:
+        session.info[indexer.BULK_INDEX] = True
     try:
         yield session
         session.commit()
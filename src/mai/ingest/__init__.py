@@ -1,3 +1,4 @@
 """Pipeline de ingestão da MAI."""
 
-from .pipeline import ingest_paths, watch_directories  # noqa: F401
+from .pipeline import ingest_paths  # noqa: F401
+from .watcher import watch_directories  # noqa: F401
@@ -0,0 +1,267 @@
+"""Persistência em lote dos arquivos novos de um scan.
+
+Obras, autores e identificadores são resolvidos com uma consulta por lote (e
+``INSERT ... ON CONFLICT``) em vez de SELECTs por arquivo; o escritor do
+``IngestEngine`` grava cada lote em uma única transação.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from mai.core.logging import logger
+from mai.db import models
+from mai.db.indexer import mark_works_dirty
+from mai.ingest.fingerprint import fill_hashes
+from mai.ingest.known import stat_fields
+from mai.ingest.pipeline import (
+    _candidate_remote_id,
+    author_names,
+    collect_identifiers,
+    edition_fields,
+    file_fields,
+    identification_values,
+    match_event_rows,
+    prune_editions,
+    work_fields,
+)
+from mai.ingest.types import LocalMetadata
+from mai.utils.files import compute_quick_hash, compute_sha256
+from mai.utils.hashing import get_hash_service
+from mai.utils.text import name_key
+
+if TYPE_CHECKING:  # pragma: no cover
+    from mai.ingest.engine import IngestRecord
+
+LOOKUP_CHUNK = 500
+
+
+@dataclass
+class _Plan:
+    record: "IngestRecord"
+    local: LocalMetadata
+    title: str
+    sort_title: str
+    language: Optional[str]
+    authors: List[str]
+    edition_id: Optional[int] = None
+
+
+def persist_batch(session, records: Sequence["IngestRecord"]) -> List["IngestRecord"]:
+    """Persiste registros novos já enriquecidos; devolve os que criaram edição."""
+    now = datetime.utcnow()
+    records = _touch_known(session, records, now)
+    if not records:
+        return []
+
+    plans = []
+    for record in records:
+        local = record.local or LocalMetadata(title=record.path.stem)
+        title, sort_title, language = work_fields(record.path, local, record.candidate)
+        plans.append(
+            _Plan(record, local, title, sort_title, language, author_names(local, record.candidate))
+        )
+
+    works = {
+        plan.sort_title: {
+            "title": plan.title,
+            "sort_title": plan.sort_title,
+            "language": plan.language,
+            "description": plan.local.description,
+            "created_at": now,
+        }
+        for plan in plans
+    }
+    work_ids = _resolve(session, models.Work, models.Work.sort_title, works)
+    _link_series(session, plans, work_ids)
+    authors = {name_key(name): {"name": name, "norm_name": name_key(name)} for plan in plans for name in plan.authors}
+    author_ids = _resolve(session, models.Author, models.Author.norm_name, authors)
+
+    links = {(work_ids[plan.sort_title], author_ids[name_key(name)]) for plan in plans for name in plan.authors}
+    session.execute(
+        sqlite_insert(models.WorkAuthor).on_conflict_do_nothing(),
+        [{"work_id": work_id, "author_id": author_id, "role": "author"} for work_id, author_id in links],
+    )
+
+    edition_rows = [
+        {
+            "work_id": work_ids[plan.sort_title],
+            "created_at": now,
+            **edition_fields(plan.record.path, plan.local, plan.record.candidate),
+        }
+        for plan in plans
+    ]
+    edition_ids = session.scalars(
+        insert(models.Edition).returning(models.Edition.id, sort_by_parameter_order=True), edition_rows
+    ).all()
+    for plan, edition_id in zip(plans, edition_ids):
+        plan.edition_id = edition_id
+    # inserts em massa não passam pelo after_flush; inclui edições antigas que ganharam autor
+    mark_works_dirty(session, work_ids.values())
+
+    identifier_rows = [
+        {"edition_id": plan.edition_id, "scheme": scheme, "value": value}
+        for plan in plans
+        for scheme, value in collect_identifiers(plan.local, plan.record.candidate)
+    ]
+    if identifier_rows:
+        session.execute(
+            sqlite_insert(models.Identifier).on_conflict_do_nothing(index_elements=["scheme", "value"]),
+            identifier_rows,
+        )
+
+    _upsert_files(session, plans, now)
+    _upsert_provider_hits(session, plans, now)
+
+    session.execute(
+        insert(models.IdentifyResult),
+        [
+            identification_values(plan.edition_id, plan.record.ranked, plan.record.candidate, plan.record.top_score)
+            for plan in plans
+        ],
+    )
+    events = [
+        row
+        for plan in plans
+        for row in match_event_rows(plan.edition_id, plan.record.ranked, plan.record.candidate)
+    ]
+    if events:
+        session.execute(insert(models.MatchEvent), events)
+    return [plan.record for plan in plans]
+
+
+def _confirm_collisions(session, records: Sequence["IngestRecord"]) -> None:
+    """Impressões rápidas repetidas no lote ou já gravadas (ex.: lote anterior) ganham SHA-256."""
+    pending = [record for record in records if record.sha256 is None and record.quick_hash]
+    if not pending:
+        return
+    counts = Counter(record.quick_hash for record in pending)
+    stored = _lookup(session, models.File.quick_hash, models.File.id, counts)
+    colliding = {quick_hash for quick_hash, count in counts.items() if count > 1 or quick_hash in stored}
+    if not colliding:
+        return
+    hashes = get_hash_service()
+    futures = [
+        (record, hashes.submit(record.path, compute_sha256, record.path))
+        for record in pending
+        if record.quick_hash in colliding
+    ]
+    for record, future in futures:
+        record.sha256 = future.result()
+    fill_hashes(session, models.File.quick_hash.in_(colliding), models.File.sha256.is_(None))
+
+
+def _touch_known(session, records: Sequence["IngestRecord"], now: datetime) -> List["IngestRecord"]:
+    """Conteúdo já catalogado (mesmo SHA-256) só tem caminho e stat atualizados."""
+    _confirm_collisions(session, records)
+    known = _lookup(session, models.File.sha256, models.File.id, {record.sha256 for record in records})
+    touches: List[dict] = []
+    fresh: List["IngestRecord"] = []
+    seen: Set[str] = set()
+    for record in records:
+        if record.sha256 in known:
+            touches.append(
+                {
+                    "id": known[record.sha256],
+                    "path": str(record.path),
+                    "last_seen": now,
+                    "quick_hash": record.quick_hash or compute_quick_hash(record.path),
+                    **stat_fields(record.stat or record.path.stat()),
+                }
+            )
+        elif record.sha256 and record.sha256 in seen:
+            logger.info("Arquivo duplicado no lote ignorado: %s", record.path)
+        else:
+            if record.sha256:
+                seen.add(record.sha256)
+            fresh.append(record)
+    if touches:
+        session.execute(update(models.File), touches)
+    return fresh
+
+
+def _lookup(session, key_column, id_column, keys: Iterable) -> Dict:
+    keys = [key for key in keys if key is not None]
+    found: Dict = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[start : start + LOOKUP_CHUNK]
+        rows = session.execute(
+            select(key_column, func.min(id_column)).where(key_column.in_(chunk)).group_by(key_column)
+        )
+        found.update({key: row_id for key, row_id in rows})
+    return found
+
+
+def _resolve(session, model, key_column, wanted: Dict[str, dict]) -> Dict[str, int]:
+    """Ids por chave natural, inserindo em lote as que ainda não existem."""
+    ids = _lookup(session, key_column, model.id, wanted)
+    missing = [values for key, values in wanted.items() if key not in ids]
+    if missing:
+        session.execute(insert(model), missing)
+        ids.update(_lookup(session, key_column, model.id, [values[key_column.key] for values in missing]))
+    return ids
+
+
+def _link_series(session, plans: List[_Plan], work_ids: Dict[str, int]) -> None:
+    entries = {
+        (plan.local.series, work_ids[plan.sort_title]): plan.local.series_index for plan in plans if plan.local.series
+    }
+    if not entries:
+        return
+    series_ids = _resolve(session, models.Series, models.Series.name, {name: {"name": name} for name, _ in entries})
+    session.execute(
+        sqlite_insert(models.SeriesEntry).on_conflict_do_nothing(),
+        [
+            {"series_id": series_ids[name], "work_id": work_id, "position": position}
+            for (name, work_id), position in entries.items()
+        ],
+    )
+
+
+def _upsert_files(session, plans: List[_Plan], now: datetime) -> None:
+    rows = [
+        {
+            "path": str(plan.record.path),
+            "edition_id": plan.edition_id,
+            "added_at": now,
+            "last_seen": now,
+            **file_fields(plan.record.path, plan.record.sha256, plan.record.stat, plan.record.quick_hash),
+        }
+        for plan in plans
+    ]
+    # conteúdo novo num caminho já catalogado: reaproveita a linha (path é UNIQUE)
+    replaced = _lookup(session, models.File.path, models.File.edition_id, [row["path"] for row in rows])
+    stmt = sqlite_insert(models.File)
+    updated = {key: stmt.excluded[key] for key in rows[0] if key not in ("path", "added_at")}
+    session.execute(stmt.on_conflict_do_update(index_elements=["path"], set_=updated), rows)
+    prune_editions(session, replaced.values())
+
+
+def _upsert_provider_hits(session, plans: List[_Plan], now: datetime) -> None:
+    rows = [
+        {
+            "provider": plan.record.candidate.source,
+            "remote_id": _candidate_remote_id(plan.record.candidate.ids),
+            "edition_id": plan.edition_id,
+            "payload_json": json.dumps(plan.record.candidate.payload, ensure_ascii=False),
+            "score": 1.0,
+            "fetched_at": now,
+        }
+        for plan in plans
+        if plan.record.candidate
+    ]
+    if not rows:
+        return
+    stmt = sqlite_insert(models.ProviderHit)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["provider", "remote_id"],
+        set_={key: stmt.excluded[key] for key in ("edition_id", "payload_json", "score", "fetched_at")},
+    )
+    session.execute(stmt, rows)
@@ -0,0 +1,169 @@
+"""Cache persistente (SQLite) das respostas dos provedores."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+
+from mai.core.config import get_settings
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest.providers import Provider
+from mai.ingest.types import Candidate
+
+KIND_ISBN = "isbn"
+KIND_SEARCH = "search"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        data = asdict(self)
+        data["hit_ratio"] = round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+        return data
+
+
+class ProviderCache:
+    def __init__(self, ttl: timedelta, negative_ttl: timedelta) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, kind: str, key: str) -> Tuple[bool, Optional[List[Candidate]]]:
+        """Retorna ``(encontrado, candidatos)``; lista vazia indica resposta negativa em cache."""
+        with session_scope() as session:
+            entry = session.get(models.ProviderCacheEntry, (provider, kind, key))
+            found = entry is not None and entry.expires_at > datetime.utcnow()
+            payload = entry.payload_json if found else None
+        with self._lock:
+            if not found:
+                self._stats.misses += 1
+            elif payload is None:
+                self._stats.negative_hits += 1
+            else:
+                self._stats.hits += 1
+        if not found:
+            return False, None
+        if payload is None:
+            return True, []
+        return True, [Candidate(**item) for item in json.loads(payload)]
+
+    def put(self, provider: str, kind: str, key: str, candidates: List[Candidate]) -> None:
+        now = datetime.utcnow()
+        payload = json.dumps([asdict(c) for c in candidates], ensure_ascii=False) if candidates else None
+        expires = now + (self.ttl if candidates else self.negative_ttl)
+        stmt = insert(models.ProviderCacheEntry).values(
+            provider=provider,
+            kind=kind,
+            lookup_key=key,
+            payload_json=payload,
+            fetched_at=now,
+            expires_at=expires,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["provider", "kind", "lookup_key"],
+            set_={"payload_json": payload, "fetched_at": now, "expires_at": expires},
+        )
+        with session_scope() as session:
+            session.execute(stmt)
+        with self._lock:
+            self._stats.stores += 1
+
+    def purge_expired(self) -> int:
+        with session_scope() as session:
+            result = session.execute(
+                delete(models.ProviderCacheEntry).where(models.ProviderCacheEntry.expires_at <= datetime.utcnow())
+            )
+            return result.rowcount or 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**asdict(self._stats))
+
+
+@lru_cache(maxsize=1)
+def get_provider_cache() -> ProviderCache:
+    settings = get_settings()
+    return ProviderCache(
+        ttl=timedelta(days=settings.provider_cache_ttl_days),
+        negative_ttl=timedelta(hours=settings.provider_cache_negative_ttl_hours),
+    )
+
+
+def cache_key(kind: str, value: str) -> str:
+    if kind == KIND_ISBN:
+        return "".join(ch for ch in value if ch.isdigit() or ch in "Xx").upper()
+    return " ".join(value.casefold().split())
+
+
+class CachedProvider(Provider):
+    """Envolve um provedor com cache read-through; erros nunca são cacheados."""
+
+    def __init__(self, inner: Provider, cache: ProviderCache, refresh: bool = False) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.refresh = refresh
+        self.slug = inner.slug
+
+    def refreshing(self) -> "CachedProvider":
+        """Cópia que ignora leituras do cache mas continua gravando respostas novas."""
+        return CachedProvider(self.inner, self.cache, refresh=True)
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def _lookup(self, kind: str, key: str) -> Tuple[bool, Optional[List[Candidate]]]:
+        if self.refresh:
+            return False, None
+        return self.cache.get(self.slug, kind, key)
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        key = cache_key(KIND_ISBN, isbn13)
+        found, cached = self._lookup(KIND_ISBN, key)
+        if found:
+            return cached[0] if cached else None
+        result = self.inner.get_by_isbn(isbn13)
+        self.cache.put(self.slug, KIND_ISBN, key, [result] if result else [])
+        return result
+
+    def search(self, query: str) -> List[Candidate]:
+        key = cache_key(KIND_SEARCH, query)
+        found, cached = self._lookup(KIND_SEARCH, key)
+        if found:
+            return cached or []
+        results = self.inner.search(query)
+        self.cache.put(self.slug, KIND_SEARCH, key, results)
+        return results
+
+    async def aget_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        key = cache_key(KIND_ISBN, isbn13)
+        found, cached = await asyncio.to_thread(self._lookup, KIND_ISBN, key)
+        if found:
+            return cached[0] if cached else None
+        result = await self.inner.aget_by_isbn(isbn13)
+        await asyncio.to_thread(self.cache.put, self.slug, KIND_ISBN, key, [result] if result else [])
+        return result
+
+    async def asearch(self, query: str) -> List[Candidate]:
+        key = cache_key(KIND_SEARCH, query)
+        found, cached = await asyncio.to_thread(self._lookup, KIND_SEARCH, key)
+        if found:
+            return cached or []
+        results = await self.inner.asearch(query)
+        await asyncio.to_thread(self.cache.put, self.slug, KIND_SEARCH, key, results)
+        return results
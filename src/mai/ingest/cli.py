@@ -5,7 +5,11 @@ from pathlib import Path
 
 from mai.core.config import get_settings
 from mai.core.logging import configure_logging, logger
-from mai.ingest.pipeline import build_providers, ingest_paths, watch_directories
+from mai.covers.downloader import fetch_missing_covers
+from mai.ingest.fingerprint import backfill_hashes
+from mai.ingest.pipeline import build_providers, close_providers, ingest_paths
+from mai.ingest.sandbox import shutdown_extractor_pool
+from mai.ingest.watcher import watch_directories
 
 
 def main() -> None:
@@ -13,6 +17,25 @@ def main() -> None:
     parser.add_argument("paths", nargs="*", type=Path, help="Pastas ou arquivos para processar")
     parser.add_argument("--watch", action="store_true", help="Ativa modo watcher usando watchdog")
     parser.add_argument("--google-key", dest="google_key", default=None, help="Chave API do Google Books")
+    parser.add_argument("--hash-workers", type=int, default=None, help="Workers de hash/extração")
+    parser.add_argument("--enrich-workers", type=int, default=None, help="Workers de enriquecimento (provedores)")
+    parser.add_argument("--full-rescan", action="store_true", help="Relista todos os diretórios, mesmo inalterados")
+    parser.add_argument(
+        "--bulk-index",
+        action="store_true",
+        default=None,
+        help="Reconstrói o índice de busca uma vez no final em vez de por lote",
+    )
+    parser.add_argument(
+        "--backfill-hashes",
+        action="store_true",
+        help="Calcula o SHA-256 dos arquivos catalogados só com a impressão rápida",
+    )
+    parser.add_argument(
+        "--fetch-covers",
+        action="store_true",
+        help="Baixa para o cache as capas indicadas pelos provedores",
+    )
     args = parser.parse_args()
 
     settings = get_settings()
@@ -25,10 +48,25 @@ def main() -> None:
     resolved = [path if path.is_absolute() else path.resolve() for path in paths]
     providers = build_providers(args.google_key or settings.google_books_key)
 
-    if args.watch:
-        watch_directories(resolved, providers)
-    else:
-        ingest_paths(resolved, providers)
+    try:
+        if args.watch:
+            watch_directories(resolved, providers)
+        else:
+            ingest_paths(
+                resolved,
+                providers,
+                hash_workers=args.hash_workers,
+                enrich_workers=args.enrich_workers,
+                full_rescan=args.full_rescan,
+                bulk_index=args.bulk_index,
+            )
+            if args.backfill_hashes:
+                backfill_hashes()
+            if args.fetch_covers:
+                fetch_missing_covers()
+    finally:
+        close_providers()
+        shutdown_extractor_pool()
     logger.info("Ingestão finalizada")
 
 
@@ -0,0 +1,347 @@
+"""Motor de ingestão em estágios.
+
+Descoberta -> hash/extração (pool) -> enriquecimento (pool) -> escritor único,
+ligados por filas limitadas para manter o uso de memória constante.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import update
+
+from mai.core.config import get_settings
+from mai.core.events import publish
+from mai.core.logging import logger
+from mai.db import indexer, models
+from mai.db.session import session_scope
+from mai.ingest import sandbox
+from mai.ingest.batch import persist_batch
+from mai.ingest.failures import Signature, clear_failures, is_known_failure, load_failures, record_failure
+from mai.ingest.fingerprint import peer_sha256, same_content_at_path
+from mai.ingest.known import KnownFile, KnownFiles, stat_fields
+from mai.ingest.pipeline import identify, persist, touch_existing
+from mai.ingest.progress import IngestProgress
+from mai.ingest.providers import Provider
+from mai.ingest.sandbox import ExtractionFailed
+from mai.ingest.scanner import DirectoryScanner
+from mai.ingest.types import Candidate, LocalMetadata
+from mai.utils.files import compute_quick_hash, compute_sha256
+from mai.utils.hashing import get_hash_service
+
+_STOP = object()
+
+
+TOUCH_BATCH_SIZE = 500
+IDLE_FLUSH_SECONDS = 2.0
+
+
+@dataclass
+class IngestRecord:
+    path: Path
+    source_dir: str = ""
+    stat: Optional[os.stat_result] = None
+    sha256: Optional[str] = None
+    quick_hash: Optional[str] = None
+    known_id: Optional[int] = None
+    local: Optional[LocalMetadata] = None
+    candidate: Optional[Candidate] = None
+    ranked: List[dict] = field(default_factory=list)
+    top_score: float = 0.0
+
+
+class IngestEngine:
+    def __init__(
+        self,
+        providers: List[Provider],
+        hash_workers: Optional[int] = None,
+        enrich_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        progress: Optional[IngestProgress] = None,
+    ) -> None:
+        settings = get_settings()
+        self.providers = providers
+        self.progress = progress or IngestProgress()
+        self.hash_workers = max(1, hash_workers or settings.ingest_hash_workers)
+        self.enrich_workers = max(1, enrich_workers or settings.ingest_enrich_workers)
+        size = max(1, queue_size or settings.ingest_queue_size)
+        self._hash_queue: queue.Queue = queue.Queue(maxsize=size)
+        self._enrich_queue: queue.Queue = queue.Queue(maxsize=size)
+        self._write_queue: queue.Queue = queue.Queue(maxsize=size)
+        self.commit_every = max(1, settings.ingest_commit_every)
+        self.known = KnownFiles()
+        self.failures: Dict[str, Signature] = {}
+        self.retry_failed = False
+        self.hashes = get_hash_service()
+        self._failed_dirs: Set[str] = set()
+        self._failed_lock = threading.Lock()
+        # primeira importação: as sessões do engine deixam o índice para a reconstrução final
+        self.bulk_index = False
+
+    def run(self, paths: List[Path], full_rescan: bool = False, bulk_index: Optional[bool] = None) -> None:
+        skip_unchanged = get_settings().scan_skip_unchanged_dirs and not full_rescan
+        with session_scope() as session:
+            self.known = KnownFiles.load(session)
+            self.failures = load_failures(session)
+            scanner = DirectoryScanner.load(session, paths, skip_unchanged=skip_unchanged)
+        # --full-rescan também tenta de novo os arquivos que falharam
+        self.retry_failed = full_rescan
+        logger.info("Scan iniciado com %s arquivos conhecidos", len(self.known))
+
+        if bulk_index is None:
+            # primeira importação: reconstruir o índice no fim sai mais barato que por lote
+            bulk_index = len(self.known) == 0
+        self.bulk_index = bulk_index
+        # a reconstrução roda também no cancelamento/erro, depois que os estágios pararam
+        with indexer.bulk_index() if bulk_index else nullcontext():
+            self._run_stages(paths, scanner)
+        self.progress.finish()
+
+        if self.progress.interrupted:
+            # parte dos arquivos nem foi listada: os mtimes não podem marcar os diretórios como vistos
+            logger.info("Scan cancelado: %s", self.progress.snapshot())
+            return
+        # só grava os mtimes depois que tudo foi persistido; diretórios com falha serão relistados
+        with self._session() as session:
+            scanner.save(session, paths, exclude=self._failed_dirs)
+        logger.info("Scan concluído: %s diretórios inalterados pulados", scanner.skipped)
+
+    def _run_stages(self, paths: List[Path], scanner: DirectoryScanner) -> None:
+        hashers = self._spawn("hash", self.hash_workers, self._hash_worker)
+        enrichers = self._spawn("enrich", self.enrich_workers, self._enrich_worker)
+        writer = self._spawn("writer", 1, self._writer)
+
+        try:
+            for root in paths:
+                for file_path in scanner.iter_files(root):
+                    if self.progress.interrupted:
+                        break
+                    self._hash_queue.put(IngestRecord(path=file_path, source_dir=str(file_path.parent)))
+                    self.progress.add("discovered")
+            self.progress.discovery_done()
+        finally:
+            self._drain(self._hash_queue, hashers)
+            self._drain(self._enrich_queue, enrichers)
+            self._drain(self._write_queue, writer)
+
+    def _session(self):
+        return session_scope(bulk_index=self.bulk_index)
+
+    def _mark_failed(self, record: IngestRecord) -> None:
+        with self._failed_lock:
+            self._failed_dirs.add(record.source_dir)
+        self.progress.add("failed")
+
+    def _spawn(self, name: str, count: int, target: Callable[[], None]) -> List[threading.Thread]:
+        threads = [
+            threading.Thread(target=target, name=f"mai-ingest-{name}-{idx}", daemon=True)
+            for idx in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    @staticmethod
+    def _drain(stage_queue: queue.Queue, threads: List[threading.Thread]) -> None:
+        for _ in threads:
+            stage_queue.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    def _hash_worker(self) -> None:
+        while True:
+            record = self._hash_queue.get()
+            if record is _STOP:
+                return
+            if self.progress.interrupted:
+                continue  # cancelado: o que ainda está na fila fica para o próximo scan
+            started = time.monotonic()
+            try:
+                record.path = record.path.resolve()
+                record.stat = record.path.stat()
+                match = self.known.match_stat(record.path, record.stat)
+                skip = not self.retry_failed and is_known_failure(self.failures, record.path, record.stat)
+                if match is None and skip:
+                    logger.debug("Extração já falhou para %s; arquivo inalterado, pulando", record.path)
+                    self.progress.add("skipped")
+                    continue
+                if match is None:
+                    record.quick_hash = self.hashes.submit(
+                        record.path, compute_quick_hash, record.path, record.stat.st_size
+                    ).result()
+                    match = self._match_content(record)
+                if match is not None:
+                    record.known_id = match.id
+                    record.sha256 = record.sha256 or match.sha256
+                    record.quick_hash = record.quick_hash or match.quick_hash
+                    self._stage_done("hash", started)
+                    self._write_queue.put(record)
+                    continue
+                record.local = sandbox.extract_metadata(record.path)
+                record.local.identifiers.append(record.path.stem)
+                if str(record.path) in self.failures:
+                    with self._session() as session:
+                        clear_failures(session, [str(record.path)])
+            except ExtractionFailed as exc:
+                if not exc.permanent:
+                    logger.warning("Extração interrompida para %s: %s", record.path, exc)
+                    self._mark_failed(record)  # diretório relistado no próximo scan
+                    continue
+                with self._session() as session:
+                    record_failure(session, record.path, record.stat, str(exc))
+                self.progress.add("failed")
+                continue
+            except Exception as exc:  # pragma: no cover - log and continue
+                logger.exception("Falha ao ler %s: %s", record.path, exc)
+                self._mark_failed(record)
+                continue
+            self._stage_done("hash", started)
+            self._enrich_queue.put(record)
+
+    def _stage_done(self, stage: str, started: float) -> None:
+        self.progress.timed(stage, time.monotonic() - started)
+        self.progress.add("hashed" if stage == "hash" else "enriched")
+
+    def _match_content(self, record: IngestRecord) -> Optional[KnownFile]:
+        """Só lê o arquivo inteiro quando a impressão rápida coincide com a de outro."""
+        peers = self.known.content_peers(record.quick_hash, record.stat.st_size)
+        if not peers:
+            return None
+        record.sha256 = self.hashes.submit(record.path, compute_sha256, record.path).result()
+        match = self.known.match_sha(record.sha256)
+        if match is not None:
+            return match
+        path = str(record.path)
+        for peer in peers:
+            if peer.sha256 is not None:
+                continue
+            if peer.path == path:
+                if same_content_at_path(peer, path, record.quick_hash, record.stat.st_size):
+                    return peer
+            elif peer_sha256(peer.path, None) == record.sha256:
+                return peer
+        return None
+
+    def _enrich_worker(self) -> None:
+        while True:
+            record = self._enrich_queue.get()
+            if record is _STOP:
+                return
+            if self.progress.interrupted:
+                continue
+            started = time.monotonic()
+            try:
+                record.candidate, record.top_score, record.ranked = identify(record.local, self.providers)
+            except Exception as exc:  # pragma: no cover - segue sem candidatos
+                logger.warning("Enriquecimento falhou para %s: %s", record.path, exc)
+            self._stage_done("enrich", started)
+            self._write_queue.put(record)
+
+    def _writer(self) -> None:
+        touches: List[dict] = []
+        fresh: List[IngestRecord] = []
+        while True:
+            try:
+                record = self._write_queue.get(timeout=IDLE_FLUSH_SECONDS)
+            except queue.Empty:
+                # enriquecimento lento: não segura o lote parcial indefinidamente
+                self._flush_fresh(fresh)
+                continue
+            if record is _STOP:
+                self._flush_touches(touches)
+                self._flush_fresh(fresh)
+                return
+            if record.known_id is not None:
+                touches.append(
+                    {
+                        "id": record.known_id,
+                        "path": str(record.path),
+                        "last_seen": datetime.utcnow(),
+                        "sha256": record.sha256,
+                        "quick_hash": record.quick_hash,
+                        **stat_fields(record.stat),
+                    }
+                )
+                if len(touches) >= TOUCH_BATCH_SIZE:
+                    self._flush_touches(touches)
+                continue
+            fresh.append(record)
+            if len(fresh) >= self.commit_every:
+                self._flush_fresh(fresh)
+
+    def _flush_fresh(self, batch: List[IngestRecord]) -> None:
+        """Persiste os arquivos novos em uma transação; se o lote falhar, um a um."""
+        if not batch:
+            return
+        started = time.monotonic()
+        try:
+            with self._session() as session:
+                created = persist_batch(session, batch)
+            logger.info("Lote gravado: %s arquivos, %s novos", len(batch), len(created))
+            self.progress.add("persisted", len(batch))
+            for record in batch:
+                self._announce(record)
+        except Exception as exc:
+            logger.warning("Falha ao gravar lote de %s arquivos (%s); gravando individualmente", len(batch), exc)
+            for record in batch:
+                self._persist_one(record)
+        self.progress.timed("write", time.monotonic() - started, len(batch))
+        batch.clear()
+
+    @staticmethod
+    def _announce(record: IngestRecord) -> None:
+        publish(
+            "file.ingested",
+            path=str(record.path),
+            title=record.local.title if record.local else record.path.stem,
+            matched=record.candidate.source if record.candidate else None,
+            score=round(record.top_score, 3),
+        )
+
+    def _persist_one(self, record: IngestRecord) -> None:
+        try:
+            with self._session() as session:
+                if touch_existing(session, record.path, record.sha256, record.stat):
+                    return
+                persist(
+                    session,
+                    record.path,
+                    record.sha256,
+                    record.local or LocalMetadata(title=record.path.stem),
+                    record.candidate,
+                    record.ranked,
+                    record.top_score,
+                    quick_hash=record.quick_hash,
+                )
+            logger.info("Ingestão concluída para %s", record.path)
+            self.progress.add("persisted")
+            self._announce(record)
+        except Exception as exc:  # pragma: no cover - log and continue
+            logger.exception("Falha ao persistir %s: %s", record.path, exc)
+            self._mark_failed(record)
+
+    def _flush_touches(self, touches: List[dict]) -> None:
+        """Atualiza ``last_seen``/stat dos arquivos já conhecidos em um único UPDATE em lote."""
+        if not touches:
+            return
+        try:
+            with self._session() as session:
+                session.execute(update(models.File), touches)
+        except Exception:  # pragma: no cover - ex.: caminho reutilizado por outro registro
+            for row in touches:
+                try:
+                    with self._session() as session:
+                        session.execute(update(models.File), [row])
+                except Exception as exc:
+                    logger.warning("Falha ao atualizar arquivo %s: %s", row["path"], exc)
+        logger.debug("%s arquivos inalterados atualizados", len(touches))
+        self.progress.add("unchanged", len(touches))
+        touches.clear()
@@ -0,0 +1,118 @@
+"""Leitura direta dos cabeçalhos PalmDB/MOBI/EXTH de arquivos MOBI e AZW/AZW3.
+
+Só o registro 0 interessa: cabeçalho PalmDOC, cabeçalho MOBI (título completo,
+codificação, idioma) e o bloco EXTH logo depois. São lidos alguns KB do
+início do arquivo, sem descompactar o texto do livro.
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from mai.ingest.types import LocalMetadata
+from mai.utils.text import strip_tags
+
+PALMDB_HEADER_SIZE = 78
+RECORD0_MAX_BYTES = 64 * 1024
+MOBI_TYPES = {b"BOOKMOBI", b"TEXtREAd"}
+EXTH_FLAG = 0x40
+
+EXTH_AUTHOR = 100
+EXTH_PUBLISHER = 101
+EXTH_DESCRIPTION = 103
+EXTH_ISBN = 104
+EXTH_PUBLISHED = 106
+EXTH_ASIN = 113
+EXTH_UPDATED_TITLE = 503
+EXTH_ASIN_ALT = 504
+EXTH_LANGUAGE = 524
+
+# ids de idioma do Windows usados no campo ``locale`` do cabeçalho MOBI
+LOCALE_LANGUAGES = {
+    0x07: "de",
+    0x09: "en",
+    0x0A: "es",
+    0x0C: "fr",
+    0x10: "it",
+    0x11: "ja",
+    0x13: "nl",
+    0x16: "pt",
+    0x19: "ru",
+    0x04: "zh",
+}
+YEAR_PATTERN = re.compile(r"\d{4}")
+
+
+class MobiError(ValueError):
+    """Arquivo sem cabeçalho MOBI reconhecível."""
+
+
+def read_mobi_metadata(path: Path) -> LocalMetadata:
+    with path.open("rb") as handle:
+        header = handle.read(PALMDB_HEADER_SIZE + 16)
+        if len(header) < PALMDB_HEADER_SIZE + 16 or header[60:68] not in MOBI_TYPES:
+            raise MobiError("cabeçalho PalmDB ausente")
+        (count,) = struct.unpack_from(">H", header, 76)
+        rec0, rec1 = struct.unpack_from(">L4xL", header, PALMDB_HEADER_SIZE)
+        if count < 2 or rec1 <= rec0:
+            rec1 = rec0 + RECORD0_MAX_BYTES
+        handle.seek(rec0)
+        record = handle.read(min(rec1 - rec0, RECORD0_MAX_BYTES))
+    return parse_record0(record)
+
+
+def parse_record0(record: bytes) -> LocalMetadata:
+    if len(record) < 0x84 or record[16:20] != b"MOBI":
+        raise MobiError("cabeçalho MOBI ausente")
+    header_length, _, encoding = struct.unpack_from(">LLL", record, 20)
+    name_offset, name_length, locale = struct.unpack_from(">LLL", record, 0x54)
+    (flags,) = struct.unpack_from(">L", record, 0x80)
+    charset = "utf-8" if encoding == 65001 else "cp1252"
+
+    exth: Dict[int, List[bytes]] = {}
+    if flags & EXTH_FLAG:
+        exth = _parse_exth(record, 16 + header_length)
+
+    def text(value: bytes) -> str:
+        return value.decode(charset, errors="replace").strip("\x00 ")
+
+    def first(kind: int) -> Optional[str]:
+        values = [text(value) for value in exth.get(kind, [])]
+        return next((value for value in values if value), None)
+
+    title = first(EXTH_UPDATED_TITLE) or text(record[name_offset : name_offset + name_length]) or None
+    identifiers = [value for value in (first(EXTH_ISBN), first(EXTH_ASIN) or first(EXTH_ASIN_ALT)) if value]
+    published = first(EXTH_PUBLISHED)
+    year = YEAR_PATTERN.search(published) if published else None
+    description = first(EXTH_DESCRIPTION)
+    if description:
+        description = " ".join(strip_tags(description).split()) or None
+    return LocalMetadata(
+        title=title,
+        authors=[value for value in (text(raw) for raw in exth.get(EXTH_AUTHOR, [])) if value],
+        identifiers=identifiers,
+        language=first(EXTH_LANGUAGE) or LOCALE_LANGUAGES.get(locale & 0xFF),
+        year=int(year.group()) if year else None,
+        publisher=first(EXTH_PUBLISHER),
+        description=description,
+    )
+
+
+def _parse_exth(record: bytes, offset: int) -> Dict[int, List[bytes]]:
+    if record[offset : offset + 4] != b"EXTH" or offset + 12 > len(record):
+        return {}
+    (count,) = struct.unpack_from(">L", record, offset + 8)
+    position = offset + 12
+    values: Dict[int, List[bytes]] = {}
+    for _ in range(count):
+        if position + 8 > len(record):
+            break  # bloco truncado (registro 0 maior que o lido): fica com o que veio
+        kind, length = struct.unpack_from(">LL", record, position)
+        if length < 8:
+            break
+        values.setdefault(kind, []).append(record[position + 8 : position + length])
+        position += length
+    return values
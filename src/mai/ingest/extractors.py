@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import re
+import zipfile
 from pathlib import Path
-from typing import Optional
-
+from typing import Iterator, Optional, Tuple
+
+from mai.core.config import get_settings
+from mai.core.logging import logger
+from mai.covers.extract import extract_local_cover
+from mai.ingest.exth import MobiError, read_mobi_metadata
+from mai.ingest.isbn import find_isbn, first_isbn
+from mai.ingest.opf import OPFError, read_opf_metadata, read_spine
 from mai.ingest.types import LocalMetadata
+from mai.utils.text import strip_tags
 
 try:  # Optional dependency
     from ebooklib import epub
@@ -15,24 +24,96 @@ try:  # Optional dependency
 except ImportError:  # pragma: no cover - optional
     fitz = None
 
-try:  # Optional dependency for MOBI/AZW
-    from mobi import Mobi
-except ImportError:  # pragma: no cover
-    Mobi = None
+
+# páginas de créditos/ficha catalográfica costumam ter um destes nomes
+COPYRIGHT_HINTS = re.compile(r"copyright|colophon|imprint|rights|legal|credit|ficha|title|titulo|front", re.I)
+EPUB_DOC_MAX_BYTES = 256 * 1024
 
 
 def extract_metadata(path: Path) -> LocalMetadata:
     ext = path.suffix.lower()
     if ext == ".epub":
-        return extract_epub_meta(path)
+        meta = extract_epub_meta(path)
+    elif ext == ".pdf":
+        meta = extract_pdf_meta(path)
+    elif ext in {".mobi", ".azw", ".azw3"}:
+        meta = extract_mobi_meta(path)
+    else:
+        return LocalMetadata(title=path.stem)
+
+    settings = get_settings()
+    if settings.isbn_content_scan and first_isbn([*meta.identifiers, path.stem]) is None:
+        isbn = find_content_isbn(path)
+        if isbn:
+            logger.debug("ISBN %s encontrado no conteúdo de %s", isbn, path)
+            meta.identifiers.append(isbn)
+    if settings.cover_extract:
+        meta.cover_path = extract_local_cover(path, meta)
+    return meta
+
+
+def find_content_isbn(path: Path) -> Optional[str]:
+    """Procura um ISBN válido nas primeiras/últimas páginas; para no primeiro encontrado.
+
+    Nas páginas do fim só vale ISBN rotulado: ali costumam estar anúncios de outros livros.
+    """
+    ext = path.suffix.lower()
     if ext == ".pdf":
-        return extract_pdf_meta(path)
-    if ext in {".mobi", ".azw", ".azw3"}:
-        return extract_mobi_meta(path)
-    return LocalMetadata(title=path.stem)
+        texts = _pdf_texts(path)
+    elif ext == ".epub":
+        texts = _epub_texts(path)
+    else:
+        return None
+    try:
+        for text, tail in texts:
+            isbn = find_isbn(text, require_label=tail)
+            if isbn:
+                return isbn
+    except Exception as exc:  # pragma: no cover - arquivo corrompido não impede a ingestão
+        logger.debug("Falha ao ler conteúdo de %s: %s", path, exc)
+    return None
+
+
+def _pdf_texts(path: Path) -> Iterator[Tuple[str, bool]]:
+    """``(texto, é_página_do_fim)`` das páginas a examinar."""
+    if fitz is None:
+        return
+    settings = get_settings()
+    with fitz.open(path) as doc:
+        head = list(range(min(settings.isbn_scan_head_pages, doc.page_count)))
+        tail = range(max(len(head), doc.page_count - settings.isbn_scan_tail_pages), doc.page_count)
+        for number in head:
+            yield doc.load_page(number).get_text("text"), False
+        for number in tail:
+            yield doc.load_page(number).get_text("text"), True
+
+
+def _epub_texts(path: Path) -> Iterator[Tuple[str, bool]]:
+    limit = get_settings().isbn_scan_head_pages
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        try:
+            documents = [name for name in read_spine(archive) if name in names]
+        except OPFError:
+            documents = []
+        if not documents:
+            # sem spine legível: ordem do ZIP, que costuma seguir a de criação
+            documents = [name for name in archive.namelist() if name.lower().endswith((".xhtml", ".html", ".htm"))]
+        head = set(documents[:limit])
+        hinted = [name for name in documents if COPYRIGHT_HINTS.search(name.rsplit("/", 1)[-1])]
+        others = [name for name in documents[:limit] if name not in hinted]
+        for name in [*hinted, *others]:
+            with archive.open(name) as handle:
+                raw = handle.read(EPUB_DOC_MAX_BYTES)
+            # colofão no fim do livro: mesma regra das páginas finais do PDF
+            yield strip_tags(raw.decode("utf-8", errors="ignore")), name not in head
 
 
 def extract_epub_meta(path: Path) -> LocalMetadata:
+    try:
+        return read_opf_metadata(path)
+    except OPFError as exc:
+        logger.debug("OPF ilegível em %s (%s); usando ebooklib", path, exc)
     if epub is None:
         raise RuntimeError("ebooklib não instalado (pip install ebooklib)")
     book = epub.read_epub(str(path))
@@ -66,19 +147,11 @@ def extract_pdf_meta(path: Path) -> LocalMetadata:
 
 
 def extract_mobi_meta(path: Path) -> LocalMetadata:
-    if Mobi is None:  # optional dependency; fall back to filename-based metadata
+    try:
+        return read_mobi_metadata(path)
+    except MobiError as exc:
+        logger.warning("Cabeçalho MOBI ilegível em %s (%s); usando o nome do arquivo", path, exc)
         return LocalMetadata(title=path.stem)
-    book = Mobi(str(path))
-    book.parse()
-    metadata = book.getmetadata() or {}
-    title = metadata.get(b"Title")
-    author = metadata.get(b"Author")
-    identifier = metadata.get(b"ASIN")
-    return LocalMetadata(
-        title=title.decode("utf-8", errors="ignore") if isinstance(title, bytes) else title,
-        authors=[author.decode("utf-8", errors="ignore")] if isinstance(author, bytes) else ([author] if author else []),
-        identifiers=[identifier.decode("utf-8", errors="ignore")] if isinstance(identifier, bytes) else ([identifier] if identifier else []),
-    )
 
 
 def _year_from_date(value: Optional[str]) -> Optional[int]:
@@ -0,0 +1,63 @@
+"""Arquivos cuja extração falhou, para não tentá-los de novo a cada scan.
+
+Um registro vale enquanto o arquivo tiver o mesmo tamanho/mtime; se ele mudar
+(ex.: download refeito), a extração é tentada outra vez.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from mai.core.logging import logger
+from mai.db import models
+
+Signature = Tuple[Optional[int], Optional[int]]
+
+
+def load_failures(session) -> Dict[str, Signature]:
+    rows = session.execute(
+        select(models.IngestFailure.path, models.IngestFailure.size_bytes, models.IngestFailure.mtime_ns)
+    )
+    return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+
+def is_known_failure(failures: Dict[str, Signature], path: Path, st: os.stat_result) -> bool:
+    return failures.get(str(path)) == (st.st_size, st.st_mtime_ns)
+
+
+def failed_unchanged(session, path: Path, st: os.stat_result) -> bool:
+    failure = session.get(models.IngestFailure, str(path))
+    return failure is not None and (failure.size_bytes, failure.mtime_ns) == (st.st_size, st.st_mtime_ns)
+
+
+def record_failure(session, path: Path, st: Optional[os.stat_result], reason: str) -> None:
+    logger.warning("Extração falhou para %s: %s", path, reason)
+    values = {
+        "path": str(path),
+        "size_bytes": st.st_size if st else None,
+        "mtime_ns": st.st_mtime_ns if st else None,
+        "reason": reason,
+        "failed_at": datetime.utcnow(),
+    }
+    stmt = sqlite_insert(models.IngestFailure).values(**values)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["path"],
+            set_={
+                **{key: stmt.excluded[key] for key in ("size_bytes", "mtime_ns", "reason", "failed_at")},
+                "attempts": models.IngestFailure.attempts + 1,
+            },
+        )
+    )
+
+
+def clear_failures(session, paths: Iterable[str]) -> None:
+    paths = list(paths)
+    if paths:
+        session.execute(delete(models.IngestFailure).where(models.IngestFailure.path.in_(paths)))
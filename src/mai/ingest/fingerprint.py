@@ -0,0 +1,134 @@
+"""Impressões de conteúdo dos arquivos do catálogo.
+
+Arquivos novos gravam só a impressão rápida (``file.quick_hash``). O SHA-256
+completo é calculado quando duas impressões coincidem, para confirmar a
+duplicata, ou depois, em segundo plano, por ``backfill_hashes``.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future
+from pathlib import Path
+from threading import Event
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_, select, update
+
+from mai.core.logging import logger
+from mai.db import models
+from mai.db.session import session_scope
+from mai.utils.files import compute_quick_hash, compute_sha256
+from mai.utils.hashing import get_hash_service
+
+BACKFILL_BATCH = 100
+
+
+def peer_sha256(path: str, sha256: Optional[str]) -> Optional[str]:
+    """SHA-256 conhecido de um registro ou, na falta dele, calculado do disco."""
+    if sha256:
+        return sha256
+    try:
+        return get_hash_service().submit(Path(path), compute_sha256, Path(path)).result()
+    except OSError:
+        return None
+
+
+def same_content_at_path(peer, path: str, quick_hash: Optional[str], size: int) -> bool:
+    """Registro sem SHA-256 do próprio ``path``: o disco já não mostra o conteúdo antigo.
+
+    Impressão rápida e tamanho iguais (ex.: só o mtime mudou) bastam para adotar a
+    linha; sem impressão gravada não há como saber.
+    """
+    return (
+        peer.path == path
+        and peer.quick_hash is not None
+        and peer.quick_hash == quick_hash
+        and peer.size_bytes == size
+    )
+
+
+def find_duplicate(
+    session, path: Path, st: os.stat_result, quick_hash: str
+) -> Tuple[Optional[models.File], Optional[str]]:
+    """``(registro com o mesmo conteúdo, SHA-256 de path)``; o hash só é lido se houver colisão."""
+    peers = session.scalars(
+        select(models.File).where(
+            or_(
+                models.File.quick_hash == quick_hash,
+                and_(models.File.quick_hash.is_(None), models.File.size_bytes == st.st_size),
+            )
+        )
+    ).all()
+    if not peers:
+        return None, None
+    sha256 = get_hash_service().submit(path, compute_sha256, path).result()
+    for peer in peers:
+        if peer.sha256 is None and peer.path == str(path):
+            if same_content_at_path(peer, str(path), quick_hash, st.st_size):
+                return peer, sha256
+            continue  # conteúdo anterior deste caminho é desconhecido
+        if peer_sha256(peer.path, peer.sha256) == sha256:
+            return peer, sha256
+    return None, sha256
+
+
+def fill_hashes(session, *criteria) -> int:
+    """Calcula as impressões que faltam nos registros que atendem ``criteria``."""
+    rows = session.execute(
+        select(models.File.id, models.File.path, models.File.sha256, models.File.quick_hash).where(*criteria)
+    ).all()
+    # todos os arquivos são enfileirados antes de esperar: leituras em paralelo por disco
+    hashes = get_hash_service()
+    pending = [
+        (
+            file_id,
+            path,
+            _known(sha256) if sha256 else hashes.submit(Path(path), compute_sha256, Path(path)),
+            _known(quick_hash) if quick_hash else hashes.submit(Path(path), compute_quick_hash, Path(path)),
+        )
+        for file_id, path, sha256, quick_hash in rows
+    ]
+    updates = []
+    for file_id, path, sha256, quick_hash in pending:
+        try:
+            updates.append({"id": file_id, "sha256": sha256.result(), "quick_hash": quick_hash.result()})
+        except OSError as exc:
+            logger.debug("Impressão não calculada para %s: %s", path, exc)
+    if updates:
+        session.execute(update(models.File), updates)
+    return len(updates)
+
+
+def _known(value: str) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def backfill_hashes(stop_event: Optional[Event] = None, batch_size: int = BACKFILL_BATCH) -> int:
+    """Completa SHA-256/impressão rápida de todo o catálogo, um lote por transação."""
+    total = 0
+    last_id = 0
+    while not (stop_event and stop_event.is_set()):
+        with session_scope() as session:
+            ids = session.scalars(
+                select(models.File.id)
+                .where(
+                    models.File.id > last_id,
+                    or_(models.File.sha256.is_(None), models.File.quick_hash.is_(None)),
+                )
+                .order_by(models.File.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            last_id = ids[-1]
+            try:
+                total += fill_hashes(session, models.File.id.in_(ids))
+            except Exception as exc:  # ex.: SHA-256 repetido de uma duplicata ainda não resolvida
+                logger.warning("Falha ao completar impressões até o arquivo %s: %s", last_id, exc)
+                session.rollback()
+    if total:
+        logger.info("Impressões completadas para %s arquivos", total)
+    return total
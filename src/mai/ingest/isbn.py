@@ -0,0 +1,80 @@
+"""Normalização, validação e busca de ISBNs em texto."""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional
+
+# 10 ou 13 dígitos com hífens/espaços opcionais, sem fazer parte de um número maior
+ISBN_PATTERN = re.compile(r"(?<!\d)(?<!\d[ -])((?:97[89][ -]?)?(?:\d[ -]?){9}[\dXx])(?![ -]?\d)")
+# rótulo logo antes do número: "ISBN", "ISBN-13:", "ISBN 10", "ISBN (e-book):"
+ISBN_LABEL = re.compile(r"\bISBN(?:[ -]?1[03])?(?:\s*\([^)]{0,20}\))?\s*[:.]?\s*$", re.I)
+LABEL_WINDOW = 32
+DASHES = str.maketrans({"‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", " ": " "})
+
+
+def isbn13(value: str) -> Optional[str]:
+    digits = [c for c in value if c.isdigit() or c in {"X", "x"}]
+    if len(digits) == 10 and "".join(digits[:9]).isdigit():
+        return isbn10_to_13("".join(digits))
+    if len(digits) == 13 and validate_isbn13("".join(digits)):
+        return "".join(digits)
+    return None
+
+
+def isbn10_to_13(isbn10: str) -> Optional[str]:
+    if len(isbn10) != 10:
+        return None
+    core = "978" + isbn10[:-1]
+    check = 0
+    for i, char in enumerate(core):
+        check += int(char) * (1 if i % 2 == 0 else 3)
+    check = (10 - (check % 10)) % 10
+    return core + str(check)
+
+
+def validate_isbn13(value: str) -> bool:
+    if len(value) != 13 or not value.isdigit():
+        return False
+    total = 0
+    for idx, char in enumerate(value):
+        weight = 1 if idx % 2 == 0 else 3
+        total += int(char) * weight
+    return total % 10 == 0
+
+
+def validate_isbn10(value: str) -> bool:
+    value = value.upper()
+    if len(value) != 10 or not value[:9].isdigit() or not (value[9].isdigit() or value[9] == "X"):
+        return False
+    total = sum((10 - idx) * int(char) for idx, char in enumerate(value[:9]))
+    total += 10 if value[9] == "X" else int(value[9])
+    return total % 11 == 0
+
+
+def find_isbn(text: str, require_label: bool = False) -> Optional[str]:
+    """Primeiro ISBN válido (com dígito verificador conferido) em ``text``, como ISBN-13.
+
+    Um número de 10 dígitos só conta com o rótulo ``ISBN`` ao lado: 1 em 11 números
+    quaisquer passa no dígito verificador. ``require_label`` estende a exigência ao
+    ISBN-13 (páginas finais, onde anúncios listam ISBNs de outros livros).
+    """
+    text = text.translate(DASHES)
+    for match in ISBN_PATTERN.finditer(text):
+        digits = "".join(c for c in match.group(1) if c.isalnum())
+        if len(digits) == 10 and not validate_isbn10(digits):
+            continue
+        if (require_label or len(digits) == 10) and not has_isbn_label(text, match.start(1)):
+            continue
+        isbn = isbn13(digits)
+        if isbn:
+            return isbn
+    return None
+
+
+def has_isbn_label(text: str, start: int) -> bool:
+    return ISBN_LABEL.search(text[max(0, start - LABEL_WINDOW):start]) is not None
+
+
+def first_isbn(values: Iterable[str]) -> Optional[str]:
+    return next((isbn for isbn in map(isbn13, values) if isbn), None)
@@ -0,0 +1,109 @@
+"""Instantâneo em memória dos arquivos já catalogados, carregado uma vez por scan."""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from mai.db import models
+
+
+@dataclass(frozen=True)
+class KnownFile:
+    id: int
+    path: str
+    sha256: Optional[str]
+    quick_hash: Optional[str]
+    device: Optional[int]
+    inode: Optional[int]
+    size_bytes: Optional[int]
+    mtime_ns: Optional[int]
+
+
+def stat_matches(record, st: os.stat_result) -> bool:
+    """Compara um ``KnownFile`` ou ``models.File`` com o resultado de ``os.stat``."""
+    return (
+        record.device == st.st_dev
+        and record.inode == st.st_ino
+        and record.size_bytes == st.st_size
+        and record.mtime_ns == st.st_mtime_ns
+    )
+
+
+def stat_fields(st: os.stat_result) -> dict:
+    return {
+        "device": st.st_dev,
+        "inode": st.st_ino,
+        "size_bytes": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+class KnownFiles:
+    def __init__(self) -> None:
+        self._by_path: Dict[str, KnownFile] = {}
+        self._by_inode: Dict[Tuple[int, int], KnownFile] = {}
+        self._by_sha: Dict[str, KnownFile] = {}
+        self._by_quick: Dict[str, List[KnownFile]] = {}
+        # linhas anteriores à impressão rápida, comparáveis só pelo tamanho
+        self._unfingerprinted: Dict[int, List[KnownFile]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, session) -> "KnownFiles":
+        known = cls()
+        rows = session.execute(
+            select(
+                models.File.id,
+                models.File.path,
+                models.File.sha256,
+                models.File.quick_hash,
+                models.File.device,
+                models.File.inode,
+                models.File.size_bytes,
+                models.File.mtime_ns,
+            )
+        )
+        for row in rows:
+            known.add(KnownFile(*row))
+        return known
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def add(self, record: KnownFile) -> None:
+        with self._lock:
+            self._by_path[record.path] = record
+            if record.device is not None and record.inode is not None:
+                self._by_inode[(record.device, record.inode)] = record
+            if record.sha256:
+                self._by_sha[record.sha256] = record
+            if record.quick_hash:
+                self._by_quick.setdefault(record.quick_hash, []).append(record)
+            elif record.size_bytes is not None:
+                self._unfingerprinted.setdefault(record.size_bytes, []).append(record)
+
+    def match_stat(self, path: Path, st: os.stat_result) -> Optional[KnownFile]:
+        """Registro cujo (device, inode, size, mtime) bate com ``st``, pelo caminho ou inode."""
+        with self._lock:
+            record = self._by_path.get(str(path))
+            if record and stat_matches(record, st):
+                return record
+            record = self._by_inode.get((st.st_dev, st.st_ino))
+        if record and stat_matches(record, st):
+            return record
+        return None
+
+    def match_sha(self, sha256: str) -> Optional[KnownFile]:
+        with self._lock:
+            return self._by_sha.get(sha256)
+
+    def content_peers(self, quick_hash: str, size: int) -> List[KnownFile]:
+        """Registros que podem ter o mesmo conteúdo; só o SHA-256 completo confirma."""
+        with self._lock:
+            return self._by_quick.get(quick_hash, []) + self._unfingerprinted.get(size, [])
@@ -0,0 +1,174 @@
+"""Leitura direta dos metadados de um EPUB.
+
+Abre o ZIP, segue ``META-INF/container.xml`` até o pacote OPF e percorre só o
+OPF com ``iterparse``, parando ao fim do ``<manifest>``. Nenhum capítulo,
+imagem ou folha de estilo é lido, ao contrário de ``ebooklib.epub.read_epub``.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+from xml.etree.ElementTree import ParseError, fromstring, iterparse
+
+from mai.ingest.types import LocalMetadata
+from mai.utils.text import strip_tags
+
+CONTAINER_PATH = "META-INF/container.xml"
+OPF_MEDIA_TYPE = "application/oebps-package+xml"
+YEAR_PATTERN = re.compile(r"\d{4}")
+
+
+class OPFError(ValueError):
+    """EPUB sem container/OPF legível; quem chama decide o fallback."""
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _attr(element, name: str) -> Optional[str]:
+    """Atributo pelo nome local, com ou sem namespace (``opf:role``, ``role``)."""
+    for key, value in element.attrib.items():
+        if _local(key) == name:
+            return value
+    return None
+
+
+def _text(element) -> Optional[str]:
+    value = " ".join("".join(element.itertext()).split())
+    return value or None
+
+
+def find_opf(archive: zipfile.ZipFile) -> str:
+    try:
+        container = fromstring(archive.read(CONTAINER_PATH))
+    except KeyError as exc:
+        raise OPFError("container.xml ausente") from exc
+    except ParseError as exc:
+        raise OPFError(f"container.xml inválido: {exc}") from exc
+    rootfiles = [element for element in container.iter() if _local(element.tag) == "rootfile"]
+    for rootfile in rootfiles:
+        if rootfile.get("media-type", OPF_MEDIA_TYPE) == OPF_MEDIA_TYPE and rootfile.get("full-path"):
+            return rootfile.get("full-path")
+    raise OPFError("container.xml sem rootfile")
+
+
+def read_opf_metadata(path: Path) -> LocalMetadata:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            opf_path = find_opf(archive)
+            with archive.open(opf_path) as handle:
+                return _parse_opf(handle, posixpath.dirname(opf_path))
+    except (zipfile.BadZipFile, KeyError, ParseError) as exc:
+        raise OPFError(str(exc)) from exc
+
+
+def read_spine(archive: zipfile.ZipFile) -> List[str]:
+    """Documentos do ``<spine>`` na ordem de leitura, como caminhos dentro do ZIP."""
+    opf_path = find_opf(archive)
+    base = posixpath.dirname(opf_path)
+    items: Dict[str, str] = {}
+    order: List[str] = []
+    try:
+        with archive.open(opf_path) as handle:
+            for _, element in iterparse(handle, events=("end",)):
+                tag = _local(element.tag)
+                if tag == "item" and element.get("href"):
+                    items[element.get("id", "")] = element.get("href")
+                    element.clear()
+                elif tag == "itemref" and element.get("idref"):
+                    order.append(element.get("idref"))
+                elif tag == "spine":
+                    break
+    except (KeyError, ParseError) as exc:
+        raise OPFError(str(exc)) from exc
+    return [posixpath.normpath(posixpath.join(base, unquote(items[ref]))) for ref in order if ref in items]
+
+
+def _parse_opf(handle, base: str) -> LocalMetadata:
+    values: Dict[str, List[str]] = {}
+    creators: List[Tuple[Optional[str], str, Optional[str]]] = []  # (id, nome, papel)
+    named: Dict[str, str] = {}  # <meta name=... content=...> (EPUB 2/calibre)
+    refines: Dict[str, Dict[str, str]] = {}  # <meta refines="#id" property=...> (EPUB 3)
+    collections: Dict[str, str] = {}
+    items: Dict[str, str] = {}
+    cover_href: Optional[str] = None
+
+    for _, element in iterparse(handle, events=("end",)):
+        tag = _local(element.tag)
+        if tag == "creator":
+            name = _text(element)
+            if name:
+                creators.append((element.get("id"), name, _attr(element, "role")))
+        elif tag in ("title", "identifier", "language", "date", "publisher", "description"):
+            text = _text(element) if tag != "description" else "".join(element.itertext()).strip()
+            if text:
+                values.setdefault(tag, []).append(text)
+        elif tag == "meta":
+            content = element.get("content")
+            if element.get("name") and content is not None:
+                named[element.get("name")] = content
+            prop = element.get("property")
+            if prop and element.get("refines"):
+                refines.setdefault(element.get("refines").lstrip("#"), {})[prop] = _text(element) or ""
+            elif prop == "belongs-to-collection" and element.get("id"):
+                collections[element.get("id")] = _text(element) or ""
+        elif tag == "item":
+            href = element.get("href")
+            if href:
+                items[element.get("id", "")] = href
+                if "cover-image" in (element.get("properties") or "").split():
+                    cover_href = href
+            element.clear()  # manifestos de livros ilustrados têm milhares de itens
+        elif tag == "manifest":
+            break  # spine/guide não têm metadados
+
+    authors, contributors = [], []
+    for creator_id, name, role in creators:
+        # EPUB 3 declara o papel num <meta refines="#id" property="role">
+        role = role or refines.get(creator_id or "", {}).get("role")
+        (authors if role in (None, "aut") else contributors).append(name)
+
+    series, series_index = _series(named, refines, collections)
+    cover_id = named.get("cover")
+    if cover_href is None and cover_id:
+        cover_href = items.get(cover_id)
+    description = values.get("description", [None])[0]
+    if description:
+        description = " ".join(strip_tags(description).split()) or None
+    date = values.get("date", [None])[0]
+    year = YEAR_PATTERN.search(date) if date else None
+    return LocalMetadata(
+        title=values.get("title", [None])[0],
+        authors=authors or contributors,
+        identifiers=values.get("identifier", []),
+        language=values.get("language", [None])[0],
+        year=int(year.group()) if year else None,
+        publisher=values.get("publisher", [None])[0],
+        description=description,
+        series=series,
+        series_index=series_index,
+        cover_href=posixpath.normpath(posixpath.join(base, unquote(cover_href))) if cover_href else None,
+    )
+
+
+def _series(named: Dict[str, str], refines, collections: Dict[str, str]):
+    name = named.get("calibre:series")
+    index = named.get("calibre:series_index")
+    if not name:
+        for collection_id, title in collections.items():
+            props = refines.get(collection_id, {})
+            if title and props.get("collection-type", "series") == "series":
+                name, index = title, props.get("group-position")
+                break
+    if not name:
+        return None, None
+    try:
+        return name.strip(), float(index) if index else None
+    except ValueError:
+        return name.strip(), None
@@ -1,95 +1,128 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import mimetypes
-import time
-import unicodedata
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+import httpx
 from rapidfuzz import fuzz
 from sqlalchemy import select, delete
-from threading import Event
-
-from watchdog.events import FileSystemEventHandler
-from watchdog.observers import Observer
+from threading import Lock
 
+from mai.core.config import get_settings
+from mai.core.events import publish
 from mai.core.logging import logger
 from mai.db import models
-from mai.db.indexer import upsert_for_edition
-from mai.db.session import session_scope
-from mai.ingest import extractors
-from mai.ingest.providers import BookBrainzProvider, GoogleBooksProvider, OpenLibraryProvider, Provider
+from mai.ingest import runtime, sandbox
+from mai.ingest.cache import CachedProvider, get_provider_cache
+from mai.ingest.failures import clear_failures, failed_unchanged, record_failure
+from mai.ingest.fingerprint import find_duplicate
+from mai.ingest.isbn import first_isbn, isbn10_to_13, isbn13, validate_isbn13  # noqa: F401
+from mai.ingest.known import stat_fields, stat_matches
+from mai.ingest.progress import IngestProgress
+from mai.ingest.ratelimit import RateLimited, deadline_scope
+from mai.ingest.scanner import DirectoryScanner
+from mai.ingest.sandbox import ExtractionFailed
+from mai.ingest.singleflight import SingleFlightProvider
+from mai.ingest.providers import (
+    BookBrainzProvider,
+    FallbackProvider,
+    GoogleBooksProvider,
+    OpenLibraryProvider,
+    Provider,
+)
 from mai.ingest.types import Candidate, LocalMetadata
-from mai.utils.files import compute_sha256
+from mai.utils.files import compute_quick_hash
+from mai.utils.hashing import get_hash_service
+from mai.utils.text import name_key, normalize
 
-SUPPORTED_EXTENSIONS = {".epub", ".pdf", ".mobi", ".azw", ".azw3"}
 ACCEPT_THRESHOLD = 0.85
 
 
-def build_providers(google_key: Optional[str] = None) -> List[Provider]:
-    providers: List[Provider] = [
-        OpenLibraryProvider(),
-        GoogleBooksProvider(api_key=google_key),
-        BookBrainzProvider(),
-    ]
+_provider_registry: Dict[Optional[str], List[Provider]] = {}
+_registry_lock = Lock()
+# índice local dos dumps e a assinatura (caminho, mtime) do arquivo quando foi aberto
+_dump_provider: Optional[Tuple[Tuple[str, int], Provider]] = None
+DUMP_SLUG = "openlibrary_dump"
+
+
+def build_providers(google_key: Optional[str] = None, use_cache: bool = True) -> List[Provider]:
+    # Instâncias compartilhadas: os pools de conexão sobrevivem entre imports e requisições
+    with _registry_lock:
+        shared = _provider_registry.get(google_key)
+        if shared is None:
+            # single-flight: arquivos do mesmo livro consultam o mesmo ISBN ao mesmo tempo
+            shared = [
+                SingleFlightProvider(provider)
+                for provider in (OpenLibraryProvider(), GoogleBooksProvider(api_key=google_key), BookBrainzProvider())
+            ]
+            _provider_registry[google_key] = shared
+    providers = list(shared)
+    if use_cache:
+        cache = get_provider_cache()
+        providers = [CachedProvider(provider, cache) for provider in providers]
+    # o índice dos dumps responde primeiro; o que ele não tem (títulos novos) ainda vai à rede
+    providers[0] = FallbackProvider(dump_provider, providers[0], aliases=[DUMP_SLUG])
     return providers
 
 
-def ingest_paths(paths: List[Path], providers: Optional[List[Provider]] = None) -> None:
-    providers = providers or build_providers()
-    for path in paths:
-        files = scan_directory(path)
-        for file_path in files:
-            logger.info("Processando %s", file_path)
-            try:
-                with session_scope() as session:
-                    ingest_file(session, file_path, providers)
-            except Exception as exc:  # pragma: no cover - log and continue
-                logger.exception("Falha ao ingerir %s: %s", file_path, exc)
-
-
-def watch_directories(
-    paths: List[Path], providers: Optional[List[Provider]] = None, stop_event: Optional[Event] = None
-) -> None:
-    providers = providers or build_providers()
-    handler = IngestEventHandler(providers)
-    observer = Observer()
-    for path in paths:
-        observer.schedule(handler, str(path), recursive=True)
-        logger.info("Observando %s", path)
-    observer.start()
-    try:
-        while True:
-            if stop_event and stop_event.is_set():
-                break
-            time.sleep(1)
-    except KeyboardInterrupt:  # pragma: no cover
-        logger.info("Watcher interrompido pelo usuário")
-    finally:
-        observer.stop()
-        observer.join()
-
+def dump_provider() -> Optional[Provider]:
+    """Provedor do índice local dos dumps; reaberto quando o arquivo muda (ex.: importado após o start)."""
+    from mai.openlibrary import LocalOpenLibraryProvider, default_dump_db
 
-def scan_directory(root: Path) -> List[Path]:
-    return [path for path in root.rglob("*") if path.suffix.lower() in SUPPORTED_EXTENSIONS]
+    global _dump_provider
+    path = default_dump_db()
+    try:
+        signature = (str(path), path.stat().st_mtime_ns)
+    except OSError:
+        signature = None
+    with _registry_lock:
+        current = _dump_provider
+        if current is not None and current[0] == signature:
+            return current[1]
+        opened = LocalOpenLibraryProvider(path) if signature is not None else None
+        _dump_provider = (signature, opened) if opened is not None else None
+    if current is not None:
+        current[1].close()
+    return opened
+
+
+def close_providers() -> None:
+    global _dump_provider
+    with _registry_lock:
+        providers = [provider for shared in _provider_registry.values() for provider in shared]
+        _provider_registry.clear()
+        if _dump_provider is not None:
+            providers.append(_dump_provider[1])
+        _dump_provider = None
+    for provider in providers:
+        provider.close()
+    runtime.shutdown_loop()
+
+
+def ingest_paths(
+    paths: List[Path],
+    providers: Optional[List[Provider]] = None,
+    hash_workers: Optional[int] = None,
+    enrich_workers: Optional[int] = None,
+    full_rescan: bool = False,
+    bulk_index: Optional[bool] = None,
+    progress: Optional[IngestProgress] = None,
+) -> None:
+    from mai.ingest.engine import IngestEngine
 
+    providers = providers or build_providers()
+    engine = IngestEngine(providers, hash_workers=hash_workers, enrich_workers=enrich_workers, progress=progress)
+    engine.run(paths, full_rescan=full_rescan, bulk_index=bulk_index)
+    logger.info("Cache de provedores: %s", get_provider_cache().stats().as_dict())
 
-class IngestEventHandler(FileSystemEventHandler):
-    def __init__(self, providers: Iterable[Provider]) -> None:
-        super().__init__()
-        self.providers = list(providers)
 
-    def on_created(self, event):  # pragma: no cover - depende de watchdog
-        if event.is_directory:
-            return
-        path = Path(event.src_path)
-        if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            return
-        logger.info("Arquivo detectado via watcher: %s", path)
-        with session_scope() as session:
-            ingest_file(session, path, self.providers)
+def scan_directory(root: Path) -> Iterator[Path]:
+    return DirectoryScanner(skip_unchanged=False).iter_files(root)
 
 
 def ingest_file(session, path: Path, providers: Iterable[Provider]) -> None:
@@ -98,81 +131,120 @@ def ingest_file(session, path: Path, providers: Iterable[Provider]) -> None:
         logger.warning("Arquivo %s não existe", path)
         return
 
-    sha256 = compute_sha256(path)
-    existing = session.scalar(select(models.File).where(models.File.sha256 == sha256))
-    if existing:
-        existing.path = str(path)
-        existing.last_seen = datetime.utcnow()
+    st = path.stat()
+    current = session.scalar(select(models.File).where(models.File.path == str(path)))
+    if current is not None and stat_matches(current, st):
+        current.last_seen = datetime.utcnow()
+        logger.debug("Arquivo inalterado: %s", path)
+        return
+    if current is None and relocate_by_inode(session, path, st):
+        return
+
+    quick_hash = get_hash_service().submit(path, compute_quick_hash, path, st.st_size).result()
+    existing, sha256 = find_duplicate(session, path, st, quick_hash)
+    if existing is not None:
+        touch_file(existing, path, st, sha256=sha256, quick_hash=quick_hash)
         session.flush()
         logger.info("Arquivo já existente atualizado: %s", path)
         return
 
-    local = extractors.extract_metadata(path)
+    if failed_unchanged(session, path, st):
+        logger.debug("Extração já falhou para %s; arquivo inalterado, pulando", path)
+        return
+    try:
+        local = sandbox.extract_metadata(path)
+    except ExtractionFailed as exc:
+        if exc.permanent:
+            record_failure(session, path, st, str(exc))
+        else:
+            logger.warning("Extração interrompida para %s: %s", path, exc)
+        return
+    clear_failures(session, [str(path)])
     local.identifiers.append(path.stem)
-    hits = search_providers(local, providers)
-    scored_candidates = score_candidates(local, hits)
-    candidate, top_score, ranked_candidates = reconcile(scored_candidates)
-    persist(session, path, sha256, local, candidate, ranked_candidates, top_score)
+    candidate, top_score, ranked_candidates = identify(local, providers)
+    persist(session, path, sha256, local, candidate, ranked_candidates, top_score, quick_hash=quick_hash)
     logger.info("Ingestão concluída para %s", path)
 
 
+def relocate_by_inode(session, path: Path, st: os.stat_result) -> bool:
+    """Arquivo movido: mesmo (device, inode, size, mtime) e o caminho antigo sumiu."""
+    rows = session.scalars(
+        select(models.File).where(models.File.device == st.st_dev, models.File.inode == st.st_ino)
+    )
+    for existing in rows:
+        if stat_matches(existing, st) and not os.path.exists(existing.path):
+            logger.info("Arquivo movido %s -> %s", existing.path, path)
+            existing.path = str(path)
+            existing.last_seen = datetime.utcnow()
+            session.flush()
+            return True
+    return False
+
+
+def touch_existing(session, path: Path, sha256: Optional[str], st: Optional[os.stat_result] = None) -> bool:
+    if not sha256:
+        return False
+    existing = session.scalar(select(models.File).where(models.File.sha256 == sha256))
+    if not existing:
+        return False
+    touch_file(existing, path, st or path.stat())
+    session.flush()
+    logger.info("Arquivo já existente atualizado: %s", path)
+    return True
+
+
+def touch_file(
+    existing: models.File,
+    path: Path,
+    st: os.stat_result,
+    sha256: Optional[str] = None,
+    quick_hash: Optional[str] = None,
+) -> None:
+    existing.path = str(path)
+    existing.last_seen = datetime.utcnow()
+    existing.sha256 = sha256 or existing.sha256
+    existing.quick_hash = quick_hash or existing.quick_hash
+    for key, value in stat_fields(st).items():
+        setattr(existing, key, value)
+
+
+def identify(local: LocalMetadata, providers: Iterable[Provider]) -> tuple[Optional[Candidate], float, List[dict]]:
+    hits = search_providers(local, providers)
+    return reconcile(score_candidates(local, hits))
+
+
 def persist(
     session,
     path: Path,
-    sha256: str,
+    sha256: Optional[str],
     local: LocalMetadata,
     candidate: Optional[Candidate],
     ranked_candidates: List[dict],
     top_score: float,
+    quick_hash: Optional[str] = None,
 ) -> None:
     now = datetime.utcnow()
-    title = candidate.title if candidate and candidate.title else local.title or path.stem
-    sort_title = normalize(title)
-    language = (candidate.language if candidate and candidate.language else local.language)
+    title, sort_title, language = work_fields(path, local, candidate)
 
     work = session.scalar(select(models.Work).where(models.Work.sort_title == sort_title))
     if not work:
         work = models.Work(title=title, sort_title=sort_title, language=language)
         session.add(work)
         session.flush()
+    work.description = work.description or local.description
+    if local.series:
+        add_series_entry(session, work, local.series, local.series_index)
 
-    authors = candidate.authors if candidate and candidate.authors else (local.authors or ["Desconhecido"])
-    author_objs = []
-    for author_name in authors:
-        author = session.scalar(select(models.Author).where(models.Author.name == author_name))
-        if not author:
-            author = models.Author(name=author_name)
-            session.add(author)
-            session.flush()
-        author_objs.append(author)
+    for author_name in author_names(local, candidate):
+        author = get_or_create_author(session, author_name)
         if author not in work.authors:
             work.authors.append(author)
 
-    edition = models.Edition(
-        work_id=work.id,
-        title=candidate.title if candidate and candidate.title else local.title,
-        subtitle=None,
-        publisher=candidate.publisher if candidate else None,
-        pub_year=candidate.year if candidate else local.year,
-        format=path.suffix.lstrip("."),
-        language=language,
-        cover_url=candidate.cover_url if candidate else None,
-        created_at=now,
-    )
+    edition = models.Edition(work_id=work.id, created_at=now, **edition_fields(path, local, candidate))
     session.add(edition)
     session.flush()
-    upsert_for_edition(session, edition.id)
 
-    identifiers = []
-    if candidate:
-        for key, value in candidate.ids.items():
-            if value:
-                identifiers.append((key, value))
-    for identifier in local.identifiers:
-        isbn = isbn13(identifier)
-        if isbn:
-            identifiers.append(("ISBN13", isbn))
-    for scheme, value in identifiers:
+    for scheme, value in collect_identifiers(local, candidate):
         if not session.scalar(
             select(models.Identifier).where(
                 models.Identifier.scheme == scheme,
@@ -181,18 +253,18 @@ def persist(
         ):
             session.add(models.Identifier(edition_id=edition.id, scheme=scheme, value=value))
 
-    file_record = models.File(
-        edition_id=edition.id,
-        path=str(path),
-        ext=path.suffix.lower().lstrip("."),
-        size_bytes=path.stat().st_size,
-        sha256=sha256,
-        mime=attach_mime(path),
-        drm=False,
-        added_at=now,
-        last_seen=now,
-    )
-    session.add(file_record)
+    # conteúdo novo num caminho já catalogado: reaproveita a linha (path é UNIQUE)
+    file_record = session.scalar(select(models.File).where(models.File.path == str(path)))
+    if file_record is None:
+        file_record = models.File(path=str(path), added_at=now)
+        session.add(file_record)
+    replaced = file_record.edition_id
+    file_record.edition_id = edition.id
+    for key, value in file_fields(path, sha256, quick_hash=quick_hash).items():
+        setattr(file_record, key, value)
+    file_record.last_seen = now
+    session.flush()
+    prune_editions(session, [replaced])
 
     if candidate:
         upsert_provider_hit(session, edition.id, candidate, score=1.0)
@@ -200,28 +272,176 @@ def persist(
     record_identification(session, edition.id, ranked_candidates, candidate, top_score)
 
 
+def prune_editions(session, edition_ids: Iterable[Optional[int]]) -> int:
+    """Apaga, entre ``edition_ids``, as edições que ficaram sem nenhum arquivo.
+
+    Chamada depois que linhas de ``file`` somem (arquivo apagado, sobrescrito por
+    um rename) ou passam para uma edição nova (conteúdo trocado no mesmo caminho).
+    Identificadores, resultados e tags saem em cascata; o índice, pelo trigger.
+    Obras que ficaram sem edição também saem.
+    """
+    edition_ids = {edition_id for edition_id in edition_ids if edition_id is not None}
+    if not edition_ids:
+        return 0
+    in_use = select(models.File.id).where(models.File.edition_id == models.Edition.id).exists()
+    work_ids = session.scalars(
+        delete(models.Edition)
+        .where(models.Edition.id.in_(edition_ids), ~in_use)
+        .returning(models.Edition.work_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not work_ids:
+        return 0
+    has_editions = select(models.Edition.id).where(models.Edition.work_id == models.Work.id).exists()
+    session.execute(
+        delete(models.Work)
+        .where(models.Work.id.in_(set(work_ids)), ~has_editions)
+        .execution_options(synchronize_session=False)
+    )
+    logger.info("%s edição(ões) sem arquivo removidas do catálogo", len(work_ids))
+    return len(work_ids)
+
+
+def get_or_create_author(session, name: str) -> models.Author:
+    """Autor pela forma normalizada do nome (``author.norm_name`` é indexado)."""
+    author = session.scalar(select(models.Author).where(models.Author.norm_name == name_key(name)).limit(1))
+    if not author:
+        author = models.Author(name=name)
+        session.add(author)
+        session.flush()
+    return author
+
+
+def add_series_entry(session, work: models.Work, name: str, position: Optional[float]) -> None:
+    series = session.scalar(select(models.Series).where(models.Series.name == name).limit(1))
+    if series is None:
+        series = models.Series(name=name)
+        session.add(series)
+        session.flush()
+    if session.get(models.SeriesEntry, (series.id, work.id)) is None:
+        session.add(models.SeriesEntry(series_id=series.id, work_id=work.id, position=position))
+
+
+def work_fields(path: Path, local: LocalMetadata, candidate: Optional[Candidate]) -> Tuple[str, str, Optional[str]]:
+    """``(title, sort_title, language)`` da obra."""
+    title = candidate.title if candidate and candidate.title else local.title or path.stem
+    language = candidate.language if candidate and candidate.language else local.language
+    return title, normalize(title), language
+
+
+def author_names(local: LocalMetadata, candidate: Optional[Candidate]) -> List[str]:
+    return candidate.authors if candidate and candidate.authors else (local.authors or ["Desconhecido"])
+
+
+def edition_fields(path: Path, local: LocalMetadata, candidate: Optional[Candidate]) -> dict:
+    return {
+        "title": candidate.title if candidate and candidate.title else local.title,
+        "subtitle": None,
+        "publisher": (candidate.publisher if candidate else None) or local.publisher,
+        "pub_year": candidate.year if candidate else local.year,
+        "format": path.suffix.lstrip("."),
+        "language": work_fields(path, local, candidate)[2],
+        "cover_url": candidate.cover_url if candidate else None,
+        "cover_path": local.cover_path,
+    }
+
+
+def file_fields(
+    path: Path, sha256: Optional[str], st: Optional[os.stat_result] = None, quick_hash: Optional[str] = None
+) -> dict:
+    st = st or path.stat()
+    return {
+        "ext": path.suffix.lower().lstrip("."),
+        "sha256": sha256,
+        "quick_hash": quick_hash or compute_quick_hash(path, st.st_size),
+        "mime": attach_mime(path),
+        "drm": False,
+        **stat_fields(st),
+    }
+
+
+def collect_identifiers(local: LocalMetadata, candidate: Optional[Candidate]) -> List[Tuple[str, str]]:
+    identifiers = []
+    if candidate:
+        for key, value in candidate.ids.items():
+            if value:
+                identifiers.append((key, value))
+    for identifier in local.identifiers:
+        isbn = isbn13(identifier)
+        if isbn:
+            identifiers.append(("ISBN13", isbn))
+    return identifiers
+
+
 def search_providers(local: LocalMetadata, providers: Iterable[Provider]) -> List[Tuple[str, Candidate]]:
-    hits: List[Tuple[str, Candidate]] = []
-    isbn = next((isbn13(i) for i in local.identifiers if isbn13(i)), None)
+    deadline = get_settings().provider_deadline
+    # margem para o loop cancelar as tarefas pendentes e devolver o parcial
+    return runtime.run_sync(asearch_providers(local, providers), timeout=deadline + 5)
+
+
+async def asearch_providers(
+    local: LocalMetadata, providers: Iterable[Provider], deadline: Optional[float] = None
+) -> List[Tuple[str, Candidate]]:
+    """Consulta todos os provedores em paralelo.
+
+    ``provider_timeout`` vale por requisição HTTP (no cliente httpx); esperas do
+    limite de taxa e de ``Retry-After`` contam só para o ``deadline`` global, ao
+    fim do qual as consultas pendentes são canceladas e os resultados já obtidos
+    são devolvidos.
+    """
+    deadline = deadline if deadline is not None else get_settings().provider_deadline
+    providers = list(providers)
+    if not providers:
+        return []
+
+    isbn = first_isbn(local.identifiers)
     query = " ".join(filter(None, [local.title, " ".join(local.authors)]))
-    for provider in providers:
-        try:
-            if isbn:
-                result = provider.get_by_isbn(isbn)
-                if result:
-                    hits.append(("by_isbn", result))
-                    continue
-            if query:
-                hits.extend(("search", candidate) for candidate in provider.search(query))
-        except Exception as exc:  # pragma: no cover
-            logger.warning("Provider %s falhou: %s", provider.__class__.__name__, exc)
+    # as tarefas copiam o contexto ao nascer: o limitador enxerga o prazo desta consulta
+    with deadline_scope(deadline):
+        tasks = [asyncio.ensure_future(_query_provider(provider, isbn, query)) for provider in providers]
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    hits: List[Tuple[str, Candidate]] = []
+    for provider, task in zip(providers, tasks):
+        name = provider.__class__.__name__
+        if task in pending:
+            logger.warning("Provider %s excedeu o prazo global de %.1fs", name, deadline)
+            publish("provider.error", provider=name, error="deadline", title=local.title)
+            continue
+        exc = task.exception()
+        if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException)):
+            logger.warning("Provider %s excedeu timeout: %s", name, exc)
+            publish("provider.error", provider=name, error="timeout", title=local.title)
+        elif isinstance(exc, RateLimited):
+            logger.warning("Provider %s pulado: %s", name, exc)
+            publish("provider.error", provider=name, error="rate_limited", title=local.title)
+        elif exc is not None:
+            logger.warning("Provider %s falhou: %s", name, exc)
+            publish("provider.error", provider=name, error=str(exc), title=local.title)
+        else:
+            hits.extend(task.result())
     return hits
 
 
+async def _query_provider(provider: Provider, isbn: Optional[str], query: str) -> List[Tuple[str, Candidate]]:
+    if isbn:
+        result = await provider.aget_by_isbn(isbn)
+        if result:
+            return [("by_isbn", result)]
+    if query:
+        return [("search", candidate) for candidate in await provider.asearch(query)]
+    return []
+
+
 def score_candidates(local: LocalMetadata, hits: List[Tuple[str, Candidate]]) -> List[dict]:
+    from mai.ingest.scoring import score_candidates_batch
+
+    scores = score_candidates_batch(local, [candidate for _, candidate in hits])
     return [
-        {"stage": stage, "candidate": candidate, "score": score_candidate(local, candidate)}
-        for stage, candidate in hits
+        {"stage": stage, "candidate": candidate, "score": score}
+        for (stage, candidate), score in zip(hits, scores)
     ]
 
 
@@ -237,7 +457,7 @@ def reconcile(scored_candidates: List[dict]) -> tuple[Optional[Candidate], float
 
 def score_candidate(local: LocalMetadata, candidate: Candidate) -> float:
     score = 0.0
-    local_isbn = next((isbn13(i) for i in local.identifiers if isbn13(i)), None)
+    local_isbn = first_isbn(local.identifiers)
     remote_isbn = candidate.ids.get("ISBN13")
     if local_isbn and remote_isbn and local_isbn == remote_isbn:
         return 1.0
@@ -259,44 +479,6 @@ def attach_mime(path: Path) -> str:
     return mime or "application/octet-stream"
 
 
-def normalize(text: Optional[str]) -> str:
-    if not text:
-        return ""
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join(ch for ch in text if unicodedata.category(ch)[0] != "M")
-    return " ".join("".join(ch for ch in text if ch.isalnum() or ch.isspace()).lower().split())
-
-
-def isbn13(value: str) -> Optional[str]:
-    digits = [c for c in value if c.isdigit() or c in {"X", "x"}]
-    if len(digits) == 10:
-        return isbn10_to_13("".join(digits))
-    if len(digits) == 13 and validate_isbn13("".join(digits)):
-        return "".join(digits)
-    return None
-
-
-def isbn10_to_13(isbn10: str) -> Optional[str]:
-    if len(isbn10) != 10:
-        return None
-    core = "978" + isbn10[:-1]
-    check = 0
-    for i, char in enumerate(core):
-        check += int(char) * (1 if i % 2 == 0 else 3)
-    check = (10 - (check % 10)) % 10
-    return core + str(check)
-
-
-def validate_isbn13(value: str) -> bool:
-    if len(value) != 13 or not value.isdigit():
-        return False
-    total = 0
-    for idx, char in enumerate(value):
-        weight = 1 if idx % 2 == 0 else 3
-        total += int(char) * weight
-    return total % 10 == 0
-
-
 def record_identification(
     session,
     edition_id: int,
@@ -304,7 +486,23 @@ def record_identification(
     chosen: Optional[Candidate],
     top_score: float,
 ) -> None:
-    auto_accepted = bool(chosen)
+    values = identification_values(edition_id, ranked_candidates, chosen, top_score)
+    result = session.get(models.IdentifyResult, edition_id)
+    if result:
+        for key, value in values.items():
+            setattr(result, key, value)
+    else:
+        session.add(models.IdentifyResult(**values))
+
+    session.execute(delete(models.MatchEvent).where(models.MatchEvent.edition_id == edition_id))
+    events = [models.MatchEvent(**row) for row in match_event_rows(edition_id, ranked_candidates, chosen)]
+    if events:
+        session.add_all(events)
+
+
+def identification_values(
+    edition_id: int, ranked_candidates: List[dict], chosen: Optional[Candidate], top_score: float
+) -> dict:
     payload = []
     for item in ranked_candidates:
         candidate = item["candidate"]
@@ -323,41 +521,30 @@ def record_identification(
                 "payload": candidate.payload,
             }
         )
+    return {
+        "edition_id": edition_id,
+        "auto_accepted": bool(chosen),
+        "chosen_provider": chosen.source if chosen else None,
+        "top_score": top_score,
+        "candidates_json": json.dumps(payload, ensure_ascii=False),
+    }
 
-    result = session.get(models.IdentifyResult, edition_id)
-    if result:
-        result.auto_accepted = auto_accepted
-        result.chosen_provider = chosen.source if chosen else None
-        result.top_score = top_score
-        result.candidates_json = json.dumps(payload, ensure_ascii=False)
-    else:
-        session.add(
-            models.IdentifyResult(
-                edition_id=edition_id,
-                auto_accepted=auto_accepted,
-                chosen_provider=chosen.source if chosen else None,
-                top_score=top_score,
-                candidates_json=json.dumps(payload, ensure_ascii=False),
-            )
-        )
 
-    session.execute(delete(models.MatchEvent).where(models.MatchEvent.edition_id == edition_id))
-    events = []
+def match_event_rows(edition_id: int, ranked_candidates: List[dict], chosen: Optional[Candidate]) -> List[dict]:
+    rows = []
     for rank, item in enumerate(ranked_candidates, start=1):
         candidate = item["candidate"]
-        accepted = bool(chosen and candidate == chosen)
-        events.append(
-            models.MatchEvent(
-                edition_id=edition_id,
-                stage=item["stage"],
-                provider=candidate.source,
-                candidate_rank=rank,
-                score=item["score"],
-                accepted=accepted,
-            )
+        rows.append(
+            {
+                "edition_id": edition_id,
+                "stage": item["stage"],
+                "provider": candidate.source,
+                "candidate_rank": rank,
+                "score": item["score"],
+                "accepted": bool(chosen and candidate == chosen),
+            }
         )
-    if events:
-        session.add_all(events)
+    return rows
 
 
 def build_local_metadata_from_edition(edition: models.Edition) -> LocalMetadata:
@@ -375,6 +562,37 @@ def build_local_metadata_from_edition(edition: models.Edition) -> LocalMetadata:
     )
 
 
+def select_providers(
+    providers: List[Provider], names: Optional[List[str]] = None, refresh: bool = False
+) -> List[Provider]:
+    """Filtra por slug (``names``) e, com ``refresh``, ignora leituras do cache."""
+    if names:
+        allowed = {name.lower() for name in names}
+        providers = [p for p in providers if allowed & {slug.lower() for slug in _slugs(p)}]
+    if refresh:
+        providers = [p.refreshing() if isinstance(p, (CachedProvider, FallbackProvider)) else p for p in providers]
+    return providers
+
+
+def _slugs(provider: Provider) -> set:
+    return set(getattr(provider, "aliases", ())) | {getattr(provider, "slug", provider.__class__.__name__)}
+
+
+def identify_edition(
+    session, edition: models.Edition, providers: List[Provider], auto_apply: bool = True
+) -> Tuple[List[dict], float, bool]:
+    """Reconsulta os provedores para uma edição já catalogada; devolve ``(ranking, score, aplicado)``."""
+    local = build_local_metadata_from_edition(edition)
+    hits = search_providers(local, providers)
+    candidate, top_score, ranked = reconcile(score_candidates(local, hits))
+    auto_applied = bool(auto_apply and candidate and top_score >= ACCEPT_THRESHOLD)
+    if auto_applied and candidate:
+        apply_candidate_to_edition(session, edition, candidate)
+        upsert_provider_hit(session, edition.id, candidate, score=top_score or 1.0)
+    record_identification(session, edition.id, ranked, candidate if auto_applied else None, top_score)
+    return ranked, top_score, auto_applied
+
+
 def apply_candidate_to_edition(session, edition: models.Edition, candidate: Candidate) -> None:
     work = edition.work
     if not work:
@@ -409,12 +627,7 @@ def apply_candidate_to_edition(session, edition: models.Edition, candidate: Cand
     if candidate.authors:
         work.authors.clear()
         for name in candidate.authors:
-            author = session.scalar(select(models.Author).where(models.Author.name == name))
-            if not author:
-                author = models.Author(name=name)
-                session.add(author)
-                session.flush()
-            work.authors.append(author)
+            work.authors.append(get_or_create_author(session, name))
 
     session.flush()
 
@@ -0,0 +1,89 @@
+"""Contadores de uma importação em andamento e pedido de cancelamento."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Optional
+
+STAGES = ("hash", "enrich", "write")
+
+
+class IngestProgress:
+    """Atualizado pelos estágios do ``IngestEngine``; ``snapshot`` pode ser lido de qualquer thread."""
+
+    def __init__(
+        self,
+        cancel_event: Optional[threading.Event] = None,
+        stop_event: Optional[threading.Event] = None,
+        clock=time.monotonic,
+    ) -> None:
+        self.cancel_event = cancel_event or threading.Event()
+        # encerramento do processo: para como um cancelamento, mas a tarefa é retomada depois
+        self.stop_event = stop_event or threading.Event()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started = clock()
+        self.finished: Optional[float] = None
+        self.discovering = True
+        self.counts: Dict[str, int] = {
+            "discovered": 0,
+            "hashed": 0,
+            "enriched": 0,
+            "persisted": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "skipped": 0,
+        }
+        self._latency: Dict[str, list] = {stage: [0.0, 0] for stage in STAGES}
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def interrupted(self) -> bool:
+        return self.cancel_event.is_set() or self.stop_event.is_set()
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[counter] += amount
+
+    def timed(self, stage: str, seconds: float, files: int = 1) -> None:
+        with self._lock:
+            total = self._latency[stage]
+            total[0] += seconds
+            total[1] += files
+
+    def discovery_done(self) -> None:
+        self.discovering = False
+
+    def finish(self) -> None:
+        self.discovering = False
+        self.finished = self._clock()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+            latency = {
+                stage: round(seconds * 1000 / files, 2) if files else None
+                for stage, (seconds, files) in self._latency.items()
+            }
+        elapsed = (self.finished or self._clock()) - self.started
+        # arquivos que saíram do pipeline, por qualquer caminho
+        done = counts["persisted"] + counts["unchanged"] + counts["failed"] + counts["skipped"]
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, counts["discovered"] - done)
+        return {
+            **counts,
+            "elapsed_seconds": round(elapsed, 2),
+            "files_per_sec": round(rate, 2),
+            # enquanto a descoberta roda o ETA é um piso: ainda podem surgir arquivos
+            "eta_seconds": round(remaining / rate, 1) if rate > 0 and self.finished is None else None,
+            "discovering": self.discovering,
+            "cancelled": self.cancelled,
+            "stage_latency_ms": latency,
+        }
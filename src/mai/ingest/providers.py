@@ -1,9 +1,17 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+import importlib.util
+import threading
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple
 
 import httpx
+from tenacity import AsyncRetrying, Retrying
 
+from mai.core.config import Settings, get_settings
+from mai.core.logging import logger
+from mai.ingest.ratelimit import RETRYABLE_STATUS, TokenBucket, get_limiter, retry_after_seconds, retry_options
 from mai.ingest.types import Candidate
 
 
@@ -16,15 +24,190 @@ class Provider:
     def search(self, query: str) -> List[Candidate]:  # pragma: no cover
         raise NotImplementedError
 
+    def close(self) -> None:
+        """Libera recursos (conexões, arquivos); padrão sem efeito."""
 
-class OpenLibraryProvider(Provider):
-    base_url = "https://openlibrary.org"
-    slug = "openlibrary"
+    async def aget_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        # Provedores apenas síncronos continuam funcionando no fan-out assíncrono
+        return await asyncio.to_thread(self.get_by_isbn, isbn13)
+
+    async def asearch(self, query: str) -> List[Candidate]:
+        return await asyncio.to_thread(self.search, query)
+
+
+class FallbackProvider(Provider):
+    """``primary`` primeiro; ``fallback`` só quando ele não existe ou não acha nada.
+
+    ``primary`` é resolvido a cada consulta, então um índice local criado depois
+    do start passa a valer sem recriar as listas de provedores. O slug é o do
+    ``fallback``; ``aliases`` também casam nos filtros por nome.
+    """
+
+    def __init__(
+        self, primary: Callable[[], Optional[Provider]], fallback: Provider, aliases: Iterable[str] = ()
+    ) -> None:
+        self.primary = primary
+        self.fallback = fallback
+        self.slug = fallback.slug
+        self.aliases = {fallback.slug, *aliases}
+
+    def refreshing(self) -> "FallbackProvider":
+        refreshing = getattr(self.fallback, "refreshing", None)
+        fallback = refreshing() if refreshing is not None else self.fallback
+        return FallbackProvider(self.primary, fallback, self.aliases)
+
+    def close(self) -> None:
+        self.fallback.close()
 
     def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
-        resp = httpx.get(f"{self.base_url}/search.json", params={"q": f"isbn:{isbn13}", "limit": 1}, timeout=15)
+        primary = self.primary()
+        return (primary and primary.get_by_isbn(isbn13)) or self.fallback.get_by_isbn(isbn13)
+
+    def search(self, query: str) -> List[Candidate]:
+        primary = self.primary()
+        return (primary and primary.search(query)) or self.fallback.search(query)
+
+    async def aget_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        primary = self.primary()
+        return (primary and await primary.aget_by_isbn(isbn13)) or await self.fallback.aget_by_isbn(isbn13)
+
+    async def asearch(self, query: str) -> List[Candidate]:
+        primary = self.primary()
+        return (primary and await primary.asearch(query)) or await self.fallback.asearch(query)
+
+
+class HttpProvider(Provider):
+    """Base para provedores REST: subclasses só montam requisições e interpretam JSON.
+
+    Cada instância mantém clientes httpx de longa duração (pool + keep-alive e
+    HTTP/2 quando disponível), criados sob demanda e encerrados por ``close``.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None) -> None:
+        self.settings = settings or get_settings()
+        self._client: httpx.Client | None = None
+        self._aclient: httpx.AsyncClient | None = None
+        self._aclient_loop: asyncio.AbstractEventLoop | None = None
+        self._client_lock = threading.Lock()
+
+    def _client_options(self) -> dict:
+        settings = self.settings
+        return {
+            "timeout": httpx.Timeout(settings.provider_timeout),
+            "limits": httpx.Limits(
+                max_connections=settings.provider_max_connections,
+                max_keepalive_connections=settings.provider_max_keepalive,
+                keepalive_expiry=settings.provider_keepalive_expiry,
+            ),
+            "http2": settings.provider_http2 and _http2_available(),
+            "follow_redirects": True,
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(**self._client_options())
+            return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        # AsyncClient fica preso ao loop que o criou; normalmente o loop compartilhado de runtime
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = httpx.AsyncClient(**self._client_options())
+            self._aclient_loop = loop
+        return self._aclient
+
+    def close(self) -> None:
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+        aclient, loop = self._aclient, self._aclient_loop
+        self._aclient, self._aclient_loop = None, None
+        if aclient is None or loop is None or loop.is_closed():
+            return
+        try:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(aclient.aclose(), loop).result(timeout=5)
+            else:
+                loop.run_until_complete(aclient.aclose())
+        except Exception as exc:  # pragma: no cover - encerramento best-effort
+            logger.debug("Falha ao fechar cliente de %s: %s", self.slug, exc)
+
+    def _isbn_request(self, isbn13: str) -> Tuple[str, dict]:  # pragma: no cover
+        raise NotImplementedError
+
+    def _search_request(self, query: str) -> Tuple[str, dict]:  # pragma: no cover
+        raise NotImplementedError
+
+    def _parse_isbn(self, data: dict, isbn13: str) -> Optional[Candidate]:  # pragma: no cover
+        raise NotImplementedError
+
+    def _parse_search(self, data: dict) -> List[Candidate]:  # pragma: no cover
+        raise NotImplementedError
+
+    def _params(self, params: dict) -> dict:
+        return params
+
+    @property
+    def limiter(self) -> TokenBucket:
+        return get_limiter(self.slug)
+
+    def _check(self, resp: httpx.Response) -> None:
+        if resp.status_code in RETRYABLE_STATUS:
+            delay = retry_after_seconds(resp)
+            if delay is None and resp.status_code == 429:
+                delay = 1.0
+            if delay:
+                # pausa o bucket para que os demais workers também recuem
+                self.limiter.pause(delay)
+                logger.info("Provider %s respondeu %s; pausando %.1fs", self.slug, resp.status_code, delay)
         resp.raise_for_status()
-        docs = resp.json().get("docs") or []
+
+    def _fetch_json(self, url: str, params: dict) -> dict:
+        self.limiter.acquire()
+        resp = self.client.get(url, params=self._params(params))
+        self._check(resp)
+        return resp.json()
+
+    async def _afetch_json(self, url: str, params: dict) -> dict:
+        await self.limiter.acquire_async()
+        resp = await self._async_client().get(url, params=self._params(params))
+        self._check(resp)
+        return resp.json()
+
+    def _get_json(self, url: str, params: dict) -> dict:
+        return Retrying(**retry_options())(self._fetch_json, url, params)
+
+    async def _aget_json(self, url: str, params: dict) -> dict:
+        return await AsyncRetrying(**retry_options())(self._afetch_json, url, params)
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        return self._parse_isbn(self._get_json(*self._isbn_request(isbn13)), isbn13)
+
+    def search(self, query: str) -> List[Candidate]:
+        return self._parse_search(self._get_json(*self._search_request(query)))
+
+    async def aget_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        return self._parse_isbn(await self._aget_json(*self._isbn_request(isbn13)), isbn13)
+
+    async def asearch(self, query: str) -> List[Candidate]:
+        return self._parse_search(await self._aget_json(*self._search_request(query)))
+
+
+class OpenLibraryProvider(HttpProvider):
+    base_url = "https://openlibrary.org"
+    slug = "openlibrary"
+
+    def _isbn_request(self, isbn13: str) -> Tuple[str, dict]:
+        return f"{self.base_url}/search.json", {"q": f"isbn:{isbn13}", "limit": 1}
+
+    def _search_request(self, query: str) -> Tuple[str, dict]:
+        return f"{self.base_url}/search.json", {"q": query, "limit": 5}
+
+    def _parse_isbn(self, data: dict, isbn13: str) -> Optional[Candidate]:
+        docs = data.get("docs") or []
         if not docs:
             return None
         doc = docs[0]
@@ -43,11 +226,9 @@ class OpenLibraryProvider(Provider):
             payload=doc,
         )
 
-    def search(self, query: str) -> List[Candidate]:
-        resp = httpx.get(f"{self.base_url}/search.json", params={"q": query, "limit": 5}, timeout=15)
-        resp.raise_for_status()
+    def _parse_search(self, data: dict) -> List[Candidate]:
         hits: List[Candidate] = []
-        for doc in resp.json().get("docs", [])[:5]:
+        for doc in data.get("docs", [])[:5]:
             hits.append(
                 Candidate(
                     source="openlibrary",
@@ -67,22 +248,26 @@ class OpenLibraryProvider(Provider):
         return hits
 
 
-class GoogleBooksProvider(Provider):
+class GoogleBooksProvider(HttpProvider):
     base_url = "https://www.googleapis.com/books/v1/volumes"
     slug = "google_books"
 
-    def __init__(self, api_key: Optional[str] = None) -> None:
+    def __init__(self, api_key: Optional[str] = None, settings: Optional[Settings] = None) -> None:
+        super().__init__(settings)
         self.api_key = api_key
 
-    def _request(self, params: dict) -> dict:
+    def _params(self, params: dict) -> dict:
         if self.api_key:
-            params = {**params, "key": self.api_key}
-        resp = httpx.get(self.base_url, params=params, timeout=15)
-        resp.raise_for_status()
-        return resp.json()
+            return {**params, "key": self.api_key}
+        return params
 
-    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
-        data = self._request({"q": f"isbn:{isbn13}", "maxResults": 1})
+    def _isbn_request(self, isbn13: str) -> Tuple[str, dict]:
+        return self.base_url, {"q": f"isbn:{isbn13}", "maxResults": 1}
+
+    def _search_request(self, query: str) -> Tuple[str, dict]:
+        return self.base_url, {"q": query, "maxResults": 5}
+
+    def _parse_isbn(self, data: dict, isbn13: str) -> Optional[Candidate]:
         items = data.get("items") or []
         if not items:
             return None
@@ -100,8 +285,7 @@ class GoogleBooksProvider(Provider):
             payload=item,
         )
 
-    def search(self, query: str) -> List[Candidate]:
-        data = self._request({"q": query, "maxResults": 5})
+    def _parse_search(self, data: dict) -> List[Candidate]:
         hits: List[Candidate] = []
         for item in data.get("items", [])[:5]:
             info = item.get("volumeInfo", {})
@@ -121,28 +305,28 @@ class GoogleBooksProvider(Provider):
         return hits
 
 
-class BookBrainzProvider(Provider):
+class BookBrainzProvider(HttpProvider):
     base_url = "https://bookbrainz.org/ws/1"
     slug = "bookbrainz"
 
-    def _search(self, query: str, limit: int = 5) -> List[dict]:
-        resp = httpx.get(
-            f"{self.base_url}/search/edition",
-            params={"q": query, "limit": limit, "fmt": "json"},
-            timeout=15,
-        )
-        resp.raise_for_status()
-        return resp.json().get("results", [])
+    def _search_params(self, query: str, limit: int) -> Tuple[str, dict]:
+        return f"{self.base_url}/search/edition", {"q": query, "limit": limit, "fmt": "json"}
 
-    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
-        results = self._search(isbn13, limit=1)
+    def _isbn_request(self, isbn13: str) -> Tuple[str, dict]:
+        return self._search_params(isbn13, limit=1)
+
+    def _search_request(self, query: str) -> Tuple[str, dict]:
+        return self._search_params(query, limit=5)
+
+    def _parse_isbn(self, data: dict, isbn13: str) -> Optional[Candidate]:
+        results = data.get("results", [])
         if not results:
             return None
         return self._build_candidate(results[0])
 
-    def search(self, query: str) -> List[Candidate]:
+    def _parse_search(self, data: dict) -> List[Candidate]:
         hits: List[Candidate] = []
-        for item in self._search(query, limit=5):
+        for item in data.get("results", []):
             candidate = self._build_candidate(item)
             if candidate:
                 hits.append(candidate)
@@ -198,3 +382,8 @@ def _year_from_date(value: Optional[str]) -> Optional[int]:
     if len(digits) >= 4:
         return int(digits[:4])
     return None
+
+
+@lru_cache(maxsize=1)
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
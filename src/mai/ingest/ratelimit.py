@@ -0,0 +1,186 @@
+"""Limite de taxa por provedor e política de retry com backoff.
+
+Os buckets são globais ao processo, então todos os workers de ingestão e as
+rotas da API dividem a mesma cota de cada provedor.
+
+Uma consulta com prazo (``deadline``) não reserva um token que só ficaria livre
+depois dele: recebe ``RateLimited`` na hora, sem consumir a cota. Assim a fila
+de reservas nunca passa do prazo e, sob demanda contínua, as consultas que não
+cabem falham rápido em vez de gastar o prazo esperando um token que já não
+poderiam usar.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+import httpx
+from tenacity import retry_if_exception, stop_after_attempt
+from tenacity.wait import wait_base
+
+from mai.core.config import get_settings
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# instante (``time.monotonic``) em que a consulta atual é abandonada; herdado pelas tarefas asyncio
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("mai_provider_deadline", default=None)
+
+
+class RateLimited(RuntimeError):
+    """O próximo token do provedor só fica livre depois do prazo da consulta."""
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """Limita as esperas do bucket às consultas (e tarefas) criadas dentro do bloco."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class TokenBucket:
+    """Token bucket com reserva: cada chamada recebe o instante em que pode prosseguir."""
+
+    def __init__(self, rate: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0:
+            raise ValueError("rate deve ser positivo")
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """Consome um token e devolve quantos segundos o chamador deve esperar.
+
+        Se a espera passaria de ``max_wait``, não consome nada e devolve ``None``.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            tokens = self._tokens - 1
+            wait = max(-tokens / self.rate if tokens < 0 else 0.0, self._paused_until - now)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens = tokens
+            return wait
+
+    def refund(self) -> None:
+        """Devolve um token reservado e não usado (ex.: espera cancelada)."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def pause(self, seconds: float) -> None:
+        """Suspende o bucket (ex.: ``Retry-After``) para todos os chamadores."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def acquire(self) -> None:
+        wait = self._reserve_within_deadline()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve_within_deadline()
+        if wait <= 0:
+            return
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # cancelada antes de usar o token: quem está atrás na fila não deve pagar por ele
+            self.refund()
+            raise
+
+    def _reserve_within_deadline(self) -> float:
+        remaining = remaining_time()
+        wait = self.reserve(max_wait=max(0.0, remaining) if remaining is not None else None)
+        if wait is None:
+            raise RateLimited(f"limite de taxa: sem vaga antes do prazo ({remaining:.1f}s)")
+        return wait
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_limiter(slug: str) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(slug)
+        if bucket is None:
+            settings = get_settings()
+            rate = settings.provider_rate_limits.get(slug, settings.provider_default_rate)
+            bucket = TokenBucket(rate=rate, burst=settings.provider_rate_burst)
+            _buckets[slug] = bucket
+        return bucket
+
+
+def reset_limiters() -> None:
+    with _buckets_lock:
+        _buckets.clear()
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS
+    return isinstance(exc, httpx.TransportError)
+
+
+class wait_retry_after(wait_base):
+    """Usa ``Retry-After`` quando presente; senão backoff exponencial com jitter."""
+
+    def __init__(self, initial: float = 1.0, maximum: float = 60.0) -> None:
+        self.initial = initial
+        self.maximum = maximum
+
+    def __call__(self, retry_state) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        if isinstance(exc, httpx.HTTPStatusError):
+            delay = retry_after_seconds(exc.response)
+            if delay is not None:
+                return min(delay, self.maximum)
+        backoff = self.initial * (2 ** (retry_state.attempt_number - 1))
+        return min(self.maximum, backoff) * random.uniform(0.5, 1.0)
+
+
+def retry_options() -> dict:
+    settings = get_settings()
+    return {
+        "retry": retry_if_exception(is_retryable),
+        "wait": wait_retry_after(maximum=settings.provider_backoff_max),
+        "stop": stop_after_attempt(settings.provider_max_retries + 1),
+        "reraise": True,
+    }
@@ -0,0 +1,63 @@
+"""Loop asyncio compartilhado para chamadas a provedores.
+
+Workers de ingestão (threads) e rotas síncronas da API submetem corrotinas a um
+único loop em background, de modo que clientes HTTP assíncronos e o estado dos
+provedores fiquem presos a um só loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run(loop: asyncio.AbstractEventLoop) -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _thread = threading.Thread(target=_run, args=(_loop,), name="mai-provider-loop", daemon=True)
+            _thread.start()
+            ready.wait()
+    return _loop
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        if asyncio.iscoroutine(coro):
+            coro.close()
+        raise RuntimeError("run_sync não pode ser chamado de dentro do loop de provedores")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout)
+
+
+def shutdown_loop() -> None:
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop, _thread = None, None
+    if loop is None:
+        return
+    loop.call_soon_threadsafe(loop.stop)
+    if thread:
+        thread.join(timeout=5)
+    loop.close()
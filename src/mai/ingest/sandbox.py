@@ -0,0 +1,202 @@
+"""Extração de metadados isolada em processos.
+
+PyMuPDF e ebooklib podem travar ou consumir gigabytes em arquivos malformados.
+Cada worker é um processo próprio com limite de espaço de endereçamento
+(``RLIMIT_AS``); quem chama espera no máximo ``timeout`` segundos. Um worker
+travado ou morto é encerrado e substituído, e o erro volta como
+``ExtractionFailed``. Só as falhas do próprio arquivo (tempo limite, limite de
+memória, erro ou crash do parser) são ``permanent`` e vão para
+``ingest_failure``; as do pool (encerramento, worker que morreu ocioso) não.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import List, Optional
+
+from mai.core.config import get_settings
+from mai.core.logging import logger
+from mai.ingest import extractors
+from mai.ingest.types import LocalMetadata
+
+try:  # Somente POSIX
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+class ExtractionFailed(RuntimeError):
+    def __init__(self, reason: str, permanent: bool = True) -> None:
+        super().__init__(reason)
+        # False: a causa não é o arquivo; tentar de novo no próximo scan
+        self.permanent = permanent
+
+
+def _limit_memory(limit_bytes: int) -> None:
+    if resource is None or limit_bytes <= 0:
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+    except (ValueError, OSError) as exc:  # pragma: no cover - limite rígido menor que o pedido
+        logger.warning("Não foi possível limitar a memória do extrator: %s", exc)
+
+
+def _worker_main(conn: Connection, limit_bytes: int) -> None:
+    _limit_memory(limit_bytes)
+    while True:
+        try:
+            path = conn.recv()
+        except EOFError:
+            return
+        if path is None:
+            return
+        try:
+            conn.send(("ok", extractors.extract_metadata(Path(path))))
+        except MemoryError:
+            conn.send(("error", "limite de memória excedido"))
+            return  # o heap pode ter ficado fragmentado: melhor um processo novo
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class _Worker:
+    def __init__(self, context, limit_bytes: int) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child, limit_bytes), name="mai-extractor", daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class ExtractorPool:
+    def __init__(
+        self, workers: Optional[int] = None, timeout: Optional[float] = None, memory_mb: Optional[int] = None
+    ) -> None:
+        settings = get_settings()
+        self.size = max(1, workers or settings.extract_workers or settings.ingest_hash_workers)
+        self.timeout = timeout if timeout is not None else settings.extract_timeout
+        memory_mb = memory_mb if memory_mb is not None else settings.extract_memory_mb
+        self.limit_bytes = memory_mb * 1024 * 1024
+        # spawn: o processo pai tem threads (e locks) que um fork copiaria pela metade
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._workers: List[_Worker] = []
+        self._closing = False
+
+    def extract(self, path: Path) -> LocalMetadata:
+        worker = self._acquire()
+        try:
+            worker.conn.send(str(path))
+        except OSError as exc:
+            # morreu ocioso: o arquivo nem chegou ao worker
+            raise self._replace(worker, f"processo extrator indisponível ({exc})", permanent=False)
+        try:
+            if not worker.conn.poll(self.timeout):
+                raise self._replace(worker, f"tempo limite de {self.timeout:.0f}s excedido")
+            status, value = worker.conn.recv()
+        except (EOFError, OSError) as exc:
+            code = worker.process.exitcode if not worker.alive() else None
+            # código != 0 sem encerramento do pool: o parser caiu (sinal, OOM) com este arquivo
+            permanent = not self._closing and code not in (None, 0)
+            raise self._replace(
+                worker, f"processo extrator encerrou ({code if code is not None else exc})", permanent=permanent
+            )
+        if not worker.alive():
+            self._retire(worker)
+        else:
+            self._idle.put(worker)
+        if status != "ok":
+            raise ExtractionFailed(value)
+        return value
+
+    def close(self) -> None:
+        with self._lock:
+            self._closing = True
+            workers, self._workers = self._workers, []
+            self._started = 0
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self) -> _Worker:
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._started < self.size:
+                    self._started += 1
+                    worker = _Worker(self._context, self.limit_bytes)
+                    self._workers.append(worker)
+                    return worker
+            # espera com timeout: um worker aposentado libera vaga sem passar pela fila
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _retire(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+                self._started -= 1
+
+    def _replace(self, worker: _Worker, reason: str, permanent: bool = True) -> ExtractionFailed:
+        """Mata o worker (o próximo ``extract`` sobe outro) e devolve o erro a lançar."""
+        logger.warning("Extrator reiniciado: %s", reason)
+        self._retire(worker)
+        return ExtractionFailed(reason, permanent=permanent)
+
+
+_pool: Optional[ExtractorPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_extractor_pool() -> ExtractorPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractorPool()
+        return _pool
+
+
+def shutdown_extractor_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+def extract_metadata(path: Path) -> LocalMetadata:
+    """``extractors.extract_metadata`` no pool isolado (ou direto, se desligado)."""
+    if not get_settings().extract_sandbox:
+        return extractors.extract_metadata(path)
+    return get_extractor_pool().extract(path)
@@ -0,0 +1,113 @@
+"""Varredura incremental de diretórios baseada em ``os.scandir``.
+
+Arquivos são entregues conforme encontrados. O mtime de um diretório só muda
+quando entradas são criadas, removidas ou renomeadas nele, então um diretório
+com o mesmo mtime do último scan não é listado de novo: apenas seus
+subdiretórios já conhecidos são visitados. Edições no lugar (mesmo nome) são
+captadas pelo watcher ou por um scan completo (``skip_unchanged=False``).
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from mai.core.logging import logger
+from mai.db import models
+
+SUPPORTED_EXTENSIONS = {".epub", ".pdf", ".mobi", ".azw", ".azw3"}
+# mtime impossível: o diretório continua conhecido (o pai inalterado ainda desce até ele), mas é relistado
+STALE_MTIME = -1
+
+
+class DirectoryScanner:
+    def __init__(self, known_dirs: Optional[Dict[str, int]] = None, skip_unchanged: bool = True) -> None:
+        self.known_dirs = known_dirs or {}
+        self.skip_unchanged = skip_unchanged and bool(self.known_dirs)
+        self.seen: Dict[str, int] = {}
+        self.skipped = 0
+        self._children: Dict[str, List[str]] = defaultdict(list)
+        for path in self.known_dirs:
+            self._children[os.path.dirname(path)].append(path)
+
+    @classmethod
+    def load(cls, session, roots: Iterable[Path], skip_unchanged: bool = True) -> "DirectoryScanner":
+        known: Dict[str, int] = {}
+        if skip_unchanged:
+            for root in roots:
+                known.update(_load_dir_mtimes(session, str(root)))
+        return cls(known, skip_unchanged=skip_unchanged)
+
+    def iter_files(self, root: Path) -> Iterator[Path]:
+        if root.is_file():
+            if root.suffix.lower() in SUPPORTED_EXTENSIONS:
+                yield root
+            return
+
+        stack = [str(root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                # stat antes da listagem: se o diretório mudar durante o scan, o próximo o relista
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError as exc:
+                logger.debug("Diretório inacessível %s: %s", directory, exc)
+                continue
+
+            if self.skip_unchanged and self.known_dirs.get(directory) == mtime:
+                self.seen[directory] = mtime
+                self.skipped += 1
+                stack.extend(self._children.get(directory, ()))
+                continue
+
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS:
+                                yield Path(entry.path)
+                        except OSError:  # pragma: no cover - entrada sumiu durante a listagem
+                            continue
+            except OSError as exc:
+                logger.warning("Falha ao listar %s: %s", directory, exc)
+                continue
+            self.seen[directory] = mtime
+
+    def save(self, session, roots: Iterable[Path], exclude: Optional[Set[str]] = None) -> None:
+        """Grava os mtimes vistos; ``exclude`` lista diretórios com falhas, gravados como ``STALE_MTIME``."""
+        exclude = exclude or set()
+        now = datetime.utcnow()
+        for root in roots:
+            if root.is_file():
+                continue
+            prefix = str(root)
+            session.execute(delete(models.ScanDir).where(_under(prefix)))
+        rows = [
+            {"path": path, "mtime_ns": STALE_MTIME if path in exclude else mtime, "scanned_at": now}
+            for path, mtime in self.seen.items()
+        ]
+        if rows:
+            stmt = insert(models.ScanDir)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["path"],
+                set_={"mtime_ns": stmt.excluded.mtime_ns, "scanned_at": stmt.excluded.scanned_at},
+            )
+            session.execute(stmt, rows)
+
+
+def _under(prefix: str):
+    sub = prefix.rstrip(os.sep) + os.sep
+    return (models.ScanDir.path == prefix) | (func.substr(models.ScanDir.path, 1, len(sub)) == sub)
+
+
+def _load_dir_mtimes(session, prefix: str) -> Dict[str, int]:
+    rows = session.execute(select(models.ScanDir.path, models.ScanDir.mtime_ns).where(_under(prefix)))
+    return {path: mtime for path, mtime in rows}
@@ -0,0 +1,121 @@
+"""Pontuação de candidatos em lote.
+
+Equivalente a ``pipeline.score_candidate``, mas normaliza títulos, idiomas e
+ISBNs uma única vez por registro e calcula as similaridades de título e autor
+para todos os pares com ``rapidfuzz.process.cdist``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+from rapidfuzz import fuzz
+from rapidfuzz.process import cdist
+
+from mai.core.config import get_settings
+from mai.ingest.isbn import first_isbn
+from mai.ingest.types import Candidate, LocalMetadata
+from mai.utils.text import normalize
+
+# abaixo disso o custo de subir threads supera o ganho
+PARALLEL_MIN_PAIRS = 10_000
+
+
+@dataclass(frozen=True)
+class Features:
+    title: Optional[str]
+    authors: Optional[str]
+    isbn: Optional[str]
+    year: Optional[int]
+    language: Optional[str]
+    publisher: bool = False
+
+    @classmethod
+    def from_local(cls, local: LocalMetadata) -> "Features":
+        return cls(
+            title=normalize(local.title) if local.title else None,
+            authors=" ".join(local.authors) if local.authors else None,
+            isbn=first_isbn(local.identifiers),
+            year=local.year or None,
+            language=normalize(local.language) if local.language else None,
+        )
+
+    @classmethod
+    def from_candidate(cls, candidate: Candidate) -> "Features":
+        return cls(
+            title=normalize(candidate.title) if candidate.title else None,
+            authors=" ".join(candidate.authors) if candidate.authors else None,
+            isbn=candidate.ids.get("ISBN13") or None,
+            year=candidate.year or None,
+            language=normalize(candidate.language) if candidate.language else None,
+            publisher=bool(candidate.publisher),
+        )
+
+
+def score_matrix(
+    locals_: Sequence[LocalMetadata],
+    candidates: Sequence[Candidate],
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """Matriz ``len(locals_) x len(candidates)`` com os mesmos valores de ``score_candidate``."""
+    return score_features(
+        [Features.from_local(local) for local in locals_],
+        [Features.from_candidate(candidate) for candidate in candidates],
+        workers=workers,
+    )
+
+
+def score_features(rows: Sequence[Features], cols: Sequence[Features], workers: Optional[int] = None) -> np.ndarray:
+    shape = (len(rows), len(cols))
+    if not rows or not cols:
+        return np.zeros(shape)
+    if workers is None:
+        workers = get_settings().scoring_workers
+    if shape[0] * shape[1] < PARALLEL_MIN_PAIRS:
+        workers = 1
+
+    # mesma ordem de somas do cálculo escalar para o resultado ser bit a bit igual
+    score = np.zeros(shape)
+    score += _similarity(rows, cols, "title", fuzz.WRatio, workers)
+    score += _similarity(rows, cols, "authors", fuzz.token_set_ratio, workers)
+
+    row_year = np.array([f.year or 0 for f in rows])[:, None]
+    col_year = np.array([f.year or 0 for f in cols])[None, :]
+    score += np.where((row_year != 0) & (col_year != 0) & (np.abs(row_year - col_year) <= 1), 0.1, 0.0)
+
+    row_lang = _objects([f.language for f in rows])[:, None]
+    col_lang = _objects([f.language for f in cols])[None, :]
+    score += np.where((row_lang != None) & (row_lang == col_lang), 0.05, 0.0)  # noqa: E711
+
+    score += np.where(np.array([f.publisher for f in cols])[None, :], 0.05, 0.0)
+
+    row_isbn = _objects([f.isbn for f in rows])[:, None]
+    col_isbn = _objects([f.isbn for f in cols])[None, :]
+    score[(row_isbn != None) & (row_isbn == col_isbn)] = 1.0  # noqa: E711
+    return score
+
+
+def score_candidates_batch(local: LocalMetadata, candidates: Sequence[Candidate]) -> List[float]:
+    return score_matrix([local], candidates)[0].tolist()
+
+
+def _similarity(rows: Sequence[Features], cols: Sequence[Features], attr: str, scorer, workers: int) -> np.ndarray:
+    queries = [getattr(f, attr) for f in rows]
+    choices = [getattr(f, attr) for f in cols]
+    ratios = cdist(
+        [q or "" for q in queries],
+        [c or "" for c in choices],
+        scorer=scorer,
+        dtype=np.float64,
+        workers=workers,
+    )
+    present = np.array([q is not None for q in queries])[:, None] & np.array([c is not None for c in choices])[None, :]
+    return np.where(present, 0.35 * (ratios / 100), 0.0)
+
+
+def _objects(values: Sequence[Optional[str]]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
@@ -5,10 +5,17 @@ from pathlib import Path
 from threading import Event, Thread
 from typing import List, Optional
 
+from mai.core.config import get_settings
+from mai.core.events import publish
 from mai.core.logging import logger
-from mai.ingest.pipeline import build_providers, watch_directories
+from mai.covers.downloader import fetch_missing_covers
+from mai.ingest.fingerprint import backfill_hashes
+from mai.ingest.pipeline import build_providers
+from mai.ingest.watcher import watch_directories
 
 _watcher_thread: Thread | None = None
+_backfill_thread: Thread | None = None
+_covers_thread: Thread | None = None
 _stop_event: Event | None = None
 
 
@@ -17,7 +24,7 @@ def watcher_disabled() -> bool:
 
 
 def start_watcher(paths: List[Path], google_key: Optional[str] = None) -> bool:
-    global _watcher_thread, _stop_event
+    global _watcher_thread, _backfill_thread, _covers_thread, _stop_event
     if watcher_disabled():
         logger.info("Watcher desabilitado por configuração de ambiente")
         return False
@@ -36,19 +43,34 @@ def start_watcher(paths: List[Path], google_key: Optional[str] = None) -> bool:
     )
     _watcher_thread.start()
     logger.info("Watcher iniciado para %s", paths)
+    publish("watcher", sticky=True, status="running", paths=[str(path) for path in paths])
+    if get_settings().hash_backfill:
+        # SHA-256 completo dos arquivos catalogados só com a impressão rápida
+        _backfill_thread = Thread(target=backfill_hashes, args=(_stop_event,), name="mai-hash-backfill", daemon=True)
+        _backfill_thread.start()
+    if get_settings().cover_download:
+        _covers_thread = Thread(target=fetch_missing_covers, args=(_stop_event,), name="mai-covers", daemon=True)
+        _covers_thread.start()
     return True
 
 
 def stop_watcher() -> bool:
-    global _watcher_thread, _stop_event
+    global _watcher_thread, _backfill_thread, _covers_thread, _stop_event
     if not _watcher_thread:
         return False
     if _stop_event:
         _stop_event.set()
     _watcher_thread.join(timeout=5)
+    if _backfill_thread:
+        _backfill_thread.join(timeout=5)
+        _backfill_thread = None
+    if _covers_thread:
+        _covers_thread.join(timeout=5)
+        _covers_thread = None
     logger.info("Watcher encerrado")
     _watcher_thread = None
     _stop_event = None
+    publish("watcher", sticky=True, status="stopped", paths=[])
     return True
 
 
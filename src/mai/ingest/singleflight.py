@@ -0,0 +1,87 @@
+"""Consultas idênticas em andamento compartilham uma única requisição.
+
+Ao importar vários formatos do mesmo livro (EPUB + PDF + AZW3) ou uma série
+inteira, workers diferentes pedem o mesmo ISBN/título ao mesmo provedor ao
+mesmo tempo. O primeiro pedido de uma chave vira o "líder" e faz a chamada;
+os demais esperam o resultado (ou a exceção) dele.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from mai.ingest.cache import KIND_ISBN, KIND_SEARCH, cache_key
+from mai.ingest.providers import Provider
+from mai.ingest.types import Candidate
+
+
+class SingleFlight:
+    """Coalescência entre threads."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+class AsyncSingleFlight:
+    """Coalescência entre corrotinas; cada loop tem suas próprias chamadas."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        slot = (id(asyncio.get_running_loop()), key)
+        task = self._calls.get(slot)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[slot] = task
+            task.add_done_callback(lambda _: self._calls.pop(slot, None))
+        # shield: um chamador cancelado (ex.: prazo global) não derruba os demais
+        return await asyncio.shield(task)
+
+
+class SingleFlightProvider(Provider):
+    """Envolve um provedor compartilhado; o mesmo wrapper serve ingestão e API."""
+
+    def __init__(self, inner: Provider) -> None:
+        self.inner = inner
+        self.slug = inner.slug
+        self._threads = SingleFlight()
+        self._tasks = AsyncSingleFlight()
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        return self._threads.do((KIND_ISBN, cache_key(KIND_ISBN, isbn13)), self.inner.get_by_isbn, isbn13)
+
+    def search(self, query: str) -> List[Candidate]:
+        return self._threads.do((KIND_SEARCH, cache_key(KIND_SEARCH, query)), self.inner.search, query)
+
+    async def aget_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        key = (KIND_ISBN, cache_key(KIND_ISBN, isbn13))
+        return await self._tasks.do(key, lambda: self.inner.aget_by_isbn(isbn13))
+
+    async def asearch(self, query: str) -> List[Candidate]:
+        key = (KIND_SEARCH, cache_key(KIND_SEARCH, query))
+        return await self._tasks.do(key, lambda: self.inner.asearch(query))
@@ -11,6 +11,14 @@ class LocalMetadata:
     identifiers: List[str] = field(default_factory=list)
     language: Optional[str] = None
     year: Optional[int] = None
+    publisher: Optional[str] = None
+    description: Optional[str] = None
+    series: Optional[str] = None
+    series_index: Optional[float] = None
+    # caminho da capa dentro do arquivo (ex.: membro do ZIP de um EPUB)
+    cover_href: Optional[str] = None
+    # capa já gravada no cache de miniaturas (``edition.cover_path``)
+    cover_path: Optional[str] = None
 
 
 @dataclass
@@ -0,0 +1,336 @@
+"""Watcher de diretórios com eventos enfileirados e coalescidos por caminho.
+
+A thread do observer do watchdog apenas enfileira eventos. Um despachante
+agrupa-os por caminho e só libera um arquivo depois que seu tamanho/mtime
+ficam estáveis durante ``quiet_period``; workers separados fazem a ingestão.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from threading import Event
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import String, case, delete, func, literal, update
+from sqlalchemy.exc import IntegrityError
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from mai.core.config import get_settings
+from mai.core.logging import logger
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest.pipeline import build_providers, ingest_file, prune_editions
+from mai.ingest.providers import Provider
+from mai.ingest.scanner import SUPPORTED_EXTENSIONS, DirectoryScanner
+
+UPSERT = "upsert"
+DELETE = "delete"
+MOVE = "move"
+
+
+class WatchEvent(NamedTuple):
+    action: str
+    path: str
+    dest: Optional[str] = None
+
+
+@dataclass
+class PendingPath:
+    action: str
+    last_event: float
+    signature: Optional[Tuple[int, int]] = None
+
+
+class EventCoalescer:
+    """Agrupa eventos por caminho e entrega os que ficaram quietos por ``quiet_period``."""
+
+    def __init__(self, quiet_period: float, clock=time.monotonic) -> None:
+        self.quiet_period = quiet_period
+        self._clock = clock
+        self._inbox: "queue.SimpleQueue[Tuple[str, str, float, Optional[str]]]" = queue.SimpleQueue()
+        self._pending: Dict[str, PendingPath] = {}
+        self._moves: List[WatchEvent] = []
+
+    def push(self, action: str, path: str, dest: Optional[str] = None) -> None:
+        # chamado pela thread do observer: nunca bloqueia nem toca o disco
+        self._inbox.put((action, path, self._clock(), dest))
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._moves) + self._inbox.qsize()
+
+    def _absorb(self) -> None:
+        while True:
+            try:
+                action, path, now, dest = self._inbox.get_nowait()
+            except queue.Empty:
+                return
+            if action == MOVE:
+                # renomeações não esperam: só atualizam caminhos no banco. O que estava
+                # pendente no destino foi sobrescrito; o da origem segue para o destino.
+                self._pending.pop(dest, None)
+                pending = self._pending.pop(path, None)
+                if pending is not None and pending.action == UPSERT:
+                    self._pending[dest] = PendingPath(action=UPSERT, last_event=now)
+                self._moves.append(WatchEvent(MOVE, path, dest))
+                continue
+            pending = self._pending.get(path)
+            if pending is None:
+                self._pending[path] = PendingPath(action=action, last_event=now)
+            else:
+                # o último evento decide: created+deleted = delete, deleted+created = upsert
+                pending.action = action
+                pending.last_event = now
+                pending.signature = None
+
+    def ready(self) -> List[WatchEvent]:
+        """Drena a caixa de entrada: movimentos primeiro, depois os caminhos estáveis."""
+        self._absorb()
+        now = self._clock()
+        released, self._moves = self._moves, []
+        for path, pending in list(self._pending.items()):
+            if now - pending.last_event < self.quiet_period:
+                continue
+            if pending.action == UPSERT:
+                signature = _signature(path)
+                if signature is None:
+                    del self._pending[path]
+                    continue
+                if signature != pending.signature:
+                    # ainda sendo copiado (ou primeira checagem): espera mais um período
+                    pending.signature = signature
+                    pending.last_event = now
+                    continue
+            released.append(WatchEvent(pending.action, path))
+            del self._pending[path]
+        return released
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _supported(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS
+
+
+class IngestEventHandler(FileSystemEventHandler):
+    def __init__(self, coalescer: EventCoalescer) -> None:
+        super().__init__()
+        self.coalescer = coalescer
+
+    def on_created(self, event):  # pragma: no cover - depende de watchdog
+        if event.is_directory:
+            self.coalescer.push(UPSERT, event.src_path)
+        elif _supported(event.src_path):
+            self.coalescer.push(UPSERT, event.src_path)
+
+    def on_modified(self, event):  # pragma: no cover - depende de watchdog
+        if not event.is_directory and _supported(event.src_path):
+            self.coalescer.push(UPSERT, event.src_path)
+
+    def on_deleted(self, event):  # pragma: no cover - depende de watchdog
+        if event.is_directory or _supported(event.src_path):
+            self.coalescer.push(DELETE, event.src_path)
+
+    def on_moved(self, event):  # pragma: no cover - depende de watchdog
+        src_ok = event.is_directory or _supported(event.src_path)
+        dest_ok = event.is_directory or _supported(event.dest_path)
+        if src_ok and dest_ok:
+            self.coalescer.push(MOVE, event.src_path, event.dest_path)
+        elif src_ok:
+            self.coalescer.push(DELETE, event.src_path)
+        elif dest_ok:
+            # ex.: download ``livro.pdf.part`` renomeado para ``livro.pdf``
+            self.coalescer.push(UPSERT, event.dest_path)
+
+
+class WatchService:
+    def __init__(
+        self, providers: Iterable[Provider], quiet_period: Optional[float] = None, workers: Optional[int] = None
+    ) -> None:
+        settings = get_settings()
+        self.providers = list(providers)
+        self.coalescer = EventCoalescer(quiet_period if quiet_period is not None else settings.watch_quiet_period)
+        self.poll_interval = min(settings.watch_poll_interval, max(self.coalescer.quiet_period, 0.05))
+        self.workers = max(1, workers or settings.watch_workers)
+        self._ready: "queue.Queue[Optional[WatchEvent]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._stop = Event()
+
+    @property
+    def handler(self) -> IngestEventHandler:
+        return IngestEventHandler(self.coalescer)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._dispatch, name="mai-watch-dispatch", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._work, name=f"mai-watch-worker-{idx}", daemon=True)
+            for idx in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for _ in range(self.workers):
+            self._ready.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def pending(self) -> int:
+        return len(self.coalescer) + self._ready.qsize()
+
+    def _dispatch(self) -> None:
+        while not self._stop.is_set():
+            for item in self.coalescer.ready():
+                self._ready.put(item)
+            self._stop.wait(self.poll_interval)
+
+    def _work(self) -> None:
+        while True:
+            item = self._ready.get()
+            if item is None:
+                return
+            action, path, dest = item
+            try:
+                if action == MOVE:
+                    self.handle_move(Path(path), Path(dest))
+                elif action == DELETE:
+                    self.handle_delete(Path(path))
+                elif os.path.isdir(path):
+                    for file_path in DirectoryScanner(skip_unchanged=False).iter_files(Path(path)):
+                        self.handle_upsert(file_path)
+                else:
+                    self.handle_upsert(Path(path))
+            except Exception as exc:  # pragma: no cover - log and continue
+                logger.exception("Falha ao processar evento %s em %s: %s", action, path, exc)
+
+    def handle_upsert(self, path: Path) -> None:
+        logger.info("Arquivo detectado via watcher: %s", path)
+        with session_scope() as session:
+            ingest_file(session, path, self.providers)
+
+    def handle_move(self, src: Path, dest: Path) -> None:
+        try:
+            with session_scope() as session:
+                moved = relocate_paths(session, str(src), str(dest))
+        except IntegrityError as exc:  # pragma: no cover - corrida com outra escrita no destino
+            logger.warning("Não foi possível reapontar %s -> %s (%s); reingerindo o destino", src, dest, exc)
+            moved = 0
+        if moved:
+            logger.info("%s arquivo(s) movidos %s -> %s", moved, src, dest)
+        elif dest.is_dir():
+            for file_path in DirectoryScanner(skip_unchanged=False).iter_files(dest):
+                self.coalescer.push(UPSERT, str(file_path))
+        elif dest.is_file():
+            # origem desconhecida (ex.: ``x.tmp`` -> ``x.pdf``): pode ainda estar sendo escrito, então
+            # passa pelo período de silêncio como qualquer criação; se já era conhecido, o fast path resolve
+            self.coalescer.push(UPSERT, str(dest))
+
+    def handle_delete(self, path: Path) -> None:
+        if path.exists():
+            return
+        with session_scope() as session:
+            removed = delete_files(session, _under(models.File.path, str(path)))
+        if removed:
+            logger.info("%s arquivo(s) removidos do catálogo: %s", removed, path)
+
+
+def delete_files(session, criteria) -> int:
+    """Remove as linhas de ``file`` que atendem ``criteria`` e as edições que ficaram sem arquivo."""
+    edition_ids = session.scalars(
+        delete(models.File)
+        .where(criteria)
+        .returning(models.File.edition_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    prune_editions(session, edition_ids)
+    return len(edition_ids)
+
+
+def _under(column, path: str):
+    prefix = path.rstrip(os.sep) + os.sep
+    return (column == path) | (func.substr(column, 1, len(prefix)) == prefix)
+
+
+def _rebase(column, src: str, dest: str):
+    """``dest`` + o que vem depois de ``src`` no caminho (ou o próprio ``dest``)."""
+    src_prefix = src.rstrip(os.sep) + os.sep
+    dest_prefix = dest.rstrip(os.sep) + os.sep
+    tail = func.substr(column, len(src_prefix) + 1)
+    return case((column == src, dest), else_=literal(dest_prefix, String).concat(tail))
+
+
+def relocate_paths(session, src: str, dest: str) -> int:
+    """Reaponta arquivos (e mtimes de diretórios) de ``src`` para ``dest`` em um UPDATE.
+
+    O que estava catalogado em ``dest`` foi sobrescrito no disco (ex.: rename por
+    cima de outro arquivo) e sai antes, senão o UPDATE bate no UNIQUE de ``path``.
+    """
+    replaced = _under(models.File.path, dest) & ~_under(models.File.path, src)
+    dropped = delete_files(session, replaced)
+    if dropped:
+        logger.info("%s arquivo(s) substituídos em %s", dropped, dest)
+    session.execute(
+        delete(models.IngestFailure).where(
+            _under(models.IngestFailure.path, dest) & ~_under(models.IngestFailure.path, src)
+        )
+    )
+    session.execute(
+        update(models.IngestFailure)
+        .where(_under(models.IngestFailure.path, src))
+        .values(path=_rebase(models.IngestFailure.path, src, dest))
+        .execution_options(synchronize_session=False)
+    )
+    result = session.execute(
+        update(models.File)
+        .where(_under(models.File.path, src))
+        .values(path=_rebase(models.File.path, src, dest), last_seen=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(delete(models.ScanDir).where(_under(models.ScanDir.path, dest)))
+    session.execute(
+        update(models.ScanDir)
+        .where(_under(models.ScanDir.path, src))
+        .values(path=_rebase(models.ScanDir.path, src, dest))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def watch_directories(
+    paths: List[Path], providers: Optional[List[Provider]] = None, stop_event: Optional[Event] = None
+) -> None:
+    providers = providers or build_providers()
+    service = WatchService(providers)
+    observer = Observer()
+    handler = service.handler
+    for path in paths:
+        observer.schedule(handler, str(path), recursive=True)
+        logger.info("Observando %s", path)
+    service.start()
+    observer.start()
+    try:
+        while True:
+            if stop_event and stop_event.is_set():
+                break
+            time.sleep(1)
+    except KeyboardInterrupt:  # pragma: no cover
+        logger.info("Watcher interrompido pelo usuário")
+    finally:
+        observer.stop()
+        observer.join()
+        service.stop()
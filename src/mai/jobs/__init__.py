@@ -0,0 +1,56 @@
+"""Fila de tarefas durável (tabela ``task``) e o pool que a consome."""
+
+from __future__ import annotations
+
+import json
+from typing import Optional
+
+from mai.db import models
+from mai.db.session import session_scope
+from mai.jobs.handlers import HANDLERS, JobContext, PermanentJobError, handler  # noqa: F401
+from mai.jobs.queue import CANCELLED, RUNNING, enqueue, request_cancel  # noqa: F401
+from mai.jobs.worker import JobPool, get_job_pool, publish_depth, shutdown_job_pool, start_job_pool  # noqa: F401
+
+
+def submit(kind: str, payload: Optional[dict] = None, priority: int = 0) -> int:
+    """Enfileira numa transação própria e acorda os workers; devolve o id da tarefa."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Tipo de tarefa desconhecido: {kind}")
+    with session_scope() as session:
+        task_id = enqueue(session, kind, payload, priority=priority).id
+    get_job_pool().notify()
+    publish_depth()
+    return task_id
+
+
+class TaskFinishedError(ValueError):
+    """A tarefa já terminou (``done``/``failed``) e não há o que cancelar."""
+
+
+def cancel(task_id: int) -> str:
+    """Pede o cancelamento e devolve o status resultante.
+
+    Pendente: cancela na hora. Em execução: o handler para na próxima fronteira de
+    arquivo/item. ``LookupError`` se a tarefa não existe; ``TaskFinishedError`` se já terminou.
+    """
+    with session_scope() as session:
+        status = request_cancel(session, task_id)
+    if status is None:
+        raise LookupError("Tarefa não encontrada")
+    if status not in (CANCELLED, RUNNING):
+        raise TaskFinishedError(f"Tarefa já encerrada ({status})")
+    if status == RUNNING:
+        # rodando aqui: não espera o heartbeat; em outro processo, o heartbeat de lá repassa
+        get_job_pool().cancel(task_id)
+    elif status == CANCELLED:
+        publish_depth()
+    return status
+
+
+def task_progress(task: models.Task) -> Optional[dict]:
+    """Progresso ao vivo se a tarefa roda neste processo; senão o último gravado pelo heartbeat."""
+    if task.status == RUNNING:
+        live = get_job_pool().snapshot(task.id)
+        if live is not None:
+            return live
+    return json.loads(task.progress_json) if task.progress_json else None
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import argparse
+import threading
+
+from mai.core.config import get_settings
+from mai.core.logging import configure_logging, logger
+from mai.db.init import apply_schema
+from mai.ingest.pipeline import close_providers
+from mai.ingest.sandbox import shutdown_extractor_pool
+from mai.jobs.worker import JobPool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Processa a fila de tarefas da MAI")
+    parser.add_argument("--workers", type=int, default=None, help="Workers simultâneos (padrão: MAI_JOB_WORKERS)")
+    parser.add_argument("--once", action="store_true", help="Executa as tarefas prontas e sai")
+    args = parser.parse_args()
+
+    configure_logging(get_settings().debug)
+    apply_schema()
+    pool = JobPool(workers=args.workers)
+    try:
+        if args.once:
+            logger.info("%s tarefas executadas", pool.run_pending())
+        else:
+            pool.start()
+            threading.Event().wait()
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    finally:
+        pool.stop()
+        close_providers()
+        shutdown_extractor_pool()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,123 @@
+"""Tipos de tarefa conhecidos pela fila e a função que executa cada um."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Event
+from typing import Callable, Dict, Optional
+
+from mai.core.config import get_settings
+from mai.db import models
+from mai.db.session import session_scope
+
+Handler = Callable[["JobContext"], Optional[dict]]
+
+HANDLERS: Dict[str, Handler] = {}
+
+
+@dataclass
+class JobContext:
+    task_id: int
+    payload: dict
+    attempt: int = 1
+    # sinalizado quando o pool encerra; tarefas longas devem parar e deixar o lease vencer
+    stop_event: Event = field(default_factory=Event)
+    # sinalizado por ``POST /tasks/{id}/cancel``; a tarefa termina como ``cancelled``
+    cancel_event: Event = field(default_factory=Event)
+    # devolve o progresso atual; o heartbeat grava o resultado em ``task.progress_json``
+    progress: Optional[Callable[[], dict]] = None
+
+
+class PermanentJobError(RuntimeError):
+    """Falha que não melhora com nova tentativa (payload inválido, registro inexistente)."""
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    def register(fn: Handler) -> Handler:
+        HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+@handler("import")
+def run_import(ctx: JobContext) -> dict:
+    from mai.ingest.pipeline import build_providers, ingest_paths
+    from mai.ingest.progress import IngestProgress
+
+    paths = [Path(path) for path in ctx.payload.get("paths") or []]
+    if not paths:
+        raise PermanentJobError("Nenhum caminho informado para importação")
+    progress = IngestProgress(cancel_event=ctx.cancel_event, stop_event=ctx.stop_event)
+    ctx.progress = progress.snapshot
+    ingest_paths(
+        paths,
+        build_providers(get_settings().google_books_key),
+        hash_workers=ctx.payload.get("hash_workers"),
+        enrich_workers=ctx.payload.get("enrich_workers"),
+        full_rescan=bool(ctx.payload.get("full_rescan")),
+        progress=progress,
+    )
+    return {"paths": [str(path) for path in paths], **progress.snapshot()}
+
+
+@handler("providers.refresh")
+def run_provider_refresh(ctx: JobContext) -> dict:
+    from mai.ingest.pipeline import build_providers, identify_edition, select_providers
+
+    providers = select_providers(
+        build_providers(get_settings().google_books_key),
+        ctx.payload.get("providers"),
+        bool(ctx.payload.get("refresh")),
+    )
+    if not providers:
+        raise PermanentJobError("Nenhum provedor selecionado")
+    applied = 0
+    edition_ids = ctx.payload.get("edition_ids") or []
+    for edition_id in edition_ids:
+        if ctx.stop_event.is_set():
+            break
+        # uma transação por edição: uma retomada não refaz as já gravadas
+        with session_scope() as session:
+            edition = session.get(models.Edition, edition_id)
+            if edition is None:
+                continue
+            _, _, auto_applied = identify_edition(
+                session, edition, providers, auto_apply=ctx.payload.get("auto_apply", True)
+            )
+            applied += auto_applied
+    return {"editions": len(edition_ids), "auto_applied": applied}
+
+
+@handler("organize.apply")
+def run_organize_apply(ctx: JobContext) -> dict:
+    from mai.organizer.service import apply_manifest
+
+    with session_scope() as session:
+        try:
+            manifest_id = int(ctx.payload["manifest_id"])
+            return apply_manifest(session, manifest_id, get_settings(), statuses=ctx.payload.get("statuses"))
+        except (KeyError, ValueError) as exc:
+            raise PermanentJobError(str(exc)) from exc
+
+
+@handler("maintenance.hash_backfill")
+def run_hash_backfill(ctx: JobContext) -> dict:
+    from mai.ingest.fingerprint import backfill_hashes
+
+    return {"files": backfill_hashes(ctx.stop_event)}
+
+
+@handler("maintenance.covers")
+def run_cover_download(ctx: JobContext) -> dict:
+    from mai.covers.downloader import fetch_missing_covers
+
+    return {"editions": fetch_missing_covers(ctx.stop_event)}
+
+
+@handler("maintenance.provider_cache")
+def run_provider_cache_purge(ctx: JobContext) -> dict:
+    from mai.ingest.cache import get_provider_cache
+
+    return {"purged": get_provider_cache().purge_expired()}
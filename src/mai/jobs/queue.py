@@ -0,0 +1,226 @@
+"""Fila de tarefas persistida na tabela ``task``.
+
+Um worker reivindica a tarefa pronta de maior prioridade com um ``UPDATE``
+atômico e recebe um lease, renovado por heartbeat enquanto a tarefa roda. Se o
+processo cair, o lease vence e a tarefa volta a ser reivindicável: nada se
+perde num restart. Falhas voltam para ``pending`` com backoff exponencial até
+``max_attempts``.
+
+Cancelar uma tarefa pendente a encerra na hora; numa tarefa em execução só marca
+``cancel_requested``, que o heartbeat do worker repassa ao handler.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import and_, func, or_, select, update
+
+from mai.core.config import get_settings
+from mai.db import models
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def enqueue(
+    session,
+    kind: str,
+    payload: Optional[dict] = None,
+    priority: int = 0,
+    max_attempts: Optional[int] = None,
+    run_after: Optional[datetime] = None,
+) -> models.Task:
+    task = models.Task(
+        kind=kind,
+        payload_json=_dumps(payload or {}),
+        status=PENDING,
+        priority=priority,
+        max_attempts=max_attempts or get_settings().job_max_attempts,
+        run_after=run_after,
+    )
+    session.add(task)
+    session.flush()
+    return task
+
+
+def claim(session, owner: str, lease_seconds: float, kinds: Optional[Iterable[str]] = None) -> Optional[models.Task]:
+    """Reivindica a próxima tarefa pronta (ou com lease vencido) para ``owner``."""
+    now = datetime.utcnow()
+    expired = and_(models.Task.status == RUNNING, models.Task.lease_expires_at < now)
+    # quem pediu cancelamento e perdeu o worker não é retomado
+    session.execute(
+        update(models.Task)
+        .where(expired, models.Task.cancel_requested.is_(True))
+        .values(status=CANCELLED, lease_owner=None, lease_expires_at=None, finished_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    ready = or_(
+        and_(models.Task.status == PENDING, or_(models.Task.run_after.is_(None), models.Task.run_after <= now)),
+        expired,
+    )
+    candidate = select(models.Task.id).where(ready)
+    if kinds is not None:
+        candidate = candidate.where(models.Task.kind.in_(list(kinds)))
+    candidate = candidate.order_by(models.Task.priority.desc(), models.Task.id).limit(1).scalar_subquery()
+    # a condição é repetida no UPDATE: entre o SELECT e a escrita outro worker pode ter vencido
+    task_id = session.execute(
+        update(models.Task)
+        .where(models.Task.id == candidate, ready)
+        .values(
+            status=RUNNING,
+            attempts=models.Task.attempts + 1,
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            heartbeat_at=now,
+            started_at=func.coalesce(models.Task.started_at, now),
+        )
+        .returning(models.Task.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if task_id is None:
+        return None
+    return session.get(models.Task, task_id, populate_existing=True)
+
+
+def heartbeat(
+    session,
+    task_ids: Iterable[int],
+    owner: str,
+    lease_seconds: float,
+    progress: Optional[Dict[int, dict]] = None,
+) -> int:
+    """Renova os leases de ``owner`` e grava o progresso informado; devolve quantas tarefas ainda eram dele."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return 0
+    now = datetime.utcnow()
+    owned = and_(models.Task.lease_owner == owner, models.Task.status == RUNNING)
+    result = session.execute(
+        update(models.Task)
+        .where(models.Task.id.in_(task_ids), owned)
+        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    for task_id, snapshot in (progress or {}).items():
+        if snapshot is None:
+            continue
+        session.execute(
+            update(models.Task)
+            .where(models.Task.id == task_id, owned)
+            .values(progress_json=_dumps(snapshot))
+            .execution_options(synchronize_session=False)
+        )
+    return result.rowcount or 0
+
+
+def cancel_requests(session, task_ids: Iterable[int]) -> Set[int]:
+    """Entre ``task_ids``, as que tiveram cancelamento pedido."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return set()
+    return set(
+        session.scalars(
+            select(models.Task.id).where(models.Task.id.in_(task_ids), models.Task.cancel_requested.is_(True))
+        )
+    )
+
+
+def request_cancel(session, task_id: int) -> Optional[str]:
+    """Pede o cancelamento; devolve o status resultante (``None`` se a tarefa não existe)."""
+    task = session.get(models.Task, task_id)
+    if task is None:
+        return None
+    if task.status == PENDING:
+        task.status = CANCELLED
+        task.finished_at = datetime.utcnow()
+    elif task.status == RUNNING:
+        task.cancel_requested = True
+    session.flush()
+    return task.status
+
+
+def complete(
+    session,
+    task_id: int,
+    owner: str,
+    result: Optional[dict] = None,
+    progress: Optional[dict] = None,
+    cancelled: bool = False,
+) -> bool:
+    """Encerra a tarefa; ``cancelled`` indica que o handler parou a pedido."""
+    extra = {"progress_json": _dumps(progress)} if progress is not None else {}
+    return _finish(
+        session,
+        task_id,
+        owner,
+        status=CANCELLED if cancelled else DONE,
+        result_json=_dumps(result) if result is not None else None,
+        error=None,
+        finished_at=datetime.utcnow(),
+        **extra,
+    )
+
+
+def fail(
+    session, task_id: int, owner: str, error: str, retry: bool = True, progress: Optional[dict] = None
+) -> bool:
+    """Registra a falha; volta para a fila com backoff enquanto houver tentativas."""
+    task = session.get(models.Task, task_id)
+    if task is None or task.lease_owner != owner:
+        return False
+    extra = {"progress_json": _dumps(progress)} if progress is not None else {}
+    if retry and task.attempts < task.max_attempts and not task.cancel_requested:
+        return _finish(
+            session, task_id, owner, status=PENDING, error=error, run_after=_next_run(task.attempts), **extra
+        )
+    return _finish(session, task_id, owner, status=FAILED, error=error, finished_at=datetime.utcnow(), **extra)
+
+
+def release(session, task_id: int, owner: str, progress: Optional[dict] = None) -> bool:
+    """Devolve à fila uma tarefa interrompida pelo encerramento, sem gastar tentativa."""
+    extra = {"progress_json": _dumps(progress)} if progress is not None else {}
+    return _finish(
+        session, task_id, owner, status=PENDING, attempts=models.Task.attempts - 1, run_after=None, **extra
+    )
+
+
+def depth(session) -> Dict[str, int]:
+    """Tarefas pendentes e em execução, para o painel de status."""
+    counts = dict(
+        session.execute(
+            select(models.Task.status, func.count())
+            .where(models.Task.status.in_([PENDING, RUNNING]))
+            .group_by(models.Task.status)
+        ).all()
+    )
+    return {PENDING: counts.get(PENDING, 0), RUNNING: counts.get(RUNNING, 0)}
+
+
+def backoff_seconds(attempts: int) -> float:
+    settings = get_settings()
+    return min(settings.job_backoff_max, settings.job_backoff_base * 2 ** max(0, attempts - 1))
+
+
+def _next_run(attempts: int) -> datetime:
+    return datetime.utcnow() + timedelta(seconds=backoff_seconds(attempts))
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _finish(session, task_id: int, owner: str, **values) -> bool:
+    # só quem detém o lease grava: um worker que o perdeu não sobrescreve quem retomou
+    result = session.execute(
+        update(models.Task)
+        .where(models.Task.id == task_id, models.Task.lease_owner == owner, models.Task.status == RUNNING)
+        .values(lease_owner=None, lease_expires_at=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    return bool(result.rowcount)
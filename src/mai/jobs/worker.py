@@ -0,0 +1,223 @@
+"""Pool de threads que consome a fila ``task``."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from mai.core.config import get_settings
+from mai.core.events import publish
+from mai.core.logging import logger
+from mai.db import models
+from mai.db.session import session_scope
+from mai.jobs import queue
+from mai.jobs.handlers import HANDLERS, JobContext, PermanentJobError
+
+
+class JobPool:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+    ) -> None:
+        settings = get_settings()
+        self.size = max(1, workers or settings.job_workers)
+        self.lease_seconds = lease_seconds or settings.job_lease_seconds
+        self.poll_interval = poll_interval or settings.job_poll_interval
+        # o heartbeat também grava o progresso e repassa cancelamentos: bate mais que o lease exige
+        self.beat_interval = min(self.lease_seconds / 3, settings.job_progress_interval)
+        # identifica o processo no lease: ``host:pid:aleatório``
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running: Dict[int, JobContext] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        for index in range(self.size):
+            thread = threading.Thread(target=self._work, name=f"mai-job-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        beat = threading.Thread(target=self._heartbeat, name="mai-job-heartbeat", daemon=True)
+        beat.start()
+        self._threads.append(beat)
+        logger.info("Fila de tarefas: %s workers (%s)", self.size, self.owner)
+
+    def notify(self) -> None:
+        """Acorda os workers ociosos (ex.: logo após enfileirar)."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            for ctx in self._running.values():
+                ctx.stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def cancel(self, task_id: int) -> bool:
+        """Sinaliza uma tarefa em execução neste processo sem esperar o próximo heartbeat."""
+        with self._lock:
+            ctx = self._running.get(task_id)
+        if ctx is None:
+            return False
+        ctx.cancel_event.set()
+        return True
+
+    def snapshot(self, task_id: int) -> Optional[dict]:
+        """Progresso ao vivo de uma tarefa deste processo (o gravado no banco pode ter alguns segundos)."""
+        with self._lock:
+            ctx = self._running.get(task_id)
+        return _report(ctx) if ctx is not None else None
+
+    def run_pending(self) -> int:
+        """Executa no chamador tudo o que estiver pronto; útil na CLI e em testes."""
+        count = 0
+        while self._run_one():
+            count += 1
+        return count
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ran = self._run_one()
+            except Exception as exc:  # pragma: no cover - ex.: banco bloqueado; tenta de novo
+                logger.warning("Worker da fila falhou ao reivindicar tarefa: %s", exc)
+                ran = False
+            if not ran:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _run_one(self) -> bool:
+        with session_scope() as session:
+            task = queue.claim(session, self.owner, self.lease_seconds, kinds=HANDLERS)
+            if task is None:
+                return False
+            ctx = JobContext(task_id=task.id, payload=json.loads(task.payload_json or "{}"), attempt=task.attempts)
+            if task.cancel_requested:
+                ctx.cancel_event.set()
+            kind = task.kind
+        with self._lock:
+            self._running[ctx.task_id] = ctx
+        publish_depth()
+        if self._stop.is_set():
+            ctx.stop_event.set()
+        try:
+            result = HANDLERS[kind](ctx)
+        except PermanentJobError as exc:
+            self._finish(ctx, error=str(exc), retry=False)
+        except Exception as exc:
+            logger.exception("Tarefa %s (%s) falhou na tentativa %s", ctx.task_id, kind, ctx.attempt)
+            self._finish(ctx, error=f"{type(exc).__name__}: {exc}", retry=True)
+        else:
+            self._finish(ctx, result=result)
+        return True
+
+    def _finish(
+        self, ctx: JobContext, result: Optional[dict] = None, error: Optional[str] = None, retry: bool = True
+    ) -> None:
+        with self._lock:
+            self._running.pop(ctx.task_id, None)
+        cancelled = ctx.cancel_event.is_set()
+        progress = _report(ctx)
+        if self._stop.is_set() and not cancelled:
+            # parou no meio pelo encerramento (com ou sem exceção do desmonte): não é falha da tarefa
+            with session_scope() as session:
+                released = queue.release(session, ctx.task_id, self.owner, progress=progress)
+            if released:
+                logger.info("Tarefa %s devolvida à fila pelo encerramento", ctx.task_id)
+                publish_depth()
+            return
+        with session_scope() as session:
+            if error is None:
+                kept = queue.complete(session, ctx.task_id, self.owner, result, progress=progress, cancelled=cancelled)
+            else:
+                kept = queue.fail(session, ctx.task_id, self.owner, error, retry=retry, progress=progress)
+            status = session.scalar(select(models.Task.status).where(models.Task.id == ctx.task_id))
+        if not kept:
+            logger.warning("Lease da tarefa %s perdido; resultado descartado", ctx.task_id)
+            return
+        publish("task.finished", task_id=ctx.task_id, status=status, error=error, progress=progress)
+        publish_depth()
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.beat_interval):
+            with self._lock:
+                running = dict(self._running)
+            if not running:
+                continue
+            progress = {task_id: _report(ctx) for task_id, ctx in running.items() if ctx.progress is not None}
+            try:
+                with session_scope() as session:
+                    queue.heartbeat(session, running, self.owner, self.lease_seconds, progress=progress)
+                    # o pedido pode ter vindo de outro processo (API separada dos workers)
+                    cancelled = queue.cancel_requests(session, running)
+            except Exception as exc:  # pragma: no cover - próxima batida tenta de novo
+                logger.warning("Heartbeat da fila falhou: %s", exc)
+                continue
+            for task_id in cancelled:
+                running[task_id].cancel_event.set()
+            for task_id, snapshot in progress.items():
+                if snapshot is not None:
+                    publish("task.progress", task_id=task_id, progress=snapshot)
+
+
+def publish_depth() -> None:
+    try:
+        with session_scope() as session:
+            depth = queue.depth(session)
+    except Exception as exc:  # pragma: no cover - banco ocupado; o próximo evento corrige
+        logger.debug("Profundidade da fila indisponível: %s", exc)
+        return
+    publish("queue.depth", sticky=True, **depth)
+
+
+def _report(ctx: JobContext) -> Optional[dict]:
+    if ctx.progress is None:
+        return None
+    try:
+        return ctx.progress()
+    except Exception as exc:  # pragma: no cover - progresso é informativo
+        logger.debug("Progresso da tarefa %s indisponível: %s", ctx.task_id, exc)
+        return None
+
+
+_pool: Optional[JobPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_job_pool() -> JobPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JobPool()
+        return _pool
+
+
+def start_job_pool() -> Optional[JobPool]:
+    if get_settings().job_workers <= 0:
+        logger.info("Fila de tarefas desabilitada (job_workers=0)")
+        return None
+    pool = get_job_pool()
+    pool.start()
+    return pool
+
+
+def shutdown_job_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.stop()
@@ -10,6 +10,7 @@ from fastapi.staticfiles import StaticFiles
 from mai.api.routes import (
     auth,
     books,
+    covers,
     dashboard,
     events,
     files,
@@ -19,11 +20,15 @@ from mai.api.routes import (
     organize,
     providers,
     review,
+    tasks,
 )
 from mai.core.config import get_settings
 from mai.core.logging import configure_logging
 from mai.db.init import apply_schema
+from mai.ingest.pipeline import close_providers
+from mai.ingest.sandbox import shutdown_extractor_pool
 from mai.ingest.service import start_watcher, stop_watcher, watcher_disabled
+from mai.jobs import shutdown_job_pool, start_job_pool
 
 
 def create_app() -> FastAPI:
@@ -37,16 +42,22 @@ def create_app() -> FastAPI:
         if settings.watch_paths and not watcher_disabled():
             paths = [Path(p).resolve() for p in settings.watch_paths]
             watcher_started = start_watcher(paths, settings.google_books_key)
+        # retoma tarefas interrompidas (lease vencido) e as enfileiradas antes do restart
+        start_job_pool()
         try:
             yield
         finally:
+            shutdown_job_pool()
             if watcher_started:
                 stop_watcher()
+            close_providers()
+            shutdown_extractor_pool()
 
     app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
 
     app.include_router(health.router)
     app.include_router(books.router)
+    app.include_router(covers.router)
     app.include_router(imports.router)
     static_dir = Path(__file__).resolve().parents[2] / "static"
     app.include_router(organize.router)
@@ -57,6 +68,7 @@ def create_app() -> FastAPI:
     app.include_router(files.router)
     app.include_router(review.router)
     app.include_router(opds.router)
+    app.include_router(tasks.router)
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
     ui_dist = Path(__file__).resolve().parents[2] / "ui" / "dist"
@@ -0,0 +1,4 @@
+"""Índice local dos dumps do Open Library e o provedor que o consulta."""
+
+from .dump import build_index, default_dump_db  # noqa: F401
+from .provider import LocalOpenLibraryProvider  # noqa: F401
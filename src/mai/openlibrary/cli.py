@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from mai.core.config import get_settings
+from mai.core.logging import configure_logging, logger
+from mai.openlibrary.dump import build_index, default_dump_db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importa dumps do Open Library para o índice local")
+    parser.add_argument(
+        "dumps",
+        nargs="+",
+        type=Path,
+        help="Arquivos ol_dump_*.txt.gz (autores, obras e edições, em qualquer ordem)",
+    )
+    parser.add_argument("--db", type=Path, default=None, help="Banco do índice (padrão: MAI_OL_DUMP_DB)")
+    args = parser.parse_args()
+
+    configure_logging(get_settings().debug)
+    missing = [path for path in args.dumps if not path.exists()]
+    if missing:
+        raise SystemExit(f"Dump não encontrado: {', '.join(map(str, missing))}")
+    db_path = build_index(args.dumps, args.db or default_dump_db())
+    logger.info("Índice gravado em %s", db_path)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,217 @@
+"""Índice local dos dumps mensais do Open Library.
+
+Os dumps (``ol_dump_{editions,works,authors}_*.txt.gz``) são TSV com cinco
+colunas — tipo, chave, revisão, data e o registro em JSON — e são lidos linha
+a linha, sem descompactar em disco. O índice fica num SQLite separado do
+catálogo: tabelas ``author``/``work``/``edition``, ``isbn`` (B-tree, sem
+rowid) e ``search`` (FTS5 sem conteúdo sobre título e autores), preenchida
+por ``finalize`` depois que todos os dumps foram carregados.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from mai.core.config import get_settings
+from mai.core.logging import logger
+from mai.ingest.isbn import isbn13
+
+IMPORT_BATCH = 10_000
+YEAR_PATTERN = re.compile(r"\d{4}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS author (
+  key TEXT PRIMARY KEY,
+  name TEXT
+);
+CREATE TABLE IF NOT EXISTS work (
+  key TEXT PRIMARY KEY,
+  title TEXT,
+  author_keys TEXT
+);
+CREATE TABLE IF NOT EXISTS edition (
+  key TEXT PRIMARY KEY,
+  work_key TEXT,
+  title TEXT,
+  subtitle TEXT,
+  publisher TEXT,
+  pub_year INTEGER,
+  language TEXT,
+  author_keys TEXT,
+  cover_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS isbn (
+  isbn TEXT NOT NULL,
+  edition_key TEXT NOT NULL,
+  PRIMARY KEY (isbn, edition_key)
+) WITHOUT ROWID;
+-- ISBN de um resultado da busca textual: sem ele, cada candidato varre a tabela inteira
+CREATE INDEX IF NOT EXISTS isbn_edition ON isbn(edition_key);
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+  title, authors, content='', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+def default_dump_db() -> Path:
+    settings = get_settings()
+    return settings.ol_dump_db or settings.db_path.parent / "openlibrary.db"
+
+
+def connect(path: Path, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    conn = sqlite3.connect(path)
+    # carga em massa reconstruível a partir dos dumps: durabilidade não importa
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def iter_dump(path: Path) -> Iterator[Tuple[str, str, dict]]:
+    """(tipo, chave, registro) de cada linha do dump; linhas malformadas são ignoradas."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            parts = line.rstrip("\n").split("\t", 4)
+            if len(parts) != 5:
+                continue
+            try:
+                yield parts[0], parts[1], json.loads(parts[4])
+            except json.JSONDecodeError:
+                continue
+
+
+def _keys(entries) -> Optional[str]:
+    """Lista JSON de chaves de autor, nos dois formatos usados pelos registros."""
+    keys = []
+    for entry in entries or []:
+        ref = entry.get("author", entry) if isinstance(entry, dict) else None
+        key = ref.get("key") if isinstance(ref, dict) else None
+        if key:
+            keys.append(key)
+    return json.dumps(keys) if keys else None
+
+
+def _first(values) -> Optional[str]:
+    return values[0] if isinstance(values, list) and values else None
+
+
+def author_row(key: str, record: dict) -> tuple:
+    return key, record.get("name") or record.get("personal_name")
+
+
+def work_row(key: str, record: dict) -> tuple:
+    return key, record.get("title"), _keys(record.get("authors"))
+
+
+def edition_row(key: str, record: dict) -> tuple:
+    year = YEAR_PATTERN.search(record.get("publish_date") or "")
+    language = _first(record.get("languages"))
+    if isinstance(language, dict):  # {"key": "/languages/eng"}
+        language = language.get("key", "").rsplit("/", 1)[-1] or None
+    cover = _first([value for value in record.get("covers") or [] if isinstance(value, int) and value > 0])
+    return (
+        key,
+        (_first(record.get("works")) or {}).get("key"),
+        record.get("title"),
+        record.get("subtitle"),
+        _first(record.get("publishers")),
+        int(year.group()) if year else None,
+        language if isinstance(language, str) else None,
+        _keys(record.get("authors")),
+        cover,
+    )
+
+
+def isbn_rows(key: str, record: dict) -> List[tuple]:
+    values = {isbn13(value) for value in [*record.get("isbn_13", []), *record.get("isbn_10", [])]}
+    return [(value, key) for value in values if value]
+
+
+INSERTS: Dict[str, str] = {
+    "/type/author": "INSERT OR REPLACE INTO author VALUES (?, ?)",
+    "/type/work": "INSERT OR REPLACE INTO work VALUES (?, ?, ?)",
+    "/type/edition": "INSERT OR REPLACE INTO edition VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
+ROWS = {"/type/author": author_row, "/type/work": work_row, "/type/edition": edition_row}
+
+
+def import_dump(conn: sqlite3.Connection, path: Path, batch_size: int = IMPORT_BATCH) -> Dict[str, int]:
+    """Carrega um dump (de qualquer tipo, ou o dump completo) em ``conn``."""
+    pending: Dict[str, List[tuple]] = {kind: [] for kind in INSERTS}
+    isbns: List[tuple] = []
+    counts: Dict[str, int] = {kind: 0 for kind in INSERTS}
+
+    def flush() -> None:
+        with conn:
+            for kind, rows in pending.items():
+                if rows:
+                    conn.executemany(INSERTS[kind], rows)
+                    counts[kind] += len(rows)
+                    rows.clear()
+            if isbns:
+                conn.executemany("INSERT OR IGNORE INTO isbn VALUES (?, ?)", isbns)
+                isbns.clear()
+
+    buffered = 0
+    for kind, key, record in iter_dump(path):
+        build = ROWS.get(kind)
+        if build is None:
+            continue  # redirects, deletes, listas etc.
+        pending[kind].append(build(key, record))
+        if kind == "/type/edition":
+            isbns.extend(isbn_rows(key, record))
+        buffered += 1
+        if buffered >= batch_size:
+            flush()
+            buffered = 0
+    flush()
+    logger.info(
+        "Dump %s: %s autores, %s obras, %s edições",
+        path.name,
+        counts["/type/author"],
+        counts["/type/work"],
+        counts["/type/edition"],
+    )
+    return counts
+
+
+def finalize(conn: sqlite3.Connection) -> int:
+    """Reconstrói o índice de busca; edições sem autores herdam os da obra."""
+    with conn:
+        conn.execute("INSERT INTO search(search) VALUES ('delete-all')")
+        conn.execute(
+            """
+            INSERT INTO search(rowid, title, authors)
+            SELECT e.rowid,
+                   coalesce(e.title, w.title, '') || coalesce(' ' || e.subtitle, ''),
+                   coalesce((SELECT group_concat(a.name, ' ')
+                             FROM json_each(coalesce(e.author_keys, w.author_keys)) AS j
+                             JOIN author AS a ON a.key = j.value), '')
+            FROM edition AS e LEFT JOIN work AS w ON w.key = e.work_key
+            """
+        )
+    total = conn.execute("SELECT count(*) FROM edition").fetchone()[0]
+    conn.execute("PRAGMA optimize")
+    logger.info("Índice Open Library pronto: %s edições", total)
+    return total
+
+
+def build_index(paths: List[Path], db_path: Optional[Path] = None) -> Path:
+    db_path = db_path or default_dump_db()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = connect(db_path)
+    try:
+        for path in paths:
+            import_dump(conn, path)
+        finalize(conn)
+    finally:
+        conn.close()
+    return db_path
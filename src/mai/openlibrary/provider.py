@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from mai.ingest.providers import Provider
+from mai.ingest.types import Candidate
+from mai.openlibrary.dump import connect, default_dump_db
+
+COVER_URL = "https://covers.openlibrary.org/b/id/{}-L.jpg"
+WORD_PATTERN = re.compile(r"\w+")
+
+EDITION_COLUMNS = """
+    e.key, coalesce(e.title, w.title), e.publisher, e.pub_year, e.language, e.cover_id,
+    coalesce(e.author_keys, w.author_keys)
+"""
+
+
+class LocalOpenLibraryProvider(Provider):
+    """Consultas ao índice local dos dumps do Open Library: sem rede e sem limite de taxa."""
+
+    slug = "openlibrary_dump"
+
+    def __init__(self, db_path: Optional[Path] = None) -> None:
+        self.db_path = db_path or default_dump_db()
+        # sqlite3 não compartilha conexões entre threads com segurança
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.db_path, readonly=True)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        row = self.conn.execute(
+            f"""
+            SELECT {EDITION_COLUMNS}
+            FROM isbn AS i
+            JOIN edition AS e ON e.key = i.edition_key
+            LEFT JOIN work AS w ON w.key = e.work_key
+            WHERE i.isbn = ?
+            LIMIT 1
+            """,
+            (isbn13,),
+        ).fetchone()
+        return self._candidate(row, isbn13) if row else None
+
+    def search(self, query: str) -> List[Candidate]:
+        # termos entre aspas: pontuação do título não vira sintaxe do FTS5
+        terms = " ".join(f'"{word}"' for word in WORD_PATTERN.findall(query))
+        if not terms:
+            return []
+        rows = self.conn.execute(
+            f"""
+            SELECT {EDITION_COLUMNS}
+            FROM search AS s
+            JOIN edition AS e ON e.rowid = s.rowid
+            LEFT JOIN work AS w ON w.key = e.work_key
+            WHERE search MATCH ?
+            ORDER BY s.rank
+            LIMIT 5
+            """,
+            (terms,),
+        ).fetchall()
+        return [self._candidate(row) for row in rows]
+
+    def _candidate(self, row, isbn13: Optional[str] = None) -> Candidate:
+        key, title, publisher, year, language, cover_id, author_keys = row
+        if isbn13 is None:
+            found = self.conn.execute("SELECT isbn FROM isbn WHERE edition_key = ? LIMIT 1", (key,)).fetchone()
+            isbn13 = found[0] if found else None
+        return Candidate(
+            source="openlibrary",
+            title=title,
+            authors=self._authors(author_keys),
+            year=year,
+            publisher=publisher,
+            language=language,
+            ids={"ISBN13": isbn13, "OLID": key.rsplit("/", 1)[-1]},
+            cover_url=COVER_URL.format(cover_id) if cover_id else None,
+            payload={"key": key, "source": "dump"},
+        )
+
+    def _authors(self, author_keys: Optional[str]) -> List[str]:
+        keys = json.loads(author_keys) if author_keys else []
+        if not keys:
+            return []
+        placeholders = ", ".join("?" for _ in keys)
+        names = dict(self.conn.execute(f"SELECT key, name FROM author WHERE key IN ({placeholders})", keys))
+        return [names[key] for key in keys if names.get(key)]
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import re
-import unicodedata
 from pathlib import Path
 from typing import Dict
 
 from mai.db import models
+from mai.utils.text import strip_accents
 
 SAFE_TEMPLATE = "{author_last}/{title}.{ext}"
 INVALID_CHARS = re.compile(r"[<>:\\|?*]")
@@ -18,8 +18,7 @@ class SafeDict(dict):
 
 
 def slugify(value: str) -> str:
-    value = unicodedata.normalize("NFKD", value)
-    value = value.encode("ascii", "ignore").decode("ascii")
+    value = strip_accents(value)
     value = INVALID_CHARS.sub("", value)
     value = value.replace("/", "-").replace("\\", "-")
     value = MULTI_SEP.sub("_", value.strip())
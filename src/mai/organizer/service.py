@@ -1,22 +1,23 @@
 from __future__ import annotations
 
 import os
+from concurrent.futures import Future
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session, selectinload
 
 from mai.core.config import Settings
+from mai.core.events import publish
 from mai.core.logging import logger
 from mai.db import models
-from mai.db.indexer import upsert_for_edition
 from mai.ingest.service import start_watcher, stop_watcher
 from mai.organizer.fs import safe_move
 from mai.organizer.namer import SAFE_TEMPLATE, build_context, render_destination
-from mai.utils.files import compute_sha256
+from mai.utils.hashing import get_hash_service
 
 
 @dataclass
@@ -137,6 +138,7 @@ def apply_manifest(
     manifest.watcher_state = "running" if was_running else "stopped"
     summary = {"done": 0, "failed": 0, "skipped": 0}
     allowed = set(statuses or ["planned", "failed"])
+    verifying: List[Tuple[models.OrganizeOp, Optional[Future]]] = []
 
     for op in ops:
         if op.status == "skipped":
@@ -146,16 +148,27 @@ def apply_manifest(
             continue
 
         try:
-            _apply_op(session, op)
+            verifying.append((op, _apply_op(session, op)))
             summary["done"] += 1
         except Exception as exc:  # pragma: no cover - logged for diagnostics
             op.status = "failed"
             op.error = str(exc)
             summary["failed"] += 1
             logger.exception("Falha ao aplicar operação %s: %s", op.id, exc)
+        publish("manifest.progress", manifest_id=manifest_id, status="applying", total=len(ops), op_id=op.id, **summary)
+
+    # os hashes de destino são calculados em paralelo enquanto os próximos arquivos são movidos
+    for op, dst_hash in verifying:
+        if dst_hash is None:
+            continue
+        try:
+            op.dst_sha256 = dst_hash.result()
+        except OSError as exc:  # pragma: no cover - arquivo removido logo após o move
+            logger.warning("Hash de destino indisponível para operação %s: %s", op.id, exc)
 
     manifest.status = "applied" if summary["failed"] == 0 else "failed"
     session.flush()
+    publish("manifest.progress", manifest_id=manifest_id, status=manifest.status, total=len(ops), **summary)
 
     _restart_watcher(settings, was_running)
     return summary
@@ -199,7 +212,8 @@ def rollback_manifest(session: Session, manifest_id: int, settings: Settings) ->
     return summary
 
 
-def _apply_op(session: Session, op: models.OrganizeOp) -> None:
+def _apply_op(session: Session, op: models.OrganizeOp) -> Optional[Future]:
+    """Move o arquivo; devolve o hash do destino ainda em cálculo (``None`` se pulado)."""
     src = Path(op.src_path)
     dst = Path(op.dst_path)
     if not src.exists():
@@ -207,11 +221,14 @@ def _apply_op(session: Session, op: models.OrganizeOp) -> None:
 
     dst.parent.mkdir(parents=True, exist_ok=True)
     if dst.exists():
-        dst_hash = compute_sha256(dst)
-        if op.src_sha256 and dst_hash == op.src_sha256:
+        hashes = get_hash_service()
+        dst_hash = hashes.sha256(dst)
+        # arquivos catalogados só com a impressão rápida ainda não têm SHA-256
+        op.src_sha256 = op.src_sha256 or hashes.sha256(src).result()
+        if dst_hash.result() == op.src_sha256:
             op.status = "skipped"
             op.reason = "duplicate_destination"
-            return
+            return None
         backup = dst.with_suffix(dst.suffix + f".mai.keep.{op.id}")
         os.replace(dst, backup)
 
@@ -230,9 +247,7 @@ def _apply_op(session: Session, op: models.OrganizeOp) -> None:
 
     op.status = "done"
     op.reason = None
-    op.dst_sha256 = compute_sha256(dst)
-
-    upsert_for_edition(session, op.edition_id)
+    return get_hash_service().sha256(dst)
 
 
 def _rollback_op(session: Session, op: models.OrganizeOp) -> None:
@@ -256,7 +271,6 @@ def _rollback_op(session: Session, op: models.OrganizeOp) -> None:
 
     op.status = "reverted"
     op.reason = "rolled_back"
-    upsert_for_edition(session, op.edition_id)
 
 
 def _restart_watcher(settings: Settings, was_running: bool) -> None:
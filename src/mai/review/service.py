@@ -5,8 +5,8 @@ from typing import List, Tuple
 from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session, selectinload
 
+from mai.core.events import publish
 from mai.db import models
-from mai.db.indexer import upsert_for_edition
 from mai.ingest.pipeline import (
     apply_candidate_to_edition,
     deserialize_ranked_candidates,
@@ -107,6 +107,7 @@ def resolve_review(
         identify.auto_accepted = True
         identify.chosen_provider = None
         session.flush()
+        publish("review.resolved", edition_id=edition_id, status="rejected", provider=None)
         return "rejected", None
 
     if candidate_index is None or candidate_index < 0 or candidate_index >= len(ranked):
@@ -124,5 +125,5 @@ def resolve_review(
     identify.top_score = score
 
     record_identification(session, edition.id, ranked, candidate, score)
-    upsert_for_edition(session, edition.id)
+    publish("review.resolved", edition_id=edition_id, status="accepted", provider=candidate.source)
     return "accepted", candidate.source
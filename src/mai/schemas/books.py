@@ -37,6 +37,7 @@ class EditionSchema(BaseModel):
     language: Optional[str]
     format: Optional[str]
     cover_url: Optional[str]
+    thumbnail_url: Optional[str] = None
 
 
 class BookListItem(BaseModel):
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field, validator
 
 
 class ImportRequest(BaseModel):
     paths: Optional[List[Path]] = Field(default=None, description="Lista de diretórios/arquivos")
+    hash_workers: Optional[int] = Field(default=None, ge=1, le=64, description="Workers de hash/extração")
+    enrich_workers: Optional[int] = Field(default=None, ge=1, le=128, description="Workers de enriquecimento")
+    full_rescan: bool = Field(default=False, description="Relista diretórios mesmo sem mudança de mtime")
+    priority: int = Field(default=0, ge=-100, le=100, description="Prioridade na fila de tarefas")
 
     @validator("paths", each_item=True)
     def _must_exist(cls, value: Path) -> Path:  # pragma: no cover - validação simples
@@ -17,6 +21,28 @@ class ImportRequest(BaseModel):
 class ImportResponse(BaseModel):
     status: str
     paths: List[str]
+    task_id: Optional[int] = None
+
+
+class ImportStatus(BaseModel):
+    task_id: int
+    status: str
+    paths: List[str]
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    discovered: int = 0
+    hashed: int = 0
+    enriched: int = 0
+    persisted: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed_seconds: float = 0.0
+    files_per_sec: float = 0.0
+    eta_seconds: Optional[float] = Field(default=None, description="Estimativa; nula enquanto não há taxa medida")
+    discovering: bool = False
+    cancelled: bool = Field(default=False, description="O scan parou a pedido antes de percorrer tudo")
+    stage_latency_ms: Dict[str, Optional[float]] = Field(default_factory=dict, description="Média por arquivo")
 
 
 class WatchRequest(BaseModel):
@@ -11,6 +11,7 @@ class ProviderFetchRequest(BaseModel):
     edition_id: int = Field(gt=0)
     providers: Optional[List[str]] = None
     auto_apply: bool = True
+    refresh: bool = Field(default=False, description="Ignora o cache e consulta os provedores novamente")
 
 
 class ProviderFetchResponse(BaseModel):
@@ -18,3 +19,11 @@ class ProviderFetchResponse(BaseModel):
     auto_applied: bool
     top_score: float
     candidates: List[CandidateInfo]
+
+
+class ProviderCacheStats(BaseModel):
+    hits: int
+    negative_hits: int
+    misses: int
+    stores: int
+    hit_ratio: float
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class TaskCreate(BaseModel):
+    kind: str = Field(description="Tipo registrado: import, providers.refresh, organize.apply, maintenance.*")
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    priority: int = Field(default=0, ge=-100, le=100, description="Maior roda primeiro")
+
+
+class TaskSchema(BaseModel):
+    id: int
+    kind: str
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    payload: Dict[str, Any]
+    result: Optional[Any]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    run_after: Optional[datetime]
+    heartbeat_at: Optional[datetime]
+    progress: Optional[Dict[str, Any]] = None
+    cancel_requested: bool = False
+
+
+class TaskList(BaseModel):
+    total: int
+    items: List[TaskSchema]
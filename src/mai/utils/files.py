@@ -1,12 +1,65 @@
 from __future__ import annotations
 
 import hashlib
+import os
+import threading
 from pathlib import Path
+from typing import Optional
+
+HASH_BUFFER_SIZE = 1024 * 1024
+QUICK_BLOCK_SIZE = 64 * 1024
+
+# um buffer por thread: os workers de hash leem em paralelo sem alocar por bloco
+_buffers = threading.local()
+
+
+def _buffer(size: int) -> memoryview:
+    buffer = getattr(_buffers, "view", None)
+    if buffer is None or len(buffer) < size:
+        buffer = _buffers.view = memoryview(bytearray(size))
+    return buffer[:size]
+
+
+def _advise_sequential(fd: int) -> None:
+    # dobra o read-ahead do kernel; indisponível fora de POSIX
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
 
 
 def compute_sha256(path: Path) -> str:
     digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
+    view = _buffer(HASH_BUFFER_SIZE)
+    with path.open("rb", buffering=0) as handle:
+        _advise_sequential(handle.fileno())
+        while True:
+            read = handle.readinto(view)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def compute_quick_hash(path: Path, size: Optional[int] = None) -> str:
+    """Impressão rápida: tamanho + blake2b dos blocos inicial, do meio e final.
+
+    Conteúdos iguais sempre têm a mesma impressão; impressões iguais só indicam
+    que vale a pena comparar o SHA-256 completo.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    view = _buffer(QUICK_BLOCK_SIZE)
+    with path.open("rb", buffering=0) as handle:
+        if size is None:
+            size = handle.seek(0, 2)
+        digest.update(size.to_bytes(8, "little"))
+        if size <= 3 * QUICK_BLOCK_SIZE:
+            offsets = range(0, size, QUICK_BLOCK_SIZE)
+        else:
+            offsets = (0, (size - QUICK_BLOCK_SIZE) // 2, size - QUICK_BLOCK_SIZE)
+        for offset in offsets:
+            handle.seek(offset)
+            read = handle.readinto(view)
+            digest.update(view[:read])
     return digest.hexdigest()
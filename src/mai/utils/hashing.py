@@ -0,0 +1,126 @@
+"""Serviço de hash compartilhado por ingestão, organizador e verificação de integridade.
+
+``hashlib`` libera o GIL em blocos grandes, então um pool de threads escala com
+os núcleos. As leituras são agendadas por dispositivo (``st_dev``): no máximo
+``per_device`` arquivos do mesmo disco são lidos ao mesmo tempo, e os discos
+são atendidos em rodízio para que um deles não monopolize os workers.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from mai.core.config import get_settings
+from mai.core.logging import logger
+from mai.utils.files import compute_quick_hash, compute_sha256
+
+_Job = Tuple[Future, Callable, tuple]
+
+
+class HashService:
+    def __init__(self, workers: Optional[int] = None, per_device: Optional[int] = None) -> None:
+        settings = get_settings()
+        self.workers = max(1, workers or settings.hash_workers or os.cpu_count() or 1)
+        self.per_device = max(1, per_device or settings.hash_per_device)
+        self._cond = threading.Condition()
+        self._queues: Dict[int, Deque[_Job]] = {}
+        self._devices: Deque[int] = deque()
+        self._active: Counter = Counter()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+
+    def sha256(self, path: Path) -> "Future[str]":
+        return self.submit(path, compute_sha256, path)
+
+    def quick_hash(self, path: Path, size: Optional[int] = None) -> "Future[str]":
+        return self.submit(path, compute_quick_hash, path, size)
+
+    def submit(self, path: Path, fn: Callable, *args) -> Future:
+        """Agenda ``fn(*args)`` na fila do dispositivo de ``path``."""
+        try:
+            device = os.stat(path).st_dev
+        except OSError:
+            device = -1  # o próprio job vai falhar com o erro de leitura
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("HashService encerrado")
+            if device not in self._queues:
+                self._queues[device] = deque()
+                self._devices.append(device)
+            self._queues[device].append((future, fn, args))
+            self._spawn()
+            self._cond.notify()
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def _spawn(self) -> None:
+        if len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"mai-hash-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next(self) -> Optional[Tuple[int, _Job]]:
+        for _ in range(len(self._devices)):
+            device = self._devices[0]
+            self._devices.rotate(-1)
+            jobs = self._queues[device]
+            if jobs and self._active[device] < self.per_device:
+                return device, jobs.popleft()
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                picked = self._next()
+                while picked is None:
+                    if self._closed and not any(self._queues.values()):
+                        return
+                    self._cond.wait()
+                    picked = self._next()
+                device, (future, fn, args) = picked
+                self._active[device] += 1
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as exc:
+                        future.set_exception(exc)
+            finally:
+                with self._cond:
+                    self._active[device] -= 1
+                    self._cond.notify_all()
+
+
+_service: Optional[HashService] = None
+_service_lock = threading.Lock()
+
+
+def get_hash_service() -> HashService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = HashService()
+            logger.debug("Serviço de hash com %s workers, %s por dispositivo", _service.workers, _service.per_device)
+        return _service
+
+
+def shutdown_hash_service() -> None:
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.shutdown()
@@ -0,0 +1,75 @@
+"""Normalização de texto compartilhada (títulos, nomes, slugs).
+
+As tabelas de ``str.translate`` são preenchidas sob demanda, um code point por
+vez, e os resultados ficam num LRU limitado: títulos e nomes de autores se
+repetem muito entre scans, comparações e buscas.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Optional
+
+CACHE_SIZE = 65536
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+class _KeepTable(dict):
+    """Mapa code point -> ``None`` (remove) ou o próprio caractere, calculado uma vez."""
+
+    def __init__(self, keep) -> None:
+        super().__init__()
+        self._keep = keep
+
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        value = char if self._keep(char) else None
+        self[codepoint] = value
+        return value
+
+
+def _searchable(char: str) -> bool:
+    return unicodedata.category(char)[0] != "M" and (char.isalnum() or char.isspace())
+
+
+def _ascii(char: str) -> bool:
+    return char.isascii()
+
+
+_SEARCHABLE = _KeepTable(_searchable)
+_ASCII = _KeepTable(_ascii)
+
+
+def normalize(text: Optional[str]) -> str:
+    """Minúsculas, sem acentos nem pontuação, espaços colapsados."""
+    if not text:
+        return ""
+    return _normalize(text)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _normalize(text: str) -> str:
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+    return " ".join(text.translate(_SEARCHABLE).lower().split())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def strip_accents(text: str) -> str:
+    """Decomposição NFKD reduzida a ASCII (acentos e não-ASCII descartados)."""
+    if text.isascii():
+        return text
+    return unicodedata.normalize("NFKD", text).translate(_ASCII)
+
+
+def name_key(name: str) -> str:
+    """Chave de busca de autores; nomes só com símbolos mantêm o próprio texto."""
+    return normalize(name) or name.strip()
+
+
+def strip_tags(text: str) -> str:
+    """Texto de um trecho HTML/XHTML: sem marcação, entidades resolvidas."""
+    return html.unescape(TAG_PATTERN.sub(" ", text))
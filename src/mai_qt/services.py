@@ -10,7 +10,7 @@ from sqlalchemy import or_, select
 
 from mai.db import models
 from mai.db.session import session_scope
-from mai.db.indexer import upsert_for_edition
+from mai.ingest.pipeline import get_or_create_author
 
 
 @dataclass
@@ -110,6 +110,12 @@ class BackendClient:
     def import_scan(self, paths: List[str]) -> dict:
         return self._request("POST", "/import/scan", json={"paths": paths or None})
 
+    def import_status(self, task_id: int) -> dict:
+        return self._request("GET", f"/import/{task_id}")
+
+    def import_cancel(self, task_id: int) -> dict:
+        return self._request("POST", f"/import/{task_id}/cancel")
+
     def watch_start(self, paths: List[str]) -> dict:
         return self._request("POST", "/import/watch", json={"paths": paths or None})
 
@@ -264,12 +270,6 @@ class LibraryService:
             new_names = [name.strip() for name in detail.authors if name.strip()]
             work.authors.clear()
             for name in new_names:
-                author = session.scalar(select(models.Author).where(models.Author.name == name))
-                if not author:
-                    author = models.Author(name=name)
-                    session.add(author)
-                    session.flush()
-                work.authors.append(author)
+                work.authors.append(get_or_create_author(session, name))
 
             session.flush()
-            upsert_for_edition(session, edition.id)
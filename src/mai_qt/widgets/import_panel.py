@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
+    QFormLayout,
     QLabel,
     QLineEdit,
     QPushButton,
@@ -15,15 +17,37 @@ from PySide6.QtWidgets import (
 
 from ..services import BackendClient
 
+FINISHED_STATUSES = {"done", "failed", "cancelled"}
+COUNTERS = (
+    ("discovered", "descobertos"),
+    ("hashed", "hash"),
+    ("enriched", "enriquecidos"),
+    ("persisted", "gravados"),
+    ("unchanged", "inalterados"),
+    ("failed", "falhas"),
+)
+
 
 class ImportPanel(QWidget):
     def __init__(self, backend: BackendClient, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.backend = backend
+        self.task_id: Optional[int] = None
         self.paths_input = QLineEdit()
         self.paths_input.setPlaceholderText("Caminhos separados por ponto e vírgula ou deixe vazio para usar os paths configurados")
         self.log = QTextEdit()
         self.log.setReadOnly(True)
+        self.status_label = QLabel("Nenhuma importação em andamento")
+        self.counts_label = QLabel("-")
+        self.rate_label = QLabel("-")
+        self.latency_label = QLabel("-")
+        self.cancel_btn = QPushButton("Cancelar importação")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_scan)
+        # consulta o progresso enquanto a tarefa de importação roda
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(1000)
+        self.poll_timer.timeout.connect(self.refresh_status)
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -39,11 +63,19 @@ class ImportPanel(QWidget):
         stop_btn = QPushButton("Parar Watcher")
         stop_btn.clicked.connect(self.stop_watcher)
         buttons.addWidget(scan_btn)
+        buttons.addWidget(self.cancel_btn)
         buttons.addWidget(watch_btn)
         buttons.addWidget(stop_btn)
         buttons.addStretch(1)
         layout.addLayout(buttons)
 
+        progress = QFormLayout()
+        progress.addRow("Status", self.status_label)
+        progress.addRow("Arquivos", self.counts_label)
+        progress.addRow("Vazão", self.rate_label)
+        progress.addRow("Latência por estágio", self.latency_label)
+        layout.addLayout(progress)
+
         layout.addWidget(QLabel("Log"))
         layout.addWidget(self.log)
 
@@ -60,6 +92,60 @@ class ImportPanel(QWidget):
             QMessageBox.critical(self, "Importação", f"Falha no scan: {exc}")
             return
         self.log.append(f"Scan agendado: {result}")
+        self.task_id = result.get("task_id")
+        if self.task_id:
+            self.cancel_btn.setEnabled(True)
+            self.poll_timer.start()
+            self.refresh_status()
+
+    def cancel_scan(self) -> None:
+        if not self.task_id:
+            return
+        try:
+            status = self.backend.import_cancel(self.task_id)
+        except Exception as exc:
+            QMessageBox.critical(self, "Importação", f"Falha ao cancelar: {exc}")
+            return
+        self.cancel_btn.setEnabled(False)
+        self.log.append(f"Cancelamento pedido para a importação {self.task_id}")
+        self._show_status(status)
+
+    def refresh_status(self) -> None:
+        if not self.task_id:
+            self.poll_timer.stop()
+            return
+        try:
+            status = self.backend.import_status(self.task_id)
+        except Exception as exc:  # pragma: no cover - backend fora do ar; tenta no próximo tick
+            self.status_label.setText(f"Sem resposta do backend: {exc}")
+            return
+        self._show_status(status)
+        if status.get("status") in FINISHED_STATUSES:
+            self.poll_timer.stop()
+            self.cancel_btn.setEnabled(False)
+            self.log.append(f"Importação {self.task_id} encerrada: {status.get('status')}")
+            self.task_id = None
+
+    def _show_status(self, status: dict) -> None:
+        text = f"#{status.get('task_id')} {status.get('status')}"
+        if status.get("cancel_requested") and status.get("status") == "running":
+            text += " (cancelando…)"
+        elif status.get("discovering"):
+            text += " (listando arquivos…)"
+        if status.get("error"):
+            text += f" — {status['error']}"
+        self.status_label.setText(text)
+        self.counts_label.setText(" · ".join(f"{label} {status.get(key, 0)}" for key, label in COUNTERS))
+        eta = status.get("eta_seconds")
+        eta_text = f"{eta:.0f}s" if eta is not None else "-"
+        self.rate_label.setText(
+            f"{status.get('files_per_sec', 0):.1f} arquivos/s · decorrido {status.get('elapsed_seconds', 0):.0f}s"
+            f" · ETA {eta_text}"
+        )
+        latency = status.get("stage_latency_ms") or {}
+        self.latency_label.setText(
+            " · ".join(f"{stage} {value:.1f} ms" for stage, value in latency.items() if value is not None) or "-"
+        )
 
     def start_watcher(self) -> None:
         try:
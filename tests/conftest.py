@@ -18,6 +18,15 @@ def disable_watcher_env():
     yield
 
 
+@pytest.fixture(autouse=True)
+def cover_cache_dir(tmp_path, monkeypatch):
+    # extrair metadados grava capas; sem isso testes sem temp_db escrevem em var/data/covers
+    monkeypatch.setenv("MAI_COVER_CACHE_DIR", str(tmp_path / "covers"))
+    settings_cache.cache_clear()
+    yield
+    settings_cache.cache_clear()
+
+
 @pytest.fixture()
 def temp_db(tmp_path, monkeypatch):
     db_path = tmp_path / "test.db"
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from mai.covers import get_cover_cache
+from mai.covers.extract import extract_local_cover
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest.types import LocalMetadata
+from mai.main import create_app
+
+
+def _jpeg(width: int = 800, height: int = 1200, color: str = "navy") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_cache_stores_every_size_once(temp_db):
+    cache = get_cover_cache()
+    data = _jpeg()
+    cover_path = cache.store(data)
+    assert cover_path.startswith(cover_path[3:5] + "/")
+    for size, edge in cache.sizes.items():
+        with Image.open(cache.path(cover_path, size)) as thumb:
+            assert max(thumb.size) == edge
+    # mesma imagem, mesma chave: nada é regravado
+    mtime = cache.path(cover_path, "large").stat().st_mtime_ns
+    assert cache.store(data) == cover_path
+    assert cache.path(cover_path, "large").stat().st_mtime_ns == mtime
+
+
+def test_epub_cover_from_opf_href(temp_db, tmp_path):
+    book = tmp_path / "livro.epub"
+    with zipfile.ZipFile(book, "w") as archive:
+        archive.writestr("OEBPS/images/capa.jpg", _jpeg(color="red"))
+        archive.writestr("OEBPS/images/outra.jpg", _jpeg(color="green"))
+    local = LocalMetadata(title="Livro", cover_href="OEBPS/images/capa.jpg")
+    cover_path = extract_local_cover(book, local)
+    assert cover_path
+    with Image.open(get_cover_cache().path(cover_path, "small")) as thumb:
+        red, green, _ = thumb.convert("RGB").getpixel((10, 10))
+    assert red > 200 and green < 50
+
+    # sem capa declarada nem imagem "cover": sem capa, sem erro
+    assert extract_local_cover(book, LocalMetadata(title="Livro")) is None
+
+
+def test_cover_endpoint_etag(temp_db):
+    cover_path = get_cover_cache().store(_jpeg())
+    with session_scope() as session:
+        work = models.Work(title="Capa", sort_title="capa")
+        session.add(work)
+        session.flush()
+        edition = models.Edition(work_id=work.id, title="Capa", cover_path=cover_path)
+        bare = models.Edition(work_id=work.id, title="Sem capa")
+        session.add_all([edition, bare])
+        session.flush()
+        edition_id, bare_id = edition.id, bare.id
+
+    with TestClient(create_app()) as client:
+        response = client.get(f"/covers/{edition_id}?size=small")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        etag = response.headers["etag"]
+        assert "max-age" in response.headers["cache-control"]
+
+        cached = client.get(f"/covers/{edition_id}?size=small", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert not cached.content
+
+        assert client.get(f"/covers/{edition_id}?size=huge").status_code == 422
+        assert client.get(f"/covers/{bare_id}").status_code == 404
+
+        book = client.get(f"/books/{edition_id}").json()
+        assert book["edition"]["thumbnail_url"] == f"/covers/{edition_id}?size=small"
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from mai.core.events import DROPPED, EventHub, get_event_hub
+from mai.main import create_app
+
+
+def test_slow_subscriber_drops_oldest_events():
+    hub = EventHub(buffer_size=3)
+
+    async def run():
+        slow = hub.subscribe()
+        filtered = hub.subscribe(types={"queue.depth"})
+        # publicadores rodam em outras threads (escritor da ingestão, workers da fila)
+        publisher = threading.Thread(target=lambda: [hub.publish("file.ingested", {"n": n}) for n in range(5)])
+        publisher.start()
+        publisher.join()
+        hub.publish("queue.depth", {"pending": 1}, sticky=True)
+        batch = await slow.next_batch(timeout=1)
+        only_queue = await filtered.next_batch(timeout=1)
+        late = hub.subscribe(types={"queue.depth", "file.ingested"})
+        replay = await late.next_batch(timeout=1)
+        return batch, only_queue, replay, await filtered.next_batch(timeout=0.05)
+
+    batch, only_queue, replay, idle = asyncio.run(run())
+    assert batch[0]["type"] == DROPPED and batch[0]["data"] == {"count": 3}
+    assert [event["data"] for event in batch[1:]] == [{"n": 3}, {"n": 4}, {"pending": 1}]
+    assert [event["type"] for event in only_queue] == ["queue.depth"]
+    assert [event["data"] for event in replay] == [{"pending": 1}]  # só o estado, não o histórico
+    assert idle == []
+    assert hub.subscriber_count == 3
+
+
+def test_status_socket_broadcasts_published_events(temp_db):
+    hub = get_event_hub()
+    baseline = hub.subscriber_count
+    with TestClient(create_app()) as client:
+        with client.websocket_connect("/ws/status?types=review.resolved") as first, client.websocket_connect(
+            "/ws/status?types=review.resolved"
+        ) as second:
+            for ws in (first, second):
+                status = ws.receive_json()
+                assert status["type"] == "status"
+                assert status["data"]["queue"] == {"pending": 0, "running": 0}
+            hub.publish("file.ingested", {"path": "/ignorado"})
+            hub.publish("review.resolved", {"edition_id": 7, "status": "accepted"})
+            for ws in (first, second):
+                event = ws.receive_json()
+                assert (event["type"], event["data"]["edition_id"]) == ("review.resolved", 7)
+
+        deadline = time.monotonic() + 2
+        while hub.subscriber_count > baseline and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert hub.subscriber_count == baseline  # desconectar libera o buffer do cliente
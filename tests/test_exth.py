@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+
+from mai.ingest import extractors
+from mai.ingest.exth import read_mobi_metadata
+
+
+def exth_block(records):
+    body = b"".join(struct.pack(">LL", kind, len(value) + 8) + value for kind, value in records)
+    return b"EXTH" + struct.pack(">LL", len(body) + 12, len(records)) + body
+
+
+def make_mobi(path: Path, title: bytes, records, locale: int = 0x16) -> Path:
+    mobi_header_length = 0xE8
+    exth = exth_block(records)
+    name_offset = 16 + mobi_header_length + len(exth)
+    record0 = bytearray(name_offset + len(title) + 2)
+    record0[16:20] = b"MOBI"
+    struct.pack_into(">LLL", record0, 20, mobi_header_length, 2, 65001)
+    struct.pack_into(">LLL", record0, 0x54, name_offset, len(title), locale)
+    struct.pack_into(">L", record0, 0x80, 0x50)
+    record0[16 + mobi_header_length : name_offset] = exth
+    record0[name_offset : name_offset + len(title)] = title
+
+    record1 = b"texto comprimido do livro" * 100
+    header = bytearray(78)
+    header[0:6] = b"Livro\x00"
+    header[60:68] = b"BOOKMOBI"
+    struct.pack_into(">H", header, 76, 2)
+    first = 78 + 2 * 8 + 2
+    index = struct.pack(">LL", first, 0) + struct.pack(">LL", first + len(record0), 1)
+    path.write_bytes(bytes(header) + index + b"\x00\x00" + bytes(record0) + record1)
+    return path
+
+
+def test_read_mobi_metadata(tmp_path):
+    path = make_mobi(
+        tmp_path / "livro.azw3",
+        "Dom Casmurro".encode(),
+        [
+            (100, "Machado de Assis".encode()),
+            (101, b"Editora Exemplo"),
+            (103, b"<p>Bentinho &amp; Capitu</p>"),
+            (104, b"978-85-359-1484-9"),
+            (106, b"1899-12-01T00:00:00+00:00"),
+            (113, b"B00ABCDEFG"),
+        ],
+    )
+    meta = read_mobi_metadata(path)
+    assert meta.title == "Dom Casmurro"
+    assert meta.authors == ["Machado de Assis"]
+    assert meta.identifiers == ["978-85-359-1484-9", "B00ABCDEFG"]
+    assert (meta.publisher, meta.year, meta.language) == ("Editora Exemplo", 1899, "pt")
+    assert meta.description == "Bentinho & Capitu"
+
+
+def test_updated_title_and_language_records_win(tmp_path):
+    path = make_mobi(
+        tmp_path / "livro.mobi",
+        b"DOM_CASMURRO",
+        [(503, "Dom Casmurro (edição anotada)".encode()), (524, b"pt-BR")],
+        locale=0x09,
+    )
+    meta = read_mobi_metadata(path)
+    assert meta.title == "Dom Casmurro (edição anotada)"
+    assert meta.language == "pt-BR"
+
+
+def test_garbage_falls_back_to_filename(tmp_path):
+    path = tmp_path / "estragado.mobi"
+    path.write_bytes(b"isto nao e um mobi" * 10)
+    assert extractors.extract_metadata(path).title == "estragado"
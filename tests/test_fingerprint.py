@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from sqlalchemy import select
+
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest.batch import persist_batch
+from mai.ingest.engine import IngestRecord
+from mai.ingest.fingerprint import backfill_hashes
+from mai.ingest.types import LocalMetadata
+from mai.utils.files import QUICK_BLOCK_SIZE, compute_quick_hash, compute_sha256
+
+
+def write_blob(path: Path, marker: bytes = b"") -> Path:
+    # o marcador cai entre os blocos amostrados pela impressão rápida
+    data = bytearray(b"a" * (8 * QUICK_BLOCK_SIZE))
+    data[QUICK_BLOCK_SIZE + 10 : QUICK_BLOCK_SIZE + 10 + len(marker)] = marker
+    path.write_bytes(bytes(data))
+    return path
+
+
+def make_record(path: Path) -> IngestRecord:
+    st = path.stat()
+    return IngestRecord(
+        path=path,
+        stat=st,
+        quick_hash=compute_quick_hash(path, st.st_size),
+        local=LocalMetadata(title=path.stem),
+    )
+
+
+def test_quick_hash_samples_blocks(tmp_path):
+    first = write_blob(tmp_path / "a.pdf")
+    copy = write_blob(tmp_path / "b.pdf")
+    edited = write_blob(tmp_path / "c.pdf", b"editado")
+    small = tmp_path / "d.pdf"
+    small.write_bytes(b"pequeno")
+
+    assert compute_quick_hash(first) == compute_quick_hash(copy) == compute_quick_hash(edited)
+    assert compute_sha256(first) != compute_sha256(edited)
+    assert compute_quick_hash(small) != compute_quick_hash(first)
+
+
+def test_full_hash_only_on_collision(temp_db, tmp_path):
+    first = write_blob(tmp_path / "a.pdf")
+    unique = tmp_path / "unico.pdf"
+    unique.write_bytes(b"outro conteudo")
+    with session_scope() as session:
+        persist_batch(session, [make_record(first), make_record(unique)])
+    with session_scope() as session:
+        assert session.scalars(select(models.File.sha256)).all() == [None, None]
+
+    copy = write_blob(tmp_path / "copia.pdf")
+    edited = write_blob(tmp_path / "editado.pdf", b"editado")
+    with session_scope() as session:
+        created = persist_batch(session, [make_record(copy), make_record(edited)])
+    assert [record.path for record in created] == [edited]
+
+    with session_scope() as session:
+        rows = {f.path: f.sha256 for f in session.scalars(select(models.File))}
+    # a cópia é a mesma linha de ``a.pdf``, agora no novo caminho
+    assert rows == {
+        str(copy): compute_sha256(copy),
+        str(unique): None,
+        str(edited): compute_sha256(edited),
+    }
+
+
+def test_backfill_hashes_fills_missing(temp_db, tmp_path):
+    path = tmp_path / "livro.pdf"
+    path.write_bytes(b"conteudo")
+    with session_scope() as session:
+        session.add(models.File(path=str(path), size_bytes=8))
+        session.add(models.File(path=str(tmp_path / "sumiu.pdf"), size_bytes=1))
+
+    assert backfill_hashes() == 1
+    with session_scope() as session:
+        row = session.scalar(select(models.File).where(models.File.path == str(path)))
+        assert row.sha256 == compute_sha256(path)
+        assert row.quick_hash == compute_quick_hash(path)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from mai.utils.files import compute_sha256
+from mai.utils.hashing import HashService
+
+
+def test_hash_service_limits_reads_per_device(tmp_path):
+    files = []
+    for idx in range(6):
+        path = tmp_path / f"livro{idx}.pdf"
+        path.write_bytes(f"conteudo {idx}".encode())
+        files.append(path)
+
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def slow_hash(path):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+        return compute_sha256(path)
+
+    service = HashService(workers=4, per_device=2)
+    try:
+        futures = [service.submit(path, slow_hash, path) for path in files]
+        assert [future.result(timeout=5) for future in futures] == [compute_sha256(path) for path in files]
+    finally:
+        service.shutdown()
+    # todos no mesmo disco: quatro workers, mas no máximo duas leituras simultâneas
+    assert running["peak"] == 2
+
+
+def test_hash_service_propagates_errors(tmp_path):
+    service = HashService(workers=1)
+    try:
+        with pytest.raises(FileNotFoundError):
+            service.sha256(tmp_path / "sumiu.pdf").result(timeout=5)
+        path = tmp_path / "ok.pdf"
+        path.write_bytes(b"ok")
+        assert service.sha256(path).result(timeout=5) == compute_sha256(path)
+    finally:
+        service.shutdown()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import fitz
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from mai.core.config import get_settings
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest.pipeline import ingest_paths
+from mai.ingest.progress import IngestProgress
+from mai.ingest.providers import Provider
+from mai.ingest.types import Candidate
+from mai.jobs import queue
+from mai.main import create_app
+
+
+class FakeProvider(Provider):
+    slug = "fake"
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        return None
+
+    def search(self, query: str) -> List[Candidate]:
+        return []
+
+
+def make_pdf(path: Path, title: str) -> None:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), title)
+    doc.set_metadata({"title": title})
+    doc.save(path)
+    doc.close()
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_snapshot_rate_eta_and_latency():
+    clock = FakeClock()
+    progress = IngestProgress(clock=clock)
+    progress.add("discovered", 10)
+    progress.add("persisted", 3)
+    progress.add("unchanged")
+    progress.timed("hash", 0.5, files=2)
+    clock.now += 2
+
+    snapshot = progress.snapshot()
+    assert snapshot["files_per_sec"] == 2.0
+    assert snapshot["eta_seconds"] == 3.0  # 6 restantes a 2 arquivos/s
+    assert snapshot["stage_latency_ms"] == {"hash": 250.0, "enrich": None, "write": None}
+
+    progress.finish()
+    clock.now += 10
+    assert progress.snapshot()["elapsed_seconds"] == 2.0
+    assert progress.snapshot()["eta_seconds"] is None
+
+
+def test_engine_reports_stage_counts(temp_db, tmp_path):
+    library = tmp_path / "library"
+    library.mkdir()
+    for idx in range(4):
+        make_pdf(library / f"livro{idx}.pdf", f"Livro{idx}")
+
+    progress = IngestProgress()
+    ingest_paths([library], [FakeProvider()], hash_workers=2, enrich_workers=2, progress=progress)
+    snapshot = progress.snapshot()
+    assert [snapshot[key] for key in ("discovered", "hashed", "enriched", "persisted", "failed")] == [4, 4, 4, 4, 0]
+    assert all(snapshot["stage_latency_ms"][stage] is not None for stage in ("hash", "enrich", "write"))
+    assert not snapshot["discovering"]
+
+    again = IngestProgress()
+    ingest_paths([library], [FakeProvider()], full_rescan=True, progress=again)
+    assert (again.snapshot()["unchanged"], again.snapshot()["enriched"]) == (4, 0)
+
+
+def test_cancelled_scan_keeps_directories_pending(temp_db, tmp_path):
+    library = tmp_path / "library"
+    library.mkdir()
+    for idx in range(3):
+        make_pdf(library / f"livro{idx}.pdf", f"Livro{idx}")
+
+    progress = IngestProgress()
+    progress.cancel()
+    ingest_paths([library], [FakeProvider()], progress=progress)
+    assert progress.snapshot()["persisted"] == 0
+
+    # o scan cancelado não gravou os mtimes: o próximo relista o diretório
+    ingest_paths([library], [FakeProvider()])
+    with session_scope() as session:
+        assert session.scalar(select(func.count()).select_from(models.File)) == 3
+
+
+def test_queue_cancel_pending_and_running(temp_db):
+    with session_scope() as session:
+        pending = queue.enqueue(session, "import", {"paths": ["/x"]}).id
+        running = queue.enqueue(session, "import", {"paths": ["/y"]}).id
+    with session_scope() as session:
+        assert queue.request_cancel(session, pending) == queue.CANCELLED
+        assert queue.claim(session, "a", 60).id == running
+        assert queue.request_cancel(session, running) == queue.RUNNING
+    with session_scope() as session:
+        assert queue.heartbeat(session, [running], "a", 60, progress={running: {"persisted": 7}}) == 1
+        assert queue.cancel_requests(session, [running]) == {running}
+        assert queue.complete(session, running, "a", {"paths": ["/y"]}, progress={"persisted": 9}, cancelled=True)
+    with session_scope() as session:
+        task = session.get(models.Task, running)
+        assert task.status == queue.CANCELLED and json.loads(task.progress_json) == {"persisted": 9}
+        assert queue.request_cancel(session, 999) is None
+
+
+def test_import_status_and_cancel_endpoints(temp_db, monkeypatch):
+    monkeypatch.setenv("MAI_JOB_WORKERS", "0")
+    get_settings.cache_clear()
+    with session_scope() as session:
+        task_id = queue.enqueue(session, "import", {"paths": ["/livros"]}).id
+        other = queue.enqueue(session, "maintenance.covers").id
+
+    with TestClient(create_app()) as client:
+        status = client.get(f"/import/{task_id}").json()
+        assert (status["status"], status["paths"], status["discovered"]) == ("pending", ["/livros"], 0)
+        assert status["cancelled"] is False
+        assert client.get(f"/import/{other}").status_code == 404
+
+        cancelled = client.post(f"/import/{task_id}/cancel")
+        assert cancelled.status_code == 200 and cancelled.json()["status"] == "cancelled"
+        assert cancelled.json()["cancelled"] is True
+        assert client.post(f"/tasks/{task_id}/retry").json()["status"] == "pending"
+
+        with session_scope() as session:
+            session.get(models.Task, task_id).status = queue.DONE
+        assert client.post(f"/import/{task_id}/cancel").status_code == 409
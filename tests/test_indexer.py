@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+from sqlalchemy import text
+
+from mai.db import indexer, models
+from mai.db.session import session_scope
+
+
+def search_ids(query: str) -> List[int]:
+    with session_scope() as session:
+        return list(session.scalars(text("SELECT rowid FROM search WHERE search MATCH :q"), {"q": query}))
+
+
+def add_book(title: str, author_name: str, bulk_index: bool = False) -> int:
+    with session_scope(bulk_index=bulk_index) as session:
+        work = models.Work(title=title, sort_title=title.lower())
+        work.authors.append(models.Author(name=author_name))
+        edition = models.Edition(work=work, title=title, format="pdf")
+        session.add(edition)
+        session.flush()
+        return edition.id
+
+
+def test_commit_indexes_new_editions_once(temp_db, monkeypatch):
+    calls = []
+    real = indexer.upsert_for_editions
+
+    def spy(session, edition_ids):
+        calls.append(list(edition_ids))
+        real(session, edition_ids)
+
+    monkeypatch.setattr(indexer, "upsert_for_editions", spy)
+
+    edition_id = add_book("Memorias Postumas", "Machado")
+    assert calls == [[edition_id]]
+    assert search_ids("postumas") == [edition_id]
+    assert search_ids("machado") == [edition_id]
+
+    with session_scope() as session:
+        edition = session.get(models.Edition, edition_id)
+        edition.cover_url = "http://example/capa.jpg"
+        session.add(models.File(path="/tmp/x.pdf", edition_id=edition_id))
+    assert len(calls) == 1  # nada indexado mudou
+
+
+def test_author_rename_reindexes_work_editions(temp_db):
+    edition_id = add_book("Dom Casmurro", "Machado")
+    with session_scope() as session:
+        author = session.get(models.Edition, edition_id).work.authors[0]
+        author.name = "Joaquim Maria"
+    assert search_ids("joaquim") == [edition_id]
+
+
+def test_bulk_index_rebuilds_at_exit(temp_db, monkeypatch):
+    def per_row(session, edition_ids):
+        raise AssertionError(edition_ids)
+
+    with pytest.raises(RuntimeError):
+        with indexer.bulk_index():
+            with monkeypatch.context() as patch:
+                patch.setattr(indexer, "upsert_for_editions", per_row)
+                first = add_book("Iracema", "Alencar", bulk_index=True)
+                second = add_book("Senhora", "Alencar", bulk_index=True)
+            assert search_ids("alencar") == []
+            # outras sessões do processo (API, watcher) seguem indexando durante a importação
+            other = add_book("Helena", "Machado")
+            assert search_ids("helena") == [other]
+            raise RuntimeError("importação interrompida")
+    assert sorted(search_ids("alencar")) == [first, second]
+    assert search_ids("helena") == [other]
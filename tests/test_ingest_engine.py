@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import List, Optional
+
+import fitz
+from sqlalchemy import func, select, update
+
+from mai.core.config import get_settings
+from mai.db import models
+from mai.db.init import apply_schema
+from mai.db.session import reset_engine, session_scope
+from mai.ingest import engine as engine_module
+from mai.ingest.batch import persist_batch
+from mai.ingest.engine import IngestEngine, IngestRecord
+from mai.ingest.pipeline import ingest_file, ingest_paths
+from mai.ingest.providers import Provider
+from mai.ingest.sandbox import ExtractionFailed
+from mai.ingest.scanner import DirectoryScanner
+from mai.ingest.types import Candidate, LocalMetadata
+
+
+class FakeProvider(Provider):
+    slug = "fake"
+
+    def __init__(self) -> None:
+        self.queries: List[str] = []
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        return None
+
+    def search(self, query: str) -> List[Candidate]:
+        self.queries.append(query)
+        title = query.split(" ")[0]
+        return [
+            Candidate(
+                source="fake",
+                title=title,
+                authors=["Autor Teste"],
+                year=2020,
+                publisher="Editora",
+                language="pt",
+                ids={"FAKE": title},
+                cover_url=None,
+                payload={"q": query},
+            )
+        ]
+
+
+def must_not_run(*args):
+    raise AssertionError(args)
+
+
+def make_pdf(path: Path, title: str) -> None:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), title)
+    doc.set_metadata({"title": title, "author": "Autor Teste"})
+    doc.save(path)
+    doc.close()
+
+
+def test_ingest_paths_runs_all_stages(temp_db, tmp_path):
+    library = tmp_path / "library"
+    (library / "sub").mkdir(parents=True)
+    for idx in range(6):
+        folder = library if idx % 2 else library / "sub"
+        make_pdf(folder / f"livro{idx}.pdf", f"Livro{idx}")
+
+    provider = FakeProvider()
+    ingest_paths([library], [provider], hash_workers=2, enrich_workers=3)
+
+    with session_scope() as session:
+        assert session.scalar(select(func.count()).select_from(models.File)) == 6
+        assert session.scalar(select(func.count()).select_from(models.Edition)) == 6
+    assert len(provider.queries) == 6
+
+    ingest_paths([library], [provider], hash_workers=2, enrich_workers=3)
+    with session_scope() as session:
+        assert session.scalar(select(func.count()).select_from(models.File)) == 6
+    assert len(provider.queries) == 6
+
+
+def test_rescan_skips_hashing_for_unchanged_files(temp_db, tmp_path, monkeypatch):
+    library = tmp_path / "library"
+    library.mkdir()
+    for idx in range(3):
+        make_pdf(library / f"livro{idx}.pdf", f"Livro{idx}")
+    ingest_paths([library], [FakeProvider()])
+
+    hashed: List[Path] = []
+    real_hash = engine_module.compute_quick_hash
+
+    def spy(path: Path, size: Optional[int] = None) -> str:
+        hashed.append(path)
+        return real_hash(path, size)
+
+    monkeypatch.setattr(engine_module, "compute_quick_hash", spy)
+    monkeypatch.setattr(engine_module, "compute_sha256", must_not_run)
+    make_pdf(library / "livro0.pdf", "Livro0 revisado")
+    ingest_paths([library], [FakeProvider()], full_rescan=True)
+
+    assert hashed == [(library / "livro0.pdf").resolve()]
+    with session_scope() as session:
+        files = session.scalars(select(models.File)).all()
+        assert len(files) == 3
+        assert all(f.inode and f.mtime_ns and f.last_seen for f in files)
+
+
+def test_apply_schema_adds_columns_to_existing_tables(tmp_path, monkeypatch):
+    db_path = tmp_path / "legado.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, sha256 TEXT)")
+    monkeypatch.setenv("MAI_DB_PATH", str(db_path))
+    get_settings.cache_clear()
+    reset_engine()
+    try:
+        apply_schema()
+    finally:
+        reset_engine()
+        get_settings.cache_clear()
+    with sqlite3.connect(db_path) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(file)")}
+    assert {"device", "inode", "mtime_ns"} <= columns
+
+
+def test_scanner_skips_unchanged_directories(temp_db, tmp_path):
+    library = tmp_path / "library"
+    (library / "a" / "b").mkdir(parents=True)
+    (library / "c").mkdir()
+    (library / "a" / "b" / "um.epub").write_bytes(b"1")
+    (library / "c" / "dois.pdf").write_bytes(b"2")
+    (library / "c" / "notas.txt").write_bytes(b"x")
+
+    with session_scope() as session:
+        scanner = DirectoryScanner.load(session, [library])
+        assert sorted(p.name for p in scanner.iter_files(library)) == ["dois.pdf", "um.epub"]
+        scanner.save(session, [library])
+
+    (library / "a" / "b" / "tres.mobi").write_bytes(b"3")
+    with session_scope() as session:
+        scanner = DirectoryScanner.load(session, [library])
+        assert sorted(p.name for p in scanner.iter_files(library)) == ["tres.mobi", "um.epub"]
+        assert scanner.skipped == 3
+
+
+def test_transient_failure_relists_directory_next_scan(temp_db, tmp_path, monkeypatch):
+    library = tmp_path / "library"
+    (library / "sub").mkdir(parents=True)
+    make_pdf(library / "sub" / "livro.pdf", "Livro")
+
+    def shutting_down(path):
+        raise ExtractionFailed("processo extrator indisponível", permanent=False)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(engine_module.sandbox, "extract_metadata", shutting_down)
+        ingest_paths([library], [FakeProvider()])
+    with session_scope() as session:
+        assert session.scalar(select(func.count()).select_from(models.File)) == 0
+        # o pai segue inalterado: sem linha do filho, o scan seguinte nunca desceria até ele
+        scanner = DirectoryScanner.load(session, [library])
+        assert [path.name for path in scanner.iter_files(library)] == ["livro.pdf"]
+
+    ingest_paths([library], [FakeProvider()])
+    with session_scope() as session:
+        assert session.scalars(select(models.File.path)).all() == [str((library / "sub" / "livro.pdf").resolve())]
+
+
+def test_persist_batch_resolves_shared_rows_in_bulk(temp_db, tmp_path, monkeypatch):
+    provider = FakeProvider()
+    records = []
+    for idx in range(4):
+        path = tmp_path / f"livro{idx}.pdf"
+        path.write_bytes(f"conteudo {idx}".encode())
+        candidate = provider.search(f"Obra{idx % 2} Autor")[0]
+        records.append(
+            IngestRecord(
+                path=path,
+                stat=path.stat(),
+                sha256=f"sha{idx}",
+                local=LocalMetadata(title=f"Obra{idx % 2}", identifiers=["9780306406157"]),
+                candidate=candidate,
+                ranked=[{"stage": "search", "score": 0.9, "candidate": candidate}],
+                top_score=0.9,
+            )
+        )
+
+    with session_scope() as session:
+        created = persist_batch(session, records)
+    assert len(created) == 4
+
+    with session_scope() as session:
+        assert session.scalar(select(func.count()).select_from(models.Work)) == 2
+        assert session.scalar(select(func.count()).select_from(models.Author)) == 1
+        assert session.scalar(select(func.count()).select_from(models.WorkAuthor)) == 2
+        assert session.scalar(select(func.count()).select_from(models.Edition)) == 4
+        assert session.scalar(select(func.count()).select_from(models.MatchEvent)) == 4
+        assert session.scalar(select(func.count()).select_from(models.IdentifyResult)) == 4
+        assert session.scalar(select(func.count()).select_from(models.ProviderHit)) == 2
+        isbn = session.scalars(select(models.Identifier).where(models.Identifier.scheme == "ISBN13")).all()
+        assert len(isbn) == 1
+        editions = {f.path: f.edition_id for f in session.scalars(select(models.File))}
+        assert len(set(editions.values())) == 4
+
+    moved = tmp_path / "movido.pdf"
+    records[0].path.rename(moved)
+    again = IngestRecord(path=moved, stat=moved.stat(), sha256="sha0", local=LocalMetadata(title="x"))
+    with session_scope() as session:
+        assert persist_batch(session, [again]) == []
+    with session_scope() as session:
+        assert session.scalar(select(models.File.path).where(models.File.sha256 == "sha0")) == str(moved)
+
+
+def test_engine_writer_commits_in_batches(temp_db, tmp_path, monkeypatch):
+    library = tmp_path / "library"
+    library.mkdir()
+    for idx in range(5):
+        make_pdf(library / f"livro{idx}.pdf", f"Livro{idx}")
+
+    def no_fallback(self, record):
+        raise AssertionError(record.path)
+
+    monkeypatch.setattr(IngestEngine, "_persist_one", no_fallback)
+    monkeypatch.setenv("MAI_INGEST_COMMIT_EVERY", "2")
+    get_settings.cache_clear()
+    ingest_paths([library], [FakeProvider()])
+
+    with session_scope() as session:
+        assert session.scalar(select(func.count()).select_from(models.File)) == 5
+        assert session.scalar(select(func.count()).select_from(models.IdentifyResult)) == 5
+
+
+def test_touched_or_rewritten_file_keeps_one_edition(temp_db, tmp_path):
+    library = tmp_path / "library"
+    library.mkdir()
+    book = library / "livro.pdf"
+    make_pdf(book, "Livro")
+    ingest_paths([library], [FakeProvider()])
+
+    def catalogue():
+        with session_scope() as session:
+            editions = session.scalars(select(models.Edition.title)).all()
+            file = session.scalars(select(models.File)).one()
+            return editions, file.sha256, file.edition_id
+
+    (title,), sha256, edition_id = catalogue()
+    assert sha256 is None  # sem colisão o SHA-256 fica para o backfill
+
+    # só o mtime mudou: mesma impressão rápida, a linha é adotada sem reextrair
+    st = book.stat()
+    os.utime(book, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    ingest_paths([library], [FakeProvider()], full_rescan=True)
+    editions, sha256, same_edition = catalogue()
+    assert (editions, same_edition) == ([title], edition_id) and sha256 is not None
+
+    st = book.stat()
+    os.utime(book, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    with session_scope() as session:
+        session.execute(update(models.File).values(sha256=None))
+    with session_scope() as session:
+        ingest_file(session, book, [FakeProvider()])
+    assert catalogue()[0] == [title]
+
+    # conteúdo trocado de verdade: a edição antiga não fica órfã
+    make_pdf(book, "Outro")
+    ingest_paths([library], [FakeProvider()], full_rescan=True)
+    editions, _, new_edition = catalogue()
+    assert editions == ["Outro"] and new_edition != edition_id
+
+    make_pdf(book, "Terceiro")
+    with session_scope() as session:
+        ingest_file(session, book, [FakeProvider()])
+    assert catalogue()[0] == ["Terceiro"]
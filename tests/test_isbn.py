@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+import fitz
+import pytest
+
+from mai.core.config import get_settings
+from mai.ingest import extractors
+from mai.ingest.isbn import find_isbn, validate_isbn10
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("ISBN 978-85-359-1484-9 Impresso no Brasil", "9788535914849"),
+        ("ISBN: 0-306-40615-2", "9780306406157"),
+        ("ISBN‑13: 978‑0‑306‑40615‑7.", "9780306406157"),
+        ("ISBN9780306406157", "9780306406157"),
+        ("ISBN (e-book): 0-306-40615-2", "9780306406157"),
+        ("Impresso em 2019. 978-85-359-1484-9", "9788535914849"),
+        ("tel 0306406153", None),  # dígito verificador inválido
+        ("pedido 0306406152", None),  # ISBN-10 válido, mas sem rótulo
+        ("pedido 12345978030640615799", None),  # parte de um número maior
+    ],
+)
+def test_find_isbn(text, expected):
+    assert find_isbn(text) == expected
+
+
+def test_find_isbn_requires_label_on_tail_pages():
+    assert find_isbn("Do mesmo autor: 978-85-359-1484-9", require_label=True) is None
+    assert find_isbn("ISBN 978-85-359-1484-9", require_label=True) == "9788535914849"
+
+
+def test_validate_isbn10():
+    assert validate_isbn10("0306406152")
+    assert validate_isbn10("080442957X")
+    assert not validate_isbn10("0306406153")
+
+
+def test_pdf_content_isbn_added_to_identifiers(tmp_path: Path):
+    path = tmp_path / "livro.pdf"
+    doc = fitz.open()
+    for number in range(12):
+        page = doc.new_page()
+        text = "Copyright 2019 ISBN 978-85-359-1484-9" if number == 2 else f"Capitulo {number} 555-1234"
+        page.insert_text((72, 72), text)
+    doc.set_metadata({"title": "Livro"})
+    doc.save(path)
+    doc.close()
+
+    meta = extractors.extract_metadata(path)
+    assert meta.identifiers == ["9788535914849"]
+
+
+def test_pdf_tail_ads_need_isbn_label(tmp_path: Path):
+    path = tmp_path / "livro.pdf"
+    doc = fitz.open()
+    for number in range(12):
+        text = "Do mesmo autor: 978-85-359-1484-9" if number == 11 else f"Capitulo {number}"
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+    assert extractors.find_content_isbn(path) is None
+
+
+def test_epub_content_isbn_prefers_copyright_page(tmp_path: Path, monkeypatch):
+    path = tmp_path / "livro.epub"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("mimetype", "application/epub+zip")
+        archive.writestr("OEBPS/chapter1.xhtml", "<p>Pedido 0306406152 na livraria</p>")
+        archive.writestr("OEBPS/copyright.xhtml", "<p>ISBN&nbsp;978-85-359-1484-9</p>")
+    assert extractors.find_content_isbn(path) == "9788535914849"
+
+
+def test_epub_content_isbn_follows_spine_order(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("MAI_ISBN_SCAN_HEAD_PAGES", "2")
+    get_settings.cache_clear()
+    path = tmp_path / "livro.epub"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("mimetype", "application/epub+zip")
+        archive.writestr(
+            "META-INF/container.xml",
+            '<container><rootfiles><rootfile full-path="OEBPS/content.opf"/></rootfiles></container>',
+        )
+        archive.writestr(
+            "OEBPS/content.opf",
+            '<package><manifest><item id="a" href="a.xhtml"/><item id="b" href="b.xhtml"/>'
+            '<item id="ads" href="z-ads.xhtml"/></manifest>'
+            '<spine><itemref idref="a"/><itemref idref="b"/><itemref idref="ads"/></spine></package>',
+        )
+        # o anúncio vem primeiro no ZIP, mas é o último documento do livro
+        archive.writestr("OEBPS/z-ads.xhtml", "<p>Leia também 978-0-306-40615-7</p>")
+        archive.writestr("OEBPS/a.xhtml", "<p>Capítulo 1</p>")
+        archive.writestr("OEBPS/b.xhtml", "<p>Impresso no Brasil 978-85-359-1484-9</p>")
+    assert extractors.find_content_isbn(path) == "9788535914849"
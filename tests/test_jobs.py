@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mai.core.config import get_settings
+from mai.db import models
+from mai.db.session import session_scope
+from mai.jobs import HANDLERS, JobPool, PermanentJobError, handler, queue
+from mai.main import create_app
+
+
+@pytest.fixture()
+def test_handlers():
+    calls = []
+
+    @handler("test.ok")
+    def ok(ctx):
+        calls.append(ctx.payload)
+        return {"echo": ctx.payload.get("value")}
+
+    @handler("test.flaky")
+    def flaky(ctx):
+        calls.append(ctx.attempt)
+        raise RuntimeError("instável")
+
+    @handler("test.broken")
+    def broken(ctx):
+        raise PermanentJobError("payload inválido")
+
+    yield calls
+    for kind in ("test.ok", "test.flaky", "test.broken"):
+        HANDLERS.pop(kind, None)
+
+
+def _task(task_id: int) -> models.Task:
+    with session_scope() as session:
+        task = session.get(models.Task, task_id)
+        session.expunge(task)
+        return task
+
+
+def test_claim_order_and_lease_takeover(temp_db):
+    with session_scope() as session:
+        low = queue.enqueue(session, "test.ok", {"value": 1}).id
+        high = queue.enqueue(session, "test.ok", {"value": 2}, priority=5).id
+        queue.enqueue(session, "test.ok", run_after=datetime.utcnow() + timedelta(hours=1))
+
+    with session_scope() as session:
+        assert queue.claim(session, "a", 60).id == high
+        assert queue.claim(session, "b", 60).id == low
+        assert queue.claim(session, "c", 60) is None  # a terceira só roda daqui a uma hora
+
+    # o worker "a" caiu: lease vencido, outro worker retoma
+    with session_scope() as session:
+        session.get(models.Task, high).lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    with session_scope() as session:
+        assert queue.heartbeat(session, [low], "b", 60) == 1
+        resumed = queue.claim(session, "c", 60)
+        assert (resumed.id, resumed.attempts) == (high, 2)
+    with session_scope() as session:
+        assert not queue.complete(session, high, "a", {"tarde": True})
+        assert queue.complete(session, high, "c", {"ok": True})
+    assert _task(high).status == queue.DONE
+
+
+def test_pool_retries_with_backoff(temp_db, test_handlers, monkeypatch):
+    monkeypatch.setenv("MAI_JOB_BACKOFF_BASE", "0")
+    get_settings.cache_clear()
+    with session_scope() as session:
+        ok = queue.enqueue(session, "test.ok", {"value": 42}).id
+        flaky = queue.enqueue(session, "test.flaky", max_attempts=3).id
+        broken = queue.enqueue(session, "test.broken").id
+        unknown = queue.enqueue(session, "test.sem_handler").id
+
+    pool = JobPool(workers=1)
+    assert pool.run_pending() == 5  # ok, broken e as três tentativas de flaky
+
+    assert _task(ok).status == queue.DONE and '"echo": 42' in _task(ok).result_json
+    assert test_handlers.count(1) == 1 and test_handlers[-1] == 3
+    assert (_task(flaky).status, _task(flaky).attempts) == (queue.FAILED, 3)
+    broken_task = _task(broken)
+    assert (broken_task.status, broken_task.attempts, broken_task.error) == (queue.FAILED, 1, "payload inválido")
+    assert _task(unknown).status == queue.PENDING  # outro processo pode conhecer o tipo
+
+
+def test_backoff_grows_and_caps(temp_db):
+    assert [queue.backoff_seconds(n) for n in (1, 2, 3)] == [30, 60, 120]
+    assert queue.backoff_seconds(50) == 3600
+
+
+def test_import_scan_runs_through_queue(temp_db, tmp_path):
+    library = tmp_path / "biblioteca"
+    library.mkdir()
+    with TestClient(create_app()) as client:
+        response = client.post("/import/scan", json={"paths": [str(library)]})
+        assert response.status_code == 202
+        body = response.json()
+        assert body["status"] == "queued" and body["task_id"]
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            task = client.get(f"/tasks/{body['task_id']}").json()
+            if task["status"] == "done":
+                break
+            time.sleep(0.1)
+        assert task["status"] == "done"
+        assert task["payload"]["paths"] == [str(library)]
+        assert client.get("/tasks", params={"kind": "import"}).json()["total"] == 1
+        assert client.post("/tasks", json={"kind": "nao.existe"}).status_code == 400
+
+
+def test_shutdown_requeues_interrupted_task(temp_db):
+    started = threading.Event()
+
+    @handler("test.long")
+    def long(ctx):
+        started.set()
+        ctx.stop_event.wait(10)
+        raise RuntimeError("provedores fechados no encerramento")
+
+    try:
+        with session_scope() as session:
+            task_id = queue.enqueue(session, "test.long").id
+        pool = JobPool(workers=1, poll_interval=0.05)
+        pool.start()
+        assert started.wait(5)
+        pool.stop()
+    finally:
+        HANDLERS.pop("test.long", None)
+
+    task = _task(task_id)
+    assert (task.status, task.attempts, task.error, task.lease_owner) == (queue.PENDING, 0, None, None)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from typing import List, Optional
+
+from mai.core.config import get_settings
+from mai.ingest.pipeline import build_providers, close_providers, dump_provider, select_providers
+from mai.ingest.providers import FallbackProvider, Provider
+from mai.ingest.types import Candidate
+from mai.openlibrary import LocalOpenLibraryProvider, build_index
+
+
+def _line(kind: str, key: str, record: dict) -> str:
+    return "\t".join([kind, key, "3", "2024-01-01T00:00:00", json.dumps(record)]) + "\n"
+
+
+def _write_dump(path, lines) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.writelines(lines)
+
+
+def test_dump_index_isbn_and_search(temp_db, tmp_path):
+    editions = tmp_path / "ol_dump_editions.txt.gz"
+    others = tmp_path / "ol_dump_other.txt.gz"
+    _write_dump(
+        editions,
+        [
+            _line(
+                "/type/edition",
+                "/books/OL1M",
+                {
+                    "title": "Dom Casmurro",
+                    "isbn_10": ["8535908544"],
+                    "publishers": ["Companhia das Letras"],
+                    "publish_date": "May 1998",
+                    "languages": [{"key": "/languages/por"}],
+                    "works": [{"key": "/works/OL1W"}],
+                    "covers": [-1, 42],
+                },
+            ),
+            _line("/type/edition", "/books/OL2M", {"title": "Quincas Borba", "authors": [{"key": "/authors/OL1A"}]}),
+            "linha quebrada\n",
+            _line("/type/redirect", "/books/OL3M", {"location": "/books/OL1M"}),
+        ],
+    )
+    _write_dump(
+        others,
+        [
+            _line("/type/work", "/works/OL1W", {"title": "Dom Casmurro", "authors": [{"author": {"key": "/authors/OL1A"}}]}),
+            _line("/type/author", "/authors/OL1A", {"name": "Machado de Assis"}),
+        ],
+    )
+    # edições antes de obras/autores: a busca só é montada no final
+    db_path = build_index([editions, others], tmp_path / "ol.db")
+
+    provider = LocalOpenLibraryProvider(db_path)
+    try:
+        hit = provider.get_by_isbn("9788535908541")
+        assert hit is not None
+        assert hit.title == "Dom Casmurro"
+        assert hit.authors == ["Machado de Assis"]  # herdado da obra
+        assert (hit.year, hit.language, hit.publisher) == (1998, "por", "Companhia das Letras")
+        assert hit.ids == {"ISBN13": "9788535908541", "OLID": "OL1M"}
+        assert hit.cover_url.endswith("/b/id/42-L.jpg")
+        assert provider.get_by_isbn("9780000000002") is None
+
+        titles = [candidate.title for candidate in provider.search("machado \"casmurro\"")]
+        assert titles == ["Dom Casmurro"]
+        assert {candidate.title for candidate in provider.search("Machado de Assis")} == {"Dom Casmurro", "Quincas Borba"}
+        assert provider.search("?!") == []
+        plan = provider.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT isbn FROM isbn WHERE edition_key = ? LIMIT 1", ("/books/OL1M",)
+        ).fetchall()
+        assert "isbn_edition" in " ".join(str(row[-1]) for row in plan)
+    finally:
+        provider.close()
+
+
+class MissingEverywhere(Provider):
+    slug = "openlibrary"
+
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        self.calls.append(isbn13)
+        return None
+
+    def search(self, query: str) -> List[Candidate]:
+        self.calls.append(query)
+        return []
+
+
+def test_dump_answers_first_and_network_covers_misses(temp_db, tmp_path, monkeypatch):
+    db_path = tmp_path / "ol.db"
+    monkeypatch.setenv("MAI_OL_DUMP_DB", str(db_path))
+    get_settings.cache_clear()
+    close_providers()
+    try:
+        providers = build_providers()
+        network = MissingEverywhere()
+        openlibrary = FallbackProvider(dump_provider, network, aliases=["openlibrary_dump"])
+        assert openlibrary.get_by_isbn("9788535908541") is None  # sem índice: só a rede
+        assert network.calls == ["9788535908541"]
+
+        # índice importado com o processo já rodando: a mesma lista de provedores passa a usá-lo
+        editions = tmp_path / "ol_dump_editions.txt.gz"
+        record = {"title": "Dom Casmurro", "isbn_13": ["9788535908541"]}
+        _write_dump(editions, [_line("/type/edition", "/books/OL1M", record)])
+        build_index([editions], db_path)
+        assert openlibrary.get_by_isbn("9788535908541").title == "Dom Casmurro"
+        assert asyncio.run(openlibrary.asearch("casmurro"))[0].title == "Dom Casmurro"
+        assert openlibrary.search("Grande Sertão") == [] and network.calls[-1] == "Grande Sertão"
+
+        assert [provider.slug for provider in providers] == ["openlibrary", "google_books", "bookbrainz"]
+        assert isinstance(dump_provider(), LocalOpenLibraryProvider)
+        for names in (["openlibrary"], ["openlibrary_dump"]):
+            assert [provider.slug for provider in select_providers(providers, names)] == ["openlibrary"]
+        assert isinstance(select_providers(providers, ["openlibrary"], refresh=True)[0], FallbackProvider)
+    finally:
+        close_providers()
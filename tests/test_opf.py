@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest import extractors
+from mai.ingest.batch import persist_batch
+from mai.ingest.engine import IngestRecord
+from mai.ingest.opf import OPFError, read_opf_metadata
+
+CONTAINER = """<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>"""
+
+OPF = """<?xml version="1.0" encoding="utf-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="uid">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">
+    <dc:title>Memórias Póstumas</dc:title>
+    <dc:creator id="c1">Machado de Assis</dc:creator>
+    <dc:creator id="c2">Fulano Ilustrador</dc:creator>
+    <meta refines="#c2" property="role" scheme="marc:relators">ill</meta>
+    <dc:identifier id="uid">urn:isbn:9788535914849</dc:identifier>
+    <dc:language>pt</dc:language>
+    <dc:date>1881-01-01</dc:date>
+    <dc:publisher>Editora Exemplo</dc:publisher>
+    <dc:description>&lt;p&gt;Um defunto &lt;b&gt;autor&lt;/b&gt;.&lt;/p&gt;</dc:description>
+    <meta name="calibre:series" content="Trilogia Realista"/>
+    <meta name="calibre:series_index" content="1.0"/>
+    <meta name="cover" content="capa"/>
+  </metadata>
+  <manifest>
+    <item id="capa" href="images/capa%201.jpg" media-type="image/jpeg"/>
+    <item id="cap1" href="text/cap1.xhtml" media-type="application/xhtml+xml"/>
+  </manifest>
+  <spine><itemref idref="cap1"/></spine>
+</package>"""
+
+
+def make_epub(path: Path, opf: str = OPF, container: str = CONTAINER) -> Path:
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("mimetype", "application/epub+zip")
+        if container:
+            archive.writestr("META-INF/container.xml", container)
+        archive.writestr("OEBPS/content.opf", opf)
+        archive.writestr("OEBPS/text/cap1.xhtml", "<html><body><p>Capítulo</p></body></html>")
+    return path
+
+
+def test_read_opf_metadata(tmp_path):
+    meta = read_opf_metadata(make_epub(tmp_path / "livro.epub"))
+    assert meta.title == "Memórias Póstumas"
+    assert meta.authors == ["Machado de Assis"]
+    assert meta.identifiers == ["urn:isbn:9788535914849"]
+    assert (meta.language, meta.year, meta.publisher) == ("pt", 1881, "Editora Exemplo")
+    assert meta.description == "Um defunto autor ."
+    assert (meta.series, meta.series_index) == ("Trilogia Realista", 1.0)
+    assert meta.cover_href == "OEBPS/images/capa 1.jpg"
+
+
+def test_epub3_collection_and_cover_image(tmp_path):
+    opf = OPF.replace('<meta name="calibre:series" content="Trilogia Realista"/>', "").replace(
+        '<meta name="calibre:series_index" content="1.0"/>',
+        '<meta property="belongs-to-collection" id="s1">Saga</meta>'
+        '<meta refines="#s1" property="collection-type">series</meta>'
+        '<meta refines="#s1" property="group-position">3</meta>',
+    )
+    opf = opf.replace('media-type="image/jpeg"/>', 'media-type="image/jpeg" properties="cover-image"/>')
+    opf = opf.replace('<meta name="cover" content="capa"/>', "")
+    meta = read_opf_metadata(make_epub(tmp_path / "livro.epub", opf=opf))
+    assert (meta.series, meta.series_index) == ("Saga", 3.0)
+    assert meta.cover_href == "OEBPS/images/capa 1.jpg"
+
+
+def test_malformed_epub_falls_back_to_ebooklib(tmp_path, monkeypatch):
+    path = make_epub(tmp_path / "quebrado.epub", container="")
+    with pytest.raises(OPFError):
+        read_opf_metadata(path)
+
+    class FakeBook:
+        def get_metadata(self, ns, key):
+            return [("Título do fallback", {})] if key == "title" else []
+
+    class FakeEpub:
+        @staticmethod
+        def read_epub(name):
+            return FakeBook()
+
+    monkeypatch.setattr(extractors, "epub", FakeEpub)
+    assert extractors.extract_epub_meta(path).title == "Título do fallback"
+
+
+def test_series_persisted_from_epub(temp_db, tmp_path):
+    path = make_epub(tmp_path / "livro.epub")
+    record = IngestRecord(path=path, stat=path.stat(), local=read_opf_metadata(path))
+    with session_scope() as session:
+        persist_batch(session, [record])
+    with session_scope() as session:
+        entry = session.scalar(select(models.SeriesEntry))
+        assert (entry.series.name, entry.position) == ("Trilogia Realista", 1.0)
+        assert entry.work.description == "Um defunto autor ."
+        assert session.scalar(select(models.Edition.publisher)) == "Editora Exemplo"
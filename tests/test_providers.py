@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import timedelta
+from typing import List, Optional
+
+import httpx
+
+from mai.ingest.cache import CachedProvider, ProviderCache
+from mai.ingest.pipeline import asearch_providers, search_providers
+from mai.ingest.providers import OpenLibraryProvider, Provider
+from mai.ingest.ratelimit import TokenBucket, reset_limiters, retry_after_seconds, wait_retry_after
+from mai.ingest.types import Candidate, LocalMetadata
+
+
+def make_candidate(source: str, title: str = "Livro") -> Candidate:
+    return Candidate(
+        source=source,
+        title=title,
+        authors=["Autor"],
+        year=2020,
+        publisher=None,
+        language="pt",
+        ids={},
+        cover_url=None,
+        payload={},
+    )
+
+
+class AsyncFakeProvider(Provider):
+    def __init__(self, slug: str, delay: float = 0.0, fail: bool = False) -> None:
+        self.slug = slug
+        self.delay = delay
+        self.fail = fail
+
+    async def aget_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        return None
+
+    async def asearch(self, query: str) -> List[Candidate]:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("boom")
+        return [make_candidate(self.slug)]
+
+
+class SyncFakeProvider(Provider):
+    slug = "sync"
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        return make_candidate(self.slug, title="Por ISBN")
+
+    def search(self, query: str) -> List[Candidate]:  # pragma: no cover - ISBN resolve antes
+        raise AssertionError("search não deveria ser chamado")
+
+
+def test_fan_out_runs_providers_concurrently():
+    local = LocalMetadata(title="Livro", authors=["Autor"])
+    providers = [AsyncFakeProvider(f"p{idx}", delay=0.2) for idx in range(3)]
+    started = time.perf_counter()
+    hits = asyncio.run(asearch_providers(local, providers, deadline=5))
+    elapsed = time.perf_counter() - started
+    assert [candidate.source for _, candidate in hits] == ["p0", "p1", "p2"]
+    assert elapsed < 0.5
+
+
+def test_fan_out_returns_partial_results_on_deadline():
+    local = LocalMetadata(title="Livro", authors=["Autor"])
+    providers = [
+        AsyncFakeProvider("rapido"),
+        AsyncFakeProvider("lento", delay=5),
+        AsyncFakeProvider("quebrado", fail=True),
+    ]
+    hits = asyncio.run(asearch_providers(local, providers, deadline=0.2))
+    assert [candidate.source for _, candidate in hits] == ["rapido"]
+
+
+def test_sync_providers_use_async_fallback():
+    local = LocalMetadata(title="Livro", identifiers=["0306406152"])
+    hits = search_providers(local, [SyncFakeProvider()])
+    assert hits[0][0] == "by_isbn"
+    assert hits[0][1].title == "Por ISBN"
+
+
+class CountingProvider(Provider):
+    slug = "counting"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get_by_isbn(self, isbn13: str) -> Optional[Candidate]:
+        self.calls += 1
+        return None
+
+    def search(self, query: str) -> List[Candidate]:
+        self.calls += 1
+        return [make_candidate(self.slug, title=query)]
+
+
+def test_cached_provider_reads_through_and_caches_negatives(temp_db):
+    cache = ProviderCache(ttl=timedelta(days=30), negative_ttl=timedelta(hours=1))
+    inner = CountingProvider()
+    provider = CachedProvider(inner, cache)
+
+    assert provider.get_by_isbn("978-0-306-40615-7") is None
+    assert provider.get_by_isbn("9780306406157") is None
+    assert provider.search("Dom  Casmurro")[0].title == "Dom  Casmurro"
+    assert asyncio.run(provider.asearch("dom casmurro"))[0].title == "Dom  Casmurro"
+    assert inner.calls == 2
+
+    stats = cache.stats()
+    assert (stats.hits, stats.negative_hits, stats.misses, stats.stores) == (1, 1, 2, 2)
+
+    provider.refreshing().search("dom casmurro")
+    assert inner.calls == 3
+
+
+def test_cache_entries_expire(temp_db):
+    cache = ProviderCache(ttl=timedelta(seconds=-1), negative_ttl=timedelta(seconds=-1))
+    inner = CountingProvider()
+    provider = CachedProvider(inner, cache)
+    provider.search("livro")
+    provider.search("livro")
+    assert inner.calls == 2
+    assert cache.purge_expired() == 1
+
+
+def test_http_provider_reuses_pooled_client():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params.get("q"))
+        return httpx.Response(200, json={"docs": [{"title": "Livro", "author_name": ["Autor"]}]})
+
+    provider = OpenLibraryProvider()
+    options = provider._client_options()
+    assert options["timeout"] == httpx.Timeout(provider.settings.provider_timeout)
+    provider._client_options = lambda: {**options, "http2": False, "transport": httpx.MockTransport(handler)}
+
+    first = provider.client
+    assert provider.search("livro")[0].title == "Livro"
+    assert provider.get_by_isbn("9780306406157").ids["ISBN13"] == "9780306406157"
+    assert provider.client is first
+    assert calls == ["livro", "isbn:9780306406157"]
+
+    provider.close()
+    assert first.is_closed
+
+
+def test_token_bucket_spaces_requests_and_honours_pause():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=1, clock=lambda: now[0])
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    now[0] = 10.0
+    bucket.pause(3.0)
+    assert bucket.reserve() == 3.0
+
+
+def test_token_bucket_refuses_waits_past_deadline_and_refunds():
+    bucket = TokenBucket(rate=1.0, burst=1, clock=lambda: 0.0)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve(max_wait=0.5) is None  # recusada sem consumir
+    assert bucket.reserve(max_wait=1.0) == 1.0
+
+    async def cancelled_wait():
+        waiter = asyncio.ensure_future(bucket.acquire_async())
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(cancelled_wait())
+    assert bucket.reserve() == 2.0  # o token da espera cancelada voltou para a fila
+
+
+class LimitedProvider(OpenLibraryProvider):
+    bucket = TokenBucket(rate=5.0, burst=1)
+
+    @property
+    def limiter(self) -> TokenBucket:
+        return self.bucket
+
+
+def test_deadline_shorter_than_rate_limit_backlog():
+    provider = LimitedProvider()
+    options = provider._client_options()
+    provider._client_options = lambda: {
+        **options,
+        "http2": False,
+        "transport": httpx.MockTransport(lambda request: httpx.Response(200, json={"docs": [{"title": "Livro"}]})),
+    }
+    local = LocalMetadata(title="Livro")
+
+    async def burst():
+        return await asyncio.gather(*(asearch_providers(local, [provider], deadline=0.5) for _ in range(5)))
+
+    started = time.perf_counter()
+    results = asyncio.run(burst())
+    elapsed = time.perf_counter() - started
+    # esperas de 0; 0,2 e 0,4s cabem no prazo; as de 0,6 e 0,8s são recusadas na hora
+    assert sorted(len(hits) for hits in results) == [0, 0, 1, 1, 1]
+    assert elapsed < 0.5
+    # as recusadas não consumiram tokens: a fila termina onde a última aceita deixou
+    assert provider.bucket.reserve(max_wait=0.3) is not None
+    provider.close()
+
+
+def test_http_provider_retries_after_429(monkeypatch):
+    reset_limiters()
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(503),
+            httpx.Response(200, json={"docs": [{"title": "Livro"}]}),
+        ]
+    )
+    monkeypatch.setattr(wait_retry_after, "__call__", lambda self, state: 0.0)
+    provider = OpenLibraryProvider()
+    options = provider._client_options()
+    provider._client_options = lambda: {
+        **options,
+        "http2": False,
+        "transport": httpx.MockTransport(lambda request: next(responses)),
+    }
+    assert provider.search("livro")[0].title == "Livro"
+    provider.close()
+
+
+def test_retry_after_header_parsing():
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "7"})) == 7.0
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(httpx.Response(429)) is None
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import fitz
+import pytest
+from sqlalchemy import select
+
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest import sandbox
+from mai.ingest.pipeline import ingest_paths
+from mai.ingest.providers import Provider
+from mai.ingest.sandbox import ExtractionFailed, ExtractorPool
+
+
+class NoProvider(Provider):
+    slug = "none"
+
+    def get_by_isbn(self, isbn13):
+        return None
+
+    def search(self, query):
+        return []
+
+
+def make_pdf(path: Path, title: str) -> None:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), title)
+    doc.set_metadata({"title": title})
+    doc.save(path)
+    doc.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requer FIFO POSIX")
+def test_stuck_worker_is_replaced(tmp_path):
+    stuck = tmp_path / "trava.mobi"
+    os.mkfifo(stuck)  # abrir para leitura bloqueia até aparecer um escritor
+    healthy = tmp_path / "ok.pdf"
+    make_pdf(healthy, "Livro Saudavel")
+
+    pool = ExtractorPool(workers=1, timeout=3)
+    try:
+        with pytest.raises(ExtractionFailed, match="tempo limite"):
+            pool.extract(stuck)
+        assert pool.extract(healthy).title == "Livro Saudavel"
+    finally:
+        pool.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requer FIFO POSIX")
+def test_pool_shutdown_is_not_a_permanent_failure(tmp_path):
+    stuck = tmp_path / "trava.mobi"
+    os.mkfifo(stuck)
+    pool = ExtractorPool(workers=1, timeout=30)
+    pool.extract(tmp_path)  # sobe o worker antes de travá-lo
+    errors = []
+
+    def run():
+        try:
+            pool.extract(stuck)
+        except ExtractionFailed as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(0.5)
+    pool.close()
+    thread.join(timeout=10)
+    assert len(errors) == 1 and not errors[0].permanent
+
+
+def test_transient_failures_are_retried_next_scan(temp_db, tmp_path, monkeypatch):
+    library = tmp_path / "library"
+    library.mkdir()
+    make_pdf(library / "livro.pdf", "Livro")
+    attempts = []
+
+    def interrupted(path: Path):
+        attempts.append(path)
+        raise ExtractionFailed("processo extrator indisponível", permanent=False)
+
+    with monkeypatch.context() as patched:
+        patched.setattr(sandbox, "extract_metadata", interrupted)
+        ingest_paths([library], [NoProvider()])
+        ingest_paths([library], [NoProvider()])
+    assert len(attempts) == 2  # nada gravado em ingest_failure; diretório relistado
+    with session_scope() as session:
+        assert session.scalar(select(models.IngestFailure)) is None
+
+
+def test_failed_files_are_not_retried_until_changed(temp_db, tmp_path, monkeypatch):
+    library = tmp_path / "library"
+    library.mkdir()
+    broken = library / "quebrado.pdf"
+    make_pdf(broken, "Quebrado")
+    attempts = []
+
+    def failing(path: Path):
+        attempts.append(path)
+        raise ExtractionFailed("processo extrator encerrou (-9)")
+
+    with monkeypatch.context() as patched:
+        # só o extrator; desfazer tudo levaria junto o ambiente dos fixtures (banco, cache de capas)
+        patched.setattr(sandbox, "extract_metadata", failing)
+        ingest_paths([library], [NoProvider()])
+        ingest_paths([library], [NoProvider()], full_rescan=False)
+    assert attempts == [broken.resolve()]
+
+    with session_scope() as session:
+        failure = session.scalar(select(models.IngestFailure))
+        assert failure.path == str(broken.resolve())
+        assert failure.reason == "processo extrator encerrou (-9)"
+        assert session.scalar(select(models.File)) is None
+
+    make_pdf(broken, "Quebrado consertado")
+    ingest_paths([library], [NoProvider()], full_rescan=True)
+    with session_scope() as session:
+        assert session.scalar(select(models.IngestFailure)) is None
+        assert session.scalar(select(models.File.path)) == str(broken.resolve())
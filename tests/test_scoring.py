@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import random
+
+from mai.ingest.pipeline import score_candidate, score_candidates
+from mai.ingest.scoring import score_matrix
+from mai.ingest.types import Candidate, LocalMetadata
+
+TITLES = ["Dom Casmurro", "dom casmurro (edição crítica)", "O Cortiço", "Memórias Póstumas de Brás Cubas", "", None]
+AUTHORS = [["Machado de Assis"], ["Assis, Machado de"], ["Aluísio Azevedo"], []]
+ISBNS = ["9780306406157", "0-306-40615-2", "9788535914849", "123", None]
+
+
+def make_local(rng: random.Random) -> LocalMetadata:
+    return LocalMetadata(
+        title=rng.choice(TITLES),
+        authors=list(rng.choice(AUTHORS)),
+        identifiers=[i for i in [rng.choice(ISBNS)] if i],
+        language=rng.choice(["pt", "PT", "en", None]),
+        year=rng.choice([1899, 1900, 1950, None]),
+    )
+
+
+def make_candidate(rng: random.Random) -> Candidate:
+    return Candidate(
+        source="fake",
+        title=rng.choice(TITLES),
+        authors=list(rng.choice(AUTHORS)),
+        year=rng.choice([1898, 1900, 2001, None]),
+        publisher=rng.choice(["Garnier", None]),
+        language=rng.choice(["pt", "en", None]),
+        ids={"ISBN13": rng.choice(["9780306406157", "9788535914849", None])},
+        cover_url=None,
+        payload={},
+    )
+
+
+def test_score_matrix_matches_scalar_scores():
+    rng = random.Random(42)
+    locals_ = [make_local(rng) for _ in range(40)]
+    candidates = [make_candidate(rng) for _ in range(60)]
+
+    matrix = score_matrix(locals_, candidates, workers=2)
+
+    assert matrix.shape == (40, 60)
+    for i, local in enumerate(locals_):
+        for j, candidate in enumerate(candidates):
+            assert matrix[i, j] == score_candidate(local, candidate), (local, candidate)
+
+
+def test_score_candidates_uses_batch_scores():
+    rng = random.Random(7)
+    local = make_local(rng)
+    hits = [("search", make_candidate(rng)) for _ in range(5)]
+    scored = score_candidates(local, hits)
+    assert [item["score"] for item in scored] == [score_candidate(local, c) for _, c in hits]
+    assert score_candidates(local, []) == []
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mai.ingest.providers import Provider
+from mai.ingest.singleflight import SingleFlight, SingleFlightProvider
+from mai.ingest.types import Candidate
+
+
+class SlowProvider(Provider):
+    slug = "slow"
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _hit(self, isbn13: str) -> Candidate:
+        return Candidate("slow", "Livro", [], None, None, None, {"ISBN13": isbn13}, None, {})
+
+    def get_by_isbn(self, isbn13: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return self._hit(isbn13)
+
+    async def aget_by_isbn(self, isbn13: str):
+        self.calls += 1
+        await asyncio.sleep(0.2)
+        return self._hit(isbn13)
+
+    def search(self, query: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.2)
+        raise RuntimeError("provedor fora do ar")
+
+
+def test_threads_share_one_call():
+    inner = SlowProvider()
+    provider = SingleFlightProvider(inner)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        # hífens não mudam a chave: é o mesmo ISBN
+        results = list(pool.map(provider.get_by_isbn, ["9788535908541", "978-85-359-0854-1"] * 3))
+    assert inner.calls == 1
+    assert {result.ids["ISBN13"] for result in results} == {"9788535908541"}
+
+    # terminada a chamada, a próxima consulta vai ao provedor de novo
+    provider.get_by_isbn("9788535908541")
+    assert inner.calls == 2
+
+
+def test_errors_reach_every_waiter():
+    inner = SlowProvider()
+    provider = SingleFlightProvider(inner)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(provider.search, "Dom Casmurro") for _ in range(4)]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+    assert inner.calls == 1
+
+
+def test_async_waiters_survive_cancelled_caller():
+    inner = SlowProvider()
+    provider = SingleFlightProvider(inner)
+
+    async def run():
+        first = asyncio.ensure_future(provider.aget_by_isbn("9788535908541"))
+        others = [asyncio.ensure_future(provider.aget_by_isbn("9788535908541")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        first.cancel()
+        return await asyncio.gather(*others)
+
+    results = asyncio.run(run())
+    assert inner.calls == 1
+    assert len(results) == 3 and all(result.title == "Livro" for result in results)
+
+
+def test_distinct_keys_run_in_parallel():
+    flight = SingleFlight()
+    started = threading.Barrier(2, timeout=2)
+
+    def work(value):
+        started.wait()  # só passa se as duas chaves estiverem em andamento juntas
+        return value
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert sorted(pool.map(lambda key: flight.do(key, work, key), ["a", "b"])) == ["a", "b"]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+import unicodedata
+
+from fastapi.testclient import TestClient
+
+from mai.core.config import get_settings
+from mai.db import models
+from mai.db.init import apply_schema
+from mai.db.session import reset_engine, session_scope
+from mai.main import create_app
+from mai.organizer.namer import slugify
+from mai.utils.text import normalize
+
+
+def reference_normalize(text):
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if unicodedata.category(ch)[0] != "M")
+    return " ".join("".join(ch for ch in text if ch.isalnum() or ch.isspace()).lower().split())
+
+
+def test_normalize_matches_reference_implementation():
+    samples = ["Memórias Póstumas de Brás Cubas", "İstanbul", "ΟΔΟΣ", "ﬁction ½", "  Dom\tCasmurro!! ", "", None]
+    rng = random.Random(3)
+    for _ in range(2000):
+        samples.append("".join(chr(rng.randrange(32, 0x3000)) for _ in range(rng.randrange(12))))
+    for sample in samples:
+        assert normalize(sample) == reference_normalize(sample), repr(sample)
+
+
+def test_slugify_strips_accents():
+    assert slugify("José Saramago/Ensaio sobre a Cegueira") == "Jose_Saramago-Ensaio_sobre_a_Cegueira"
+
+
+def test_author_norm_name_drives_lookup_and_filter(temp_db):
+    with session_scope() as session:
+        work = models.Work(title="Memórias Póstumas")
+        work.authors.append(models.Author(name="Joaquim Maria Machado de Assis"))
+        session.add(models.Edition(work=work, title="Memórias Póstumas", format="epub"))
+        session.flush()
+        assert work.sort_title == "memorias postumas"
+        assert work.authors[0].norm_name == "joaquim maria machado de assis"
+
+    client = TestClient(create_app())
+    response = client.get("/books", params={"author": "MACHADO DE ASSIS"})
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+
+
+def test_apply_schema_backfills_author_norm_name(tmp_path, monkeypatch):
+    db_path = tmp_path / "legado.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE author (id INTEGER PRIMARY KEY, name TEXT NOT NULL, sort_name TEXT)")
+        conn.execute("INSERT INTO author(name) VALUES ('Érico Veríssimo')")
+    monkeypatch.setenv("MAI_DB_PATH", str(db_path))
+    get_settings.cache_clear()
+    reset_engine()
+    try:
+        apply_schema()
+    finally:
+        reset_engine()
+        get_settings.cache_clear()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT norm_name FROM author").fetchone() == ("erico verissimo",)
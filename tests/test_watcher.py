@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select
+
+from mai.db import models
+from mai.db.session import session_scope
+from mai.ingest import fingerprint, pipeline
+from mai.ingest.known import stat_fields
+from mai.ingest.pipeline import ingest_file
+from mai.ingest.watcher import DELETE, MOVE, UPSERT, EventCoalescer, WatchEvent, WatchService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def must_not_run(*args):
+    raise AssertionError(args)
+
+
+def test_coalescer_waits_until_size_is_stable(tmp_path):
+    clock = FakeClock()
+    coalescer = EventCoalescer(quiet_period=2.0, clock=clock)
+    target = tmp_path / "livro.pdf"
+    target.write_bytes(b"x" * 10)
+
+    for _ in range(5):
+        coalescer.push(UPSERT, str(target))
+    assert coalescer.ready() == []
+
+    clock.now = 2.5
+    assert coalescer.ready() == []  # primeira assinatura registrada
+
+    target.write_bytes(b"x" * 20)  # cópia ainda em andamento
+    clock.now = 5.0
+    assert coalescer.ready() == []
+
+    clock.now = 7.5
+    assert coalescer.ready() == [WatchEvent(UPSERT, str(target))]
+    assert len(coalescer) == 0
+
+
+def test_coalescer_last_event_wins(tmp_path):
+    clock = FakeClock()
+    coalescer = EventCoalescer(quiet_period=1.0, clock=clock)
+    path = str(tmp_path / "sumiu.epub")
+    coalescer.push(UPSERT, path)
+    coalescer.push(DELETE, path)
+    clock.now = 1.5
+    assert coalescer.ready() == [WatchEvent(DELETE, path)]
+
+
+def test_handle_delete_removes_rows_under_directory(temp_db, tmp_path):
+    gone = tmp_path / "gone"
+    with session_scope() as session:
+        for name in ("a.pdf", "b.pdf"):
+            session.add(models.File(path=str(gone / name), sha256=name, size_bytes=1, mime="application/pdf"))
+        session.add(models.File(path=str(tmp_path / "gone-other.pdf"), sha256="c", size_bytes=1, mime="application/pdf"))
+
+    WatchService([], quiet_period=0).handle_delete(gone)
+
+    with session_scope() as session:
+        paths = session.scalars(select(models.File.path)).all()
+        assert paths == [str(tmp_path / "gone-other.pdf")]
+        assert session.scalar(select(func.count(models.File.id))) == 1
+
+
+def test_coalescer_releases_moves_immediately(tmp_path):
+    clock = FakeClock()
+    coalescer = EventCoalescer(quiet_period=1.0, clock=clock)
+    src, dest = str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf")
+    coalescer.push(DELETE, dest)
+    coalescer.push(MOVE, src, dest)
+    assert coalescer.ready() == [WatchEvent(MOVE, src, dest)]
+    clock.now = 5.0
+    assert coalescer.ready() == []
+
+
+def test_directory_move_is_one_bulk_update(temp_db, tmp_path, monkeypatch):
+    old, new = tmp_path / "old", tmp_path / "new"
+    new.mkdir()
+    with session_scope() as session:
+        for name in ("a.pdf", "sub/b.pdf"):
+            session.add(models.File(path=str(old / name), sha256=name, size_bytes=1, mime="application/pdf"))
+        session.add(models.File(path=str(tmp_path / "older.pdf"), sha256="c", size_bytes=1, mime="application/pdf"))
+        session.add(models.ScanDir(path=str(old / "sub"), mtime_ns=1))
+
+    service = WatchService([], quiet_period=0)
+    monkeypatch.setattr(service, "handle_upsert", must_not_run)
+    service.handle_move(old, new)
+
+    with session_scope() as session:
+        paths = sorted(session.scalars(select(models.File.path)))
+        assert paths == sorted([str(new / "a.pdf"), str(new / "sub/b.pdf"), str(tmp_path / "older.pdf")])
+        assert session.scalars(select(models.ScanDir.path)).all() == [str(new / "sub")]
+
+
+def test_ingest_file_relocates_by_inode_without_hashing(temp_db, tmp_path, monkeypatch):
+    moved = tmp_path / "novo.pdf"
+    moved.write_bytes(b"conteudo")
+    with session_scope() as session:
+        session.add(
+            models.File(
+                path=str(tmp_path / "antigo.pdf"), sha256="x", mime="application/pdf", **stat_fields(moved.stat())
+            )
+        )
+
+    monkeypatch.setattr(pipeline, "compute_quick_hash", must_not_run)
+    monkeypatch.setattr(fingerprint, "compute_sha256", must_not_run)
+    with session_scope() as session:
+        ingest_file(session, moved, [])
+
+    with session_scope() as session:
+        assert session.scalars(select(models.File.path)).all() == [str(moved.resolve())]
+
+
+def test_rename_onto_catalogued_path_replaces_row(temp_db, tmp_path, monkeypatch):
+    src, dest = tmp_path / "novo.pdf", tmp_path / "antigo.pdf"
+    with session_scope() as session:
+        session.add(models.File(path=str(src), sha256="novo", size_bytes=1, mime="application/pdf"))
+        session.add(models.File(path=str(dest), sha256="antigo", size_bytes=1, mime="application/pdf"))
+        session.add(models.IngestFailure(path=str(dest), reason="ilegível"))
+        session.add(models.IngestFailure(path=str(tmp_path / "quebrado.pdf"), reason="tempo limite"))
+
+    service = WatchService([], quiet_period=0)
+    monkeypatch.setattr(service, "handle_upsert", must_not_run)
+    service.handle_move(src, dest)
+    service.handle_move(tmp_path / "quebrado.pdf", tmp_path / "renomeado.pdf")
+
+    with session_scope() as session:
+        assert session.execute(select(models.File.path, models.File.sha256)).all() == [(str(dest), "novo")]
+        assert session.scalars(select(models.IngestFailure.path)).all() == [str(tmp_path / "renomeado.pdf")]
+
+
+def test_move_of_uncatalogued_file_waits_for_quiet_period(temp_db, tmp_path, monkeypatch):
+    clock = FakeClock()
+    service = WatchService([], quiet_period=1.0)
+    service.coalescer = EventCoalescer(quiet_period=1.0, clock=clock)
+    monkeypatch.setattr(service, "handle_upsert", must_not_run)
+    partial = tmp_path / "x.tmp"
+    partial.write_bytes(b"comeco")
+    target = tmp_path / "x.pdf"
+    partial.rename(target)
+
+    service.handle_move(partial, target)  # ainda não catalogado: nada foi ingerido
+    target.write_bytes(b"comeco e o resto")  # a cópia continua depois da renomeação
+    assert service.coalescer.ready() == []
+    clock.now = 1.5
+    assert service.coalescer.ready() == []  # primeira assinatura
+    clock.now = 3.0
+    assert service.coalescer.ready() == [WatchEvent(UPSERT, str(target))]
+
+
+def test_deleted_or_overwritten_files_take_their_editions(temp_db, tmp_path, monkeypatch):
+    def catalogue(name: str, work: models.Work) -> None:
+        edition = models.Edition(work=work, title=name)
+        session.add(models.File(path=str(tmp_path / name), sha256=name, size_bytes=1, edition=edition))
+
+    with session_scope() as session:
+        shared = models.Work(title="Compartilhada")
+        catalogue("apagado.pdf", models.Work(title="Apagada"))
+        catalogue("novo.pdf", shared)
+        catalogue("antigo.pdf", shared)
+
+    service = WatchService([], quiet_period=0)
+    monkeypatch.setattr(service, "handle_upsert", must_not_run)
+    service.handle_delete(tmp_path / "apagado.pdf")
+    service.handle_move(tmp_path / "novo.pdf", tmp_path / "antigo.pdf")
+
+    with session_scope() as session:
+        assert session.scalars(select(models.Edition.title)).all() == ["novo.pdf"]
+        assert session.scalars(select(models.Work.title)).all() == ["Compartilhada"]